@@ -0,0 +1,231 @@
+"""
+Background cleanup of everything that points at a deleted account.
+
+`delete_me` removes the user document and returns; `start_cleanup` records a
+job in `account_cleanup_jobs` and hands it to a single background thread, so
+no request thread waits on the cascade. The job runs these steps in order:
+
+- conversations: the user's DMs and their messages, `BATCH_SIZE`
+  conversations at a time (messages first, so a retry finds the conversation
+  again). These go first because a conversation with a missing participant
+  cannot be rendered for the other side.
+- match_requests: sent or received, in one `delete_many`.
+- memberships: `$pull` from the member list of other groups, with the
+  member's skills/major taken out of the group's skill profile.
+- owned_groups: groups the user created; an owner cannot leave, so they go.
+
+Every step is idempotent and the job document records the finished steps and
+per-step counts:
+
+    {_id, user_id, profile, status: pending|running|done|failed,
+     steps_done: [...], progress: {step: count}, attempts, last_error,
+     created_at, updated_at}
+
+A failed step is retried with exponential backoff, up to MAX_ATTEMPTS; a job
+that still fails is left `failed`. Unfinished jobs, failed ones included, are
+picked up again at startup (`resume_cleanup_jobs`), from the first step not
+yet done.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from pymongo import ASCENDING
+
+from app.core.conditional import versioned
+from app.core.group_profiles import membership_inc
+from app.core.matching import major_of, skills_of
+
+logger = logging.getLogger(__name__)
+
+JOBS_COLLECTION = "account_cleanup_jobs"
+BATCH_SIZE = 500
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+
+UNFINISHED = ["pending", "running", "failed"]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _conversations(db, job: dict) -> int:
+    user_oid = job["user_id"]
+    removed = 0
+    while True:
+        batch = [
+            conv["_id"]
+            for conv in db["conversations"]
+            .find({"participant_ids": user_oid}, {"_id": 1})
+            .limit(BATCH_SIZE)
+        ]
+        if not batch:
+            return removed
+        db["messages"].delete_many({"conversation_id": {"$in": batch}})
+        removed += (
+            db["conversations"].delete_many({"_id": {"$in": batch}}).deleted_count
+        )
+        _record(db, job["_id"], {"progress.conversations": removed})
+
+
+def _match_requests(db, job: dict) -> int:
+    user_oid = job["user_id"]
+    return (
+        db["match_requests"]
+        .delete_many({"$or": [{"sender_id": user_oid}, {"receiver_id": user_oid}]})
+        .deleted_count
+    )
+
+
+def _memberships(db, job: dict) -> int:
+    user_oid = job["user_id"]
+    return (
+        db["groups"]
+        .update_many(
+            {"member_ids": user_oid, "created_by": {"$ne": user_oid}},
+            versioned(
+                {
+                    "$pull": {"member_ids": user_oid},
+                    "$inc": membership_inc(job["profile"], -1),
+                }
+            ),
+        )
+        .modified_count
+    )
+
+
+def _owned_groups(db, job: dict) -> int:
+    return db["groups"].delete_many({"created_by": job["user_id"]}).deleted_count
+
+
+STEPS: dict[str, Callable[[object, dict], int]] = {
+    "conversations": _conversations,
+    "match_requests": _match_requests,
+    "memberships": _memberships,
+    "owned_groups": _owned_groups,
+}
+
+
+def _record(db, job_id: ObjectId, fields: dict, extra: dict | None = None) -> None:
+    """Set `fields` (plus updated_at) on the job, with any `extra` operators."""
+    db[JOBS_COLLECTION].update_one(
+        {"_id": job_id}, {"$set": {**fields, "updated_at": _now()}, **(extra or {})}
+    )
+
+
+def run_job(db, job_id: ObjectId) -> bool:
+    """Run the remaining steps once; True when the job is done."""
+    job = db[JOBS_COLLECTION].find_one({"_id": job_id})
+    if job is None or job["status"] == "done":
+        return True
+    _record(db, job_id, {"status": "running"}, {"$inc": {"attempts": 1}})
+    for step, run in STEPS.items():
+        if step in job.get("steps_done", []):
+            continue
+        count = run(db, job)
+        _record(
+            db, job_id, {f"progress.{step}": count}, {"$addToSet": {"steps_done": step}}
+        )
+    _record(db, job_id, {"status": "done", "last_error": None})
+    return True
+
+
+class CleanupWorker:
+    """One background thread working through cleanup jobs, with retries."""
+
+    def __init__(
+        self,
+        max_attempts: int = MAX_ATTEMPTS,
+        backoff_seconds: float = BACKOFF_SECONDS,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def submit(self, db, job_id: ObjectId) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="account-cleanup"
+                )
+            return self._executor.submit(self.run, db, job_id)
+
+    def run(self, db, job_id: ObjectId) -> bool:
+        """Run a job to completion, retrying; False if it was left `failed`."""
+        for attempt in range(self.max_attempts):
+            try:
+                return run_job(db, job_id)
+            except Exception as exc:
+                logger.warning("Account cleanup %s failed: %s", job_id, exc)
+                error = f"{type(exc).__name__}: {exc}"
+                if attempt + 1 == self.max_attempts:
+                    _record(db, job_id, {"status": "failed", "last_error": error})
+                    return False
+                _record(db, job_id, {"status": "pending", "last_error": error})
+                self._sleep(min(self.backoff_seconds * 2**attempt, MAX_BACKOFF_SECONDS))
+        return False
+
+    def shutdown(self) -> None:
+        """Finish the running job; queued ones stay unfinished for the next start."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+cleanup_worker = CleanupWorker()
+
+
+def start_cleanup(db, user: dict) -> ObjectId:
+    """Record a cleanup job for a just-deleted `user` and queue it."""
+    now = _now()
+    job_id = (
+        db[JOBS_COLLECTION]
+        .insert_one(
+            {
+                "user_id": ObjectId(user["_id"]),
+                # the user document is gone by the time the job runs; this
+                # is what comes out of their groups' skill profiles
+                "profile": {
+                    "skills_norm": list(skills_of(user)),
+                    "major": major_of(user),
+                },
+                "status": "pending",
+                "steps_done": [],
+                "progress": {},
+                "attempts": 0,
+                "last_error": None,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        .inserted_id
+    )
+    cleanup_worker.submit(db, job_id)
+    return job_id
+
+
+def resume_cleanup_jobs(db) -> int:
+    """Queue every unfinished job again (at startup); returns how many."""
+    jobs = db[JOBS_COLLECTION]
+    jobs.create_index([("status", ASCENDING)], name="cleanup_jobs_status")
+    job_ids = [
+        job["_id"] for job in jobs.find({"status": {"$in": UNFINISHED}}, {"_id": 1})
+    ]
+    for job_id in job_ids:
+        cleanup_worker.submit(db, job_id)
+    if job_ids:
+        logger.info("Resumed %d account cleanup jobs.", len(job_ids))
+    return len(job_ids)
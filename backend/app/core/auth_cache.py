@@ -0,0 +1,172 @@
+"""
+Per-process cache of authenticated requests: token -> (claims, user document).
+
+Without it every API call decodes its bearer token and reads the user from
+`users`. Entries are keyed by a SHA-256 of the token (raw tokens are never kept)
+and live until the TTL or the token's own `exp`, whichever comes first; the
+least recently used entry is evicted once the cache is full.
+
+Profile writes must call `invalidate_user` (update_me, delete_me), which drops
+every token of that user. A lookup that started before an invalidation may not
+store what it read (`put` checks the generation it was handed), so once
+`invalidate_user` returns, the next request with any of the user's tokens goes
+back to the database: a deleted user is rejected from then on. Other worker
+processes keep their own cache and notice within the TTL.
+
+`revoke` also remembers, for as long as a token can live, which token versions
+of a user are no longer valid. `get_current_user_id` consults it, since it
+resolves id-based tokens without reading the user at all.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class AuthCache:
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 60.0,
+        revocation_seconds: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # at least the access token lifetime, so no revoked token outlives it
+        self.revocation_seconds = revocation_seconds
+        # wall clock, so entries can be compared with the tokens' `exp`
+        self._clock = clock
+        self._lock = threading.Lock()
+        # token key -> (expires_at, user id, claims, user); oldest use first
+        self._entries: OrderedDict[str, tuple[float, str, dict, dict]] = OrderedDict()
+        self._tokens_of: dict[str, set[str]] = {}
+        # user id -> (lowest token version still valid, forget after)
+        self._revoked: dict[str, tuple[float, float]] = {}
+        self._generation = 0
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    def generation(self) -> int:
+        """Take this before reading the user; hand it to `put`."""
+        with self._lock:
+            return self._generation
+
+    def get(self, token: str) -> tuple[dict, dict] | None:
+        """(claims, user) for a cached token; the user is a copy callers may edit."""
+        key = _token_key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            expires_at, _, claims, user = entry
+            if expires_at <= self._clock():
+                self._drop(key)
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return claims, dict(user)
+
+    def put(self, token: str, claims: dict, user: dict, generation: int) -> bool:
+        """Cache a lookup unless an invalidation happened since `generation`."""
+        expires_at = self._clock() + self.ttl_seconds
+        if isinstance(claims.get("exp"), (int, float)):
+            expires_at = min(expires_at, claims["exp"])
+        key = _token_key(token)
+        user_id = str(user["_id"])
+        with self._lock:
+            if generation != self._generation or expires_at <= self._clock():
+                return False
+            self._drop(key)
+            self._entries[key] = (expires_at, user_id, claims, dict(user))
+            self._tokens_of.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+            return True
+
+    def invalidate_user(self, user_id: str) -> int:
+        """Drop every cached token of `user_id`; returns how many were cached."""
+        with self._lock:
+            self._generation += 1
+            keys = list(self._tokens_of.get(str(user_id), ()))
+            for key in keys:
+                self._drop(key)
+            self._counters["invalidations"] += len(keys)
+            return len(keys)
+
+    def revoke(self, user_id: str, min_version: float = math.inf) -> None:
+        """
+        Reject this process's id-only lookups of `user_id` with a token version
+        below `min_version` (all of them by default, for deleted users).
+        """
+        self.invalidate_user(user_id)
+        with self._lock:
+            now = self._clock()
+            self._revoked = {
+                uid: entry for uid, entry in self._revoked.items() if entry[1] > now
+            }
+            self._revoked[str(user_id)] = (min_version, now + self.revocation_seconds)
+
+    def is_revoked(self, user_id: str, token_version: int) -> bool:
+        with self._lock:
+            entry = self._revoked.get(str(user_id))
+            if entry is None or entry[1] <= self._clock():
+                return False
+            return token_version < entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_of.clear()
+            self._revoked.clear()
+            self._generation += 1
+            for key in self._counters:
+                self._counters[key] = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+            }
+
+    def _drop(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        keys = self._tokens_of.get(entry[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._tokens_of[entry[1]]
+        return True
+
+
+auth_cache = AuthCache(
+    max_entries=int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000")),
+    ttl_seconds=float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60")),
+    revocation_seconds=float(os.getenv("AUTH_REVOCATION_SECONDS", "3600")),
+)
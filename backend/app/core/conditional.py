@@ -0,0 +1,114 @@
+"""
+Document versions and conditional GETs for profile and group resources.
+
+Every write to a `users` or `groups` document bumps its `version` and sets
+`updated_at` (`versioned` for updates, `initial_version` for inserts). The
+single-resource GETs derive an `ETag` from the versions their body is built
+from and `Last-Modified` from `updated_at`, and answer 304 Not Modified from
+those alone, before any payload is built. Documents written before versions
+existed count as version 0, last modified at `created_at`.
+
+A group's body embeds its members' profiles, so its validators cover the
+member documents too: a member editing their profile changes the ETag of every
+group they are in without a write to those groups.
+
+`If-None-Match` wins over `If-Modified-Since` when a client sends both;
+`Last-Modified` only has one-second resolution, the ETag is exact.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+
+from app.core.serialization import FastJSONResponse
+
+# Added to a projection so the documents can be fed to `validators`.
+VERSION_FIELDS = {"version": 1, "updated_at": 1}
+
+# Let clients store the response but make them revalidate before every reuse;
+# without it a browser may reuse a profile heuristically from Last-Modified.
+CACHE_CONTROL = "private, no-cache"
+
+
+def initial_version(now: datetime) -> dict:
+    """Version fields for a document about to be inserted."""
+    return {"version": 1, "updated_at": now}
+
+
+def versioned(update: dict, now: datetime | None = None) -> dict:
+    """`update` with the version bump every write to users/groups carries."""
+    return {
+        **update,
+        "$inc": {**update.get("$inc", {}), "version": 1},
+        "$set": {
+            **update.get("$set", {}),
+            "updated_at": now or datetime.now(timezone.utc),
+        },
+    }
+
+
+def _utc(moment: datetime) -> datetime:
+    # pymongo hands back naive datetimes unless the client is tz_aware
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class Validators:
+    etag: str
+    last_modified: datetime | None
+
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+
+def validators(*docs: dict) -> Validators:
+    """
+    Validators for a body built from `docs` (each with `_id` and version fields).
+    The ETag does not depend on the order of `docs`, which for a `$in` query is
+    whatever order Mongo returns.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    for entry in sorted(f"{doc['_id']}:{doc.get('version', 0)};" for doc in docs):
+        digest.update(entry.encode())
+    modified = []
+    for doc in docs:
+        moment = doc.get("updated_at") or doc.get("created_at")
+        if moment is not None:
+            modified.append(_utc(moment).replace(microsecond=0))
+    return Validators(f'"{digest.hexdigest()}"', max(modified, default=None))
+
+
+def not_modified(request: Request, current: Validators) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # weak comparison, as RFC 9110 prescribes for If-None-Match
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or current.etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or current.last_modified is None:
+        return False
+    try:
+        since = _utc(parsedate_to_datetime(if_modified_since))
+    except (TypeError, ValueError):
+        return False  # unparseable dates are ignored
+    return current.last_modified <= since
+
+
+def conditional_response(
+    request: Request, current: Validators, build_payload: Callable[[], object]
+) -> Response:
+    """304 when the client's copy is current, else the payload; validators on both."""
+    headers = current.headers()
+    if not_modified(request, current):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FastJSONResponse(build_payload(), headers=headers)
@@ -0,0 +1,78 @@
+"""
+The user directory: keyset-paginated, server-filtered listing of users.
+
+Pages are ordered by `_id` and continue from the last `_id` seen (`after`), so
+an unfiltered page is one range scan of the `_id` index, at most `limit` + 1
+entries however deep the caller has paged. Each filter has a compound index
+ending in `_id`:
+
+- `major` on `major`;
+- `skill` on `skills_norm`, after the usual canonicalization (aliases included);
+- `name` as a prefix of `username_lower` or of any of `full_name_keys`, both
+  kept by `derived_profile_fields`. A prefix regex anchored with "^" on a
+  lowercase field is an index range scan.
+
+A single `major` or `skill` filter is an equality on the index prefix, so its
+entries come back in `_id` order and a page is again at most `limit` + 1 of
+them. The others cost more. With `major` and `skill` together only one index
+is used and the other filter is applied to what it returns, so a page scans
+every entry up to the `limit` + 1st match. A `name` prefix spans many keys,
+whose entries are not in `_id` order. Mongo then either sorts all the matches
+in memory or walks the `_id` index and filters, so a short prefix costs in
+proportion to how many users match it, not to `limit`.
+"""
+
+from __future__ import annotations
+
+import re
+
+from bson import ObjectId
+from pymongo import ASCENDING
+
+from app.core.skill_vocab import canonical_skill
+from app.models.enums import Major
+
+
+def full_name_keys(full_name: str | None) -> list[str]:
+    """The lowercased full name and each of its words: "Ada King" -> "ada king", "ada", "king"."""
+    name = " ".join((full_name or "").lower().split())
+    return sorted({name, *name.split()} - {""})
+
+
+def ensure_directory_indexes(db) -> None:
+    users = db["users"]
+    users.create_index(
+        [("major", ASCENDING), ("_id", ASCENDING)], name="users_major_id"
+    )
+    users.create_index(
+        [("skills_norm", ASCENDING), ("_id", ASCENDING)], name="users_skills_norm_id"
+    )
+    users.create_index(
+        [("username_lower", ASCENDING), ("_id", ASCENDING)],
+        name="users_username_lower_id",
+    )
+    users.create_index(
+        [("full_name_keys", ASCENDING), ("_id", ASCENDING)],
+        name="users_full_name_keys_id",
+    )
+
+
+def directory_query(
+    *,
+    after: ObjectId | None = None,
+    major: Major | None = None,
+    skill: str | None = None,
+    name: str | None = None,
+) -> dict:
+    query: dict = {}
+    if after is not None:
+        query["_id"] = {"$gt": after}
+    if major is not None:
+        query["major"] = major.value
+    if skill is not None and skill.strip():
+        query["skills_norm"] = canonical_skill(skill)
+    prefix = " ".join((name or "").lower().split())
+    if prefix:
+        pattern = {"$regex": "^" + re.escape(prefix)}
+        query["$or"] = [{"username_lower": pattern}, {"full_name_keys": pattern}]
+    return query
@@ -0,0 +1,211 @@
+"""
+Aggregated member skill profiles stored on each group, for group recommendations.
+
+Every group document carries
+
+    skill_profile: {size, skills: {<skill>: n}, majors: {<major>: n}}
+
+counting its members per canonical skill and per major, so a group can be scored
+against a user without loading any member documents. The counts are kept with
+`$inc` in the same update that changes membership (join, leave, owner add), and
+with one `update_many` over a member's groups when they edit their profile.
+Keys are escaped (see `_key`) because skill names may contain "." or "$".
+`ensure_group_profiles` builds the field for groups that predate it, and
+`rebuild_group_profiles` recounts all of them:
+
+    python -m app.core.group_profiles
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import logging
+from collections import Counter
+from collections.abc import Iterable
+from typing import Literal
+
+from bson import ObjectId
+from pymongo import MongoClient, UpdateOne
+
+from app.core.matching import (
+    MAJOR_MATCH_BONUS,
+    SCORING_PROJECTION,
+    SKILLS_WEIGHT,
+    major_of,
+    skills_of,
+)
+
+logger = logging.getLogger(__name__)
+
+GroupFit = Literal["match", "complement"]
+
+# Aggregation expressions over a group document (projections, `$expr` filters).
+MEMBER_COUNT = {"$size": {"$ifNull": ["$member_ids", []]}}
+HAS_ROOM = {"$lt": [MEMBER_COUNT, "$max_members"]}
+
+# Only the stored fields a recommendation needs; no member ids or member docs.
+RECOMMENDATION_PROJECTION = {
+    "name": 1,
+    "description": 1,
+    "course_code": 1,
+    "max_members": 1,
+    "tags": 1,
+    "created_by": 1,
+    "created_at": 1,
+    "skill_profile": 1,
+    "member_count": MEMBER_COUNT,
+}
+
+
+def _key(name: str) -> str:
+    return name.replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+
+def _unkey(key: str) -> str:
+    return key.replace("%24", "$").replace("%2E", ".").replace("%25", "%")
+
+
+def build_group_profile(members: Iterable[dict]) -> dict:
+    skills: Counter[str] = Counter()
+    majors: Counter[str] = Counter()
+    size = 0
+    for member in members:
+        size += 1
+        skills.update(skills_of(member))
+        major = major_of(member)
+        if major is not None:
+            majors[major] += 1
+    return {
+        "size": size,
+        "skills": {_key(skill): n for skill, n in skills.items()},
+        "majors": {_key(major): n for major, n in majors.items()},
+    }
+
+
+def membership_inc(member: dict, sign: int) -> dict:
+    """`$inc` spec adding (sign=1) or removing (sign=-1) one member's profile."""
+    inc = {"skill_profile.size": sign}
+    for skill in skills_of(member):
+        inc[f"skill_profile.skills.{_key(skill)}"] = sign
+    major = major_of(member)
+    if major is not None:
+        inc[f"skill_profile.majors.{_key(major)}"] = sign
+    return inc
+
+
+def member_profile_changed(db, user_oid: ObjectId, before: dict, after: dict) -> None:
+    """Move a member's old skills/major to the new ones in all their groups."""
+    removed, added = membership_inc(before, -1), membership_inc(after, 1)
+    inc: dict[str, int] = {}
+    for path, delta in [*removed.items(), *added.items()]:
+        inc[path] = inc.get(path, 0) + delta
+    inc = {path: delta for path, delta in inc.items() if delta}
+    if inc:
+        db["groups"].update_many({"member_ids": user_oid}, {"$inc": inc})
+
+
+def _build_profiles(db, group_filter: dict) -> int:
+    """`$set` a freshly counted `skill_profile` on every group matching the filter."""
+    ops = []
+    for group in db["groups"].find(group_filter, {"member_ids": 1}):
+        member_ids = group.get("member_ids", [])
+        members = db["users"].find({"_id": {"$in": member_ids}}, SCORING_PROJECTION)
+        profile = build_group_profile(members)
+        # skip groups whose membership changed meanwhile; their `$inc` is newer
+        ops.append(
+            UpdateOne(
+                {"_id": group["_id"], "member_ids": member_ids},
+                {"$set": {"skill_profile": profile}},
+            )
+        )
+    if not ops:
+        return 0
+    return db["groups"].bulk_write(ops, ordered=False).modified_count
+
+
+def ensure_group_profiles(db) -> int:
+    """
+    Startup: index `member_ids` (for a member's groups), then build
+    `skill_profile` on groups that predate it. Idempotent.
+    """
+    db["groups"].create_index("member_ids")
+    updated = _build_profiles(db, {"skill_profile": {"$exists": False}})
+    if updated:
+        logger.info("Built skill profiles for %d groups.", updated)
+    return updated
+
+
+def rebuild_group_profiles(db) -> int:
+    """
+    Recount every group's `skill_profile` from its members' documents; returns
+    how many had drifted. The `$inc`s take a member's profile as read just before
+    the write, so an edit racing a join or leave can leave a count off for good.
+    """
+    rebuilt = _build_profiles(db, {})
+    logger.info("Rebuilt %d drifted group skill profiles.", rebuilt)
+    return rebuilt
+
+
+def group_fit(user: dict, profile: dict | None, fit: GroupFit = "match") -> float:
+    """
+    How well `user` fits a group, from its stored profile alone.
+
+    "match": Jaccard of the user's skills with the union of the members' skills,
+    plus the major bonus scaled by the share of members in the user's major.
+    "complement": the share of that union only the user would bring, plus the
+    major bonus scaled by the share of members *not* in the user's major.
+    """
+    profile = profile or {}
+    group_skills = {
+        _unkey(key) for key, n in profile.get("skills", {}).items() if n > 0
+    }
+    mine = set(skills_of(user))
+    union = len(mine | group_skills)
+    if fit == "match":
+        skills_score = len(mine & group_skills) / union if union else 0.0
+    else:
+        skills_score = len(mine - group_skills) / union if union else 0.0
+
+    size = profile.get("size", 0)
+    same_major = profile.get("majors", {}).get(_key(major_of(user) or ""), 0)
+    share = same_major / size if size > 0 else 0.0
+    if fit == "complement":
+        share = 1.0 - share if size > 0 else 0.0
+    return SKILLS_WEIGHT * skills_score + MAJOR_MATCH_BONUS * share
+
+
+def recommended_groups(
+    db, user: dict, limit: int, fit: GroupFit = "match"
+) -> list[tuple[dict, float]]:
+    """Best `limit` open groups `user` is not in, highest fit first."""
+    me = ObjectId(user["_id"])
+    cursor = db["groups"].find(
+        {
+            "member_ids": {"$ne": me},
+            "$expr": HAS_ROOM,
+        },
+        RECOMMENDATION_PROJECTION,
+    )
+    scored = (
+        (group, group_fit(user, group.get("skill_profile"), fit)) for group in cursor
+    )
+    return heapq.nlargest(limit, scored, key=lambda x: x[1])
+
+
+def main(argv: list[str] | None = None) -> None:
+    argparse.ArgumentParser(description=__doc__.splitlines()[1]).parse_args(argv)
+
+    # app.db.connect builds missing profiles at startup, so it imports this module
+    from app.db.connect import DB_NAME, mongo_uri
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    client = MongoClient(mongo_uri())
+    try:
+        rebuild_group_profiles(client[DB_NAME])
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+MinHash / LSH index for approximate Jaccard neighbours.
+
+Each user's canonical skill set is summarized by a MinHash signature of
+`num_perm` values split into `bands` bands. Users whose signatures agree on every
+row of at least one band share a bucket, which happens with probability
+1 - (1 - J^rows)^bands for Jaccard similarity J. The suggestion endpoint's
+approximate mode takes the union of a user's buckets as its shortlist and then
+re-ranks that shortlist with the exact `compute_match_score`.
+
+Like the skill index this is per process, built lazily and kept current through
+app.core.profiles. The build signs users BUILD_BATCH_SIZE at a time: one
+array expression per batch, with each distinct skill hashed once. Filing a
+large directory into the buckets still takes a while, so requests do not wait
+for it: `build_in_background` starts the build on a thread (at startup when
+approximate mode is the default) and approximate requests are served by the
+exact path until it is done. Users without skills have no signature and are never
+shortlisted; major-only matches are what approximate mode gives up.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from collections.abc import Iterable
+from itertools import islice
+
+import numpy as np
+
+from app.core.matching import SCORING_PROJECTION, skills_of
+
+logger = logging.getLogger(__name__)
+
+# Mersenne prime 2^31 - 1: a * h + b stays below 2^63 for 31-bit a, b and h.
+_PRIME = np.uint64((1 << 31) - 1)
+
+# Users signed per array expression while building: bounds the
+# num_perm x skills intermediate (~10 MB at 64 perms and ~5 skills per user).
+BUILD_BATCH_SIZE = 4096
+
+
+def _skill_hash(skill: str) -> int:
+    # Stable across processes, unlike hash(), so signatures are reproducible.
+    digest = hashlib.blake2b(skill.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % int(_PRIME)
+
+
+class MinHashLSH:
+    def __init__(self, num_perm: int = 64, bands: int = 32, seed: int = 3444) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+
+        self._lock = threading.Lock()
+        self._built = False
+        self._build_thread: threading.Thread | None = None
+        self._buckets: list[dict[bytes, set[str]]] = [{} for _ in range(bands)]
+        # user id -> the band keys they were filed under, for removal
+        self._keys: dict[str, list[bytes]] = {}
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def signature(self, skills: Iterable[str]) -> np.ndarray | None:
+        hashes = np.fromiter((_skill_hash(skill) for skill in skills), dtype=np.uint64)
+        if hashes.size == 0:
+            return None
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1)
+
+    def band_keys(self, skills: Iterable[str]) -> list[bytes]:
+        sig = self.signature(skills)
+        if sig is None:
+            return []
+        return [
+            sig[band * self.rows : (band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def batch_band_keys(self, skill_sets: list) -> list[list[bytes]]:
+        """`band_keys` of many skill sets at once; empty sets get no keys."""
+        hash_of: dict[str, int] = {}
+        flat: list[int] = []
+        starts: list[int] = []
+        for skills in skill_sets:
+            if not skills:
+                continue
+            starts.append(len(flat))
+            for skill in skills:
+                h = hash_of.get(skill)
+                if h is None:
+                    h = hash_of[skill] = _skill_hash(skill)
+                flat.append(h)
+        if not starts:
+            return [[] for _ in skill_sets]
+
+        hashes = np.array(flat, dtype=np.uint64)
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _PRIME
+        # column-wise minimum over each set's run of hashes: (sets, num_perm)
+        signatures = np.ascontiguousarray(
+            np.minimum.reduceat(permuted, starts, axis=1).T
+        )
+        # each band's rows as one opaque value, so tolist() yields their bytes
+        keys = iter(signatures.view(f"V{self.rows * 8}").tolist())
+        return [next(keys) if skills else [] for skills in skill_sets]
+
+    def ensure_built(self, db) -> None:
+        if self._built:
+            return
+        with self._lock:
+            # another request may have built it while this one waited
+            if self._built:
+                return
+            self._load(db["users"].find({}, SCORING_PROJECTION))
+
+    def build_in_background(self, db) -> bool:
+        """True once built; until then start one background build and return False."""
+        if self._built:
+            return True
+        with self._lock:
+            if self._built:
+                return True
+            # none started yet, or the last one failed
+            if self._build_thread is None or not self._build_thread.is_alive():
+                self._build_thread = threading.Thread(
+                    target=self._background_build,
+                    args=(db,),
+                    name="lsh-build",
+                    daemon=True,
+                )
+                self._build_thread.start()
+        return False
+
+    def _background_build(self, db) -> None:
+        try:
+            self.ensure_built(db)
+        except Exception:
+            # the next approximate request starts another
+            logger.exception("Building the LSH index failed.")
+
+    def load(self, user_docs: Iterable[dict]) -> None:
+        """(Re)build the index from scoring-projection documents."""
+        with self._lock:
+            self._load(user_docs)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+            self._built = False
+            self._build_thread = None
+
+    def upsert(self, user_doc: dict) -> None:
+        user_id = str(user_doc["_id"])
+        keys = self.band_keys(skills_of(user_doc))
+        # checked under the lock: a build holds it until it is done
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(user_id)
+            self._file(user_id, keys)
+
+    def remove(self, user_id: str) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(str(user_id))
+
+    def candidate_ids(self, user_doc: dict) -> set[str]:
+        """Users sharing at least one band bucket with `user_doc`."""
+        keys = self.band_keys(skills_of(user_doc))
+        ids: set[str] = set()
+        with self._lock:
+            for band, key in enumerate(keys):
+                ids |= self._buckets[band].get(key, set())
+        ids.discard(str(user_doc.get("_id")))
+        return ids
+
+    def _reset(self) -> None:
+        self._buckets = [{} for _ in range(self.bands)]
+        self._keys.clear()
+
+    def _load(self, user_docs: Iterable[dict]) -> None:
+        self._reset()
+        docs = iter(user_docs)
+        while batch := list(islice(docs, BUILD_BATCH_SIZE)):
+            batch_keys = self.batch_band_keys([skills_of(doc) for doc in batch])
+            for doc, keys in zip(batch, batch_keys):
+                self._file(str(doc["_id"]), keys)
+        self._built = True
+
+    def _file(self, user_id: str, keys: list[bytes]) -> None:
+        if not keys:
+            return
+        self._keys[user_id] = keys
+        for buckets, key in zip(self._buckets, keys):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = {user_id}
+            else:
+                bucket.add(user_id)
+
+    def _remove(self, user_id: str) -> None:
+        for band, key in enumerate(self._keys.pop(user_id, ())):
+            bucket = self._buckets[band].get(key)
+            if bucket is None:
+                continue
+            bucket.discard(user_id)
+            if not bucket:
+                del self._buckets[band][key]
+
+
+lsh_index = MinHashLSH(
+    num_perm=int(os.getenv("SUGGESTIONS_LSH_NUM_PERM", "64")),
+    bands=int(os.getenv("SUGGESTIONS_LSH_BANDS", "32")),
+)
@@ -1,9 +1,58 @@
+import heapq
+from array import array
+from collections.abc import Callable, Collection, Iterable
+from enum import Enum
+
+from app.core.skill_vocab import canonical_skill, skill_vocab
+
 SKILLS_WEIGHT = 0.9
 MAJOR_MATCH_BONUS = 0.1
 
+# The only user fields scoring reads; use it to keep ranking queries narrow.
+SCORING_PROJECTION = {"skills_norm": 1, "major": 1}
+
 
 def normalize_set(items: list[str]) -> set[str]:
-    return {item.strip().lower() for item in items}
+    # a blank skill canonicalizes to "", which is no skill (and no Mongo key)
+    return {skill for item in items if (skill := canonical_skill(item))}
+
+
+def major_of(user: dict):
+    # sign_up hands around the Major enum itself; Mongo hands back its plain value
+    major = user.get("major")
+    return major.value if isinstance(major, Enum) else major
+
+
+def skills_of(user: dict) -> Collection[str]:
+    """
+    Canonical skills of a user: the `skills_norm` array persisted on write
+    (see app.core.profiles) when present, otherwise normalized on the fly.
+    Either way the result holds no duplicates.
+    """
+    skills_norm = user.get("skills_norm")
+    if skills_norm is not None:
+        return skills_norm
+    return normalize_set(user.get("skills") or [])
+
+
+def skill_ids_of(user: dict) -> array:
+    """A user's skills as sorted vocabulary ids (see app.core.skill_vocab)."""
+    skill_ids = user.get("skill_ids")
+    if skill_ids is not None:
+        return skill_ids
+    return skill_vocab.ids(skills_of(user))
+
+
+def compact_profile(user: dict) -> dict:
+    """
+    The scoring projection of a user with skills as a sorted id array instead
+    of strings; what in-memory matching state keeps per user.
+    """
+    return {
+        "_id": str(user["_id"]),
+        "skill_ids": skill_ids_of(user),
+        "major": major_of(user),
+    }
 
 
 def jaccard(a: set[str], b: set[str]) -> float:
@@ -12,25 +61,85 @@ def jaccard(a: set[str], b: set[str]) -> float:
     return len(a & b) / len(a | b)
 
 
-def compute_match_score(user_a: dict, user_b: dict) -> float:
-    skills_a = normalize_set(user_a.get("skills", []))
-    skills_b = normalize_set(user_b.get("skills", []))
+def match_scorer(
+    user: dict, weight: Callable[[str], float] | None = None
+) -> Callable[[dict], float]:
+    """
+    Score function for one fixed user. Their skills are built into a set once,
+    and each candidate's sorted skill ids (compact profiles) or deduplicated
+    canonical names (raw documents) are intersected with it in one C-level call,
+    with no per-pair set built in Python.
 
-    skills_score = jaccard(skills_a, skills_b)
+    With `weight` (e.g. `skill_stats.idf`), the skills term is weighted Jaccard:
+    the summed weight of shared skills over the summed weight of all skills, so
+    sharing a rare skill counts for more than sharing a common one.
+    """
+    my_ids = frozenset(skill_ids_of(user))
+    my_names = frozenset(skill_vocab.names(my_ids))
+    my_major = major_of(user)
+    if weight is not None:
+        return _weighted_scorer(my_names, my_major, weight)
 
-    major_bonus = (
-        MAJOR_MATCH_BONUS if user_a.get("major") == user_b.get("major") else 0.0
-    )
+    def score(candidate: dict) -> float:
+        theirs = candidate.get("skill_ids")
+        if theirs is not None:
+            inter = len(my_ids.intersection(theirs))
+        else:
+            # Raw docs (e.g. streamed from Mongo) compare by name, which skips
+            # interning every candidate's skills just to score them.
+            theirs = skills_of(candidate)
+            inter = len(my_names.intersection(theirs))
+        union = len(my_ids) + len(theirs) - inter
+        skills_score = inter / union if union else 0.0
 
-    return SKILLS_WEIGHT * skills_score + major_bonus
+        major_bonus = MAJOR_MATCH_BONUS if major_of(candidate) == my_major else 0.0
+
+        return SKILLS_WEIGHT * skills_score + major_bonus
+
+    return score
+
+
+def _weighted_scorer(
+    my_names: frozenset[str], my_major, weight: Callable[[str], float]
+) -> Callable[[dict], float]:
+    my_weight = sum(weight(skill) for skill in my_names)
+
+    def score(candidate: dict) -> float:
+        skill_ids = candidate.get("skill_ids")
+        theirs = (
+            skill_vocab.names(skill_ids)
+            if skill_ids is not None
+            else skills_of(candidate)
+        )
+        inter = sum(weight(skill) for skill in my_names.intersection(theirs))
+        union = my_weight + sum(weight(skill) for skill in theirs) - inter
+        skills_score = inter / union if union else 0.0
+
+        major_bonus = MAJOR_MATCH_BONUS if major_of(candidate) == my_major else 0.0
+
+        return SKILLS_WEIGHT * skills_score + major_bonus
+
+    return score
+
+
+def compute_match_score(user_a: dict, user_b: dict) -> float:
+    return match_scorer(user_a)(user_b)
 
 
 def get_suggestions(
-    current_user: dict, candidates: list[dict], limit: int = 10
+    current_user: dict,
+    candidates: Iterable[dict],
+    limit: int = 10,
+    weight: Callable[[str], float] | None = None,
 ) -> list[tuple[dict, float]]:
-    scored = [
-        (candidate, compute_match_score(current_user, candidate))
-        for candidate in candidates
-    ]
-    scored.sort(key=lambda x: x[1], reverse=True)
-    return scored[:limit]
+    """
+    Best `limit` candidates, highest score first; ties keep candidate order.
+    `weight` selects weighted Jaccard, as in `match_scorer`.
+
+    Candidates (a list or e.g. a Mongo cursor) are consumed as a stream into a
+    heap of size `limit`, so memory stays O(limit).
+    """
+    score = match_scorer(current_user, weight)
+    scored = ((candidate, score(candidate)) for candidate in candidates)
+    # nlargest is documented as equivalent to sorted(..., reverse=True)[:limit]
+    return heapq.nlargest(limit, scored, key=lambda x: x[1])
@@ -15,6 +15,7 @@ from typing import Any
 from bson import ObjectId
 from pydantic import ValidationError
 from pymongo import ASCENDING, DESCENDING
+from pymongo.cursor import Cursor
 from pymongo.errors import DuplicateKeyError, OperationFailure
 from starlette.websockets import WebSocket
 
@@ -244,9 +245,9 @@ def list_messages_page(
     return batch
 
 
-def list_conversations_for_user(db, user_oid: ObjectId) -> list[dict]:
-    """Conversations that include this user, newest activity first."""
-    return list(
+def conversations_for_user(db, user_oid: ObjectId) -> Cursor:
+    """Cursor over conversations that include this user, newest activity first."""
+    return (
         db["conversations"]
         .find({"participant_ids": user_oid})
         .sort([("last_message_at", DESCENDING), ("updated_at", DESCENDING)])
@@ -272,10 +273,14 @@ class _DmSendResult:
     ok: bool
     message: dict[str, Any] | None = None
     error: _DmSendError | None = None
+    # the other participant, so callers can notify them without a re-read
+    recipient_id: ObjectId | None = None
 
     @classmethod
-    def success(cls, message: dict[str, Any]) -> "_DmSendResult":
-        return cls(ok=True, message=message, error=None)
+    def success(
+        cls, message: dict[str, Any], recipient_id: ObjectId | None = None
+    ) -> "_DmSendResult":
+        return cls(ok=True, message=message, error=None, recipient_id=recipient_id)
 
     @classmethod
     def failure(cls, code: str, message: str) -> "_DmSendResult":
@@ -417,4 +422,6 @@ def try_commit_dm(
     except Exception:
         return _DmSendResult.failure("internal_error", "Could not save message.")
 
-    return _DmSendResult.success(message_doc_to_api_dict(msg_doc))
+    return _DmSendResult.success(
+        message_doc_to_api_dict(msg_doc), other_participant_id(conv, sender_oid)
+    )
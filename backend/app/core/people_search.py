@@ -0,0 +1,217 @@
+"""
+In-process people search: name autocomplete and ranked full-text search.
+
+- Prefix autocomplete over `username` and `full_name` (the whole name and each
+  of its words, lowercased) is a sorted array of (key, user id) pairs. A query
+  is one `bisect` plus a walk over the matching run, so it costs
+  O(log n + matches read), not a scan of the directory.
+- Full-text search over `bio` and `skills` is an inverted index ranked with
+  BM25. Skills count SKILL_TERM_BOOST times as much as bio words. Terms go
+  through `canonical_skill`, so "js" finds "JavaScript".
+
+Hits are small summaries (`SEARCH_HIT_FIELDS`), never whole user documents.
+
+Like the skill index, it is per process. It is built lazily from Mongo on first
+use and then kept current by `profile_saved` / `profile_deleted`.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from collections.abc import Iterable
+
+from app.core.directory import full_name_keys
+from app.core.matching import major_of
+from app.core.skill_vocab import canonical_skill
+
+SKILL_TERM_BOOST = 2.0
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SEARCH_HIT_FIELDS = ("username", "full_name", "major", "avatar_url")
+SEARCH_PROJECTION = {
+    **{field: 1 for field in SEARCH_HIT_FIELDS},
+    "bio": 1,
+    "skills": 1,
+    "skills_norm": 1,
+}
+
+_TOKEN = re.compile(r"[a-z0-9+#.]+")
+
+
+def tokenize(text: str | None) -> list[str]:
+    tokens = (token.strip(".") for token in _TOKEN.findall((text or "").lower()))
+    return [canonical_skill(token) for token in tokens if token]
+
+
+def _skill_terms(user_doc: dict) -> list[str]:
+    skills = user_doc.get("skills_norm")
+    if skills is None:
+        skills = {canonical_skill(skill) for skill in user_doc.get("skills") or []}
+    terms = []
+    for skill in skills:
+        words = tokenize(skill)
+        terms.extend(words)
+        if len(words) > 1:
+            terms.append(skill)  # "machine learning" as one term as well
+    return terms
+
+
+class PeopleSearchIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._built = False
+        self._keys: list[tuple[str, str]] = []  # sorted (prefix key, user id)
+        self._hits: dict[str, dict] = {}
+        # user id -> (their prefix keys, their weighted term frequencies)
+        self._entries: dict[str, tuple[list[str], dict[str, float]]] = {}
+        self._postings: dict[str, dict[str, float]] = {}
+        self._lengths: dict[str, float] = {}
+        self._total_length = 0.0
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ensure_built(self, db) -> None:
+        if self._built:
+            return
+        with self._lock:
+            # another request may have built it while this one waited
+            if self._built:
+                return
+            self._load(db["users"].find({}, SEARCH_PROJECTION))
+
+    def load(self, user_docs: Iterable[dict]) -> None:
+        with self._lock:
+            self._load(user_docs)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+            self._built = False
+
+    def upsert(self, user_doc: dict) -> None:
+        """Index (or re-index) a user. No-op until the index has been built."""
+        user_id = str(user_doc["_id"])
+        # checked under the lock: a build holds it until it is done
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(user_id)
+            self._add(user_id, user_doc, sort=True)
+
+    def remove(self, user_id: str) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(str(user_id))
+
+    def prefix(self, query: str, limit: int) -> list[dict]:
+        """Users whose username or a full-name word starts with `query`."""
+        prefix = " ".join(query.lower().split())
+        if not prefix or limit <= 0:
+            return []
+        found: dict[str, dict] = {}
+        with self._lock:
+            i = bisect.bisect_left(self._keys, (prefix, ""))
+            while i < len(self._keys) and len(found) < limit:
+                key, user_id = self._keys[i]
+                if not key.startswith(prefix):
+                    break
+                found.setdefault(user_id, self._hits[user_id])
+                i += 1
+        return list(found.values())
+
+    def text(self, query: str, limit: int) -> list[tuple[dict, float]]:
+        """Best BM25 matches of `query` against bio and skills, highest first."""
+        terms = set(tokenize(query))
+        phrase = canonical_skill(query)
+        if " " in phrase:
+            terms.add(phrase)
+        if not terms or limit <= 0:
+            return []
+        scores: Counter[str] = Counter()
+        with self._lock:
+            n = len(self._entries)
+            avg_length = self._total_length / n if n else 0.0
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for user_id, tf in postings.items():
+                    norm = 1 - BM25_B + BM25_B * self._lengths[user_id] / avg_length
+                    scores[user_id] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+            best = heapq.nlargest(limit, scores.items(), key=lambda x: x[1])
+            return [(self._hits[user_id], score) for user_id, score in best]
+
+    def _load(self, user_docs: Iterable[dict]) -> None:
+        self._reset()
+        for doc in user_docs:
+            self._add(str(doc["_id"]), doc, sort=False)
+        self._keys.sort()
+        self._built = True
+
+    def _reset(self) -> None:
+        self._keys = []
+        self._hits.clear()
+        self._entries.clear()
+        self._postings.clear()
+        self._lengths.clear()
+        self._total_length = 0.0
+
+    def _add(self, user_id: str, doc: dict, *, sort: bool) -> None:
+        hit = {"_id": user_id, **{field: doc.get(field) for field in SEARCH_HIT_FIELDS}}
+        hit["major"] = major_of(doc)
+        self._hits[user_id] = hit
+
+        keys = sorted(
+            {(doc.get("username") or "").lower(), *full_name_keys(doc.get("full_name"))}
+            - {""}
+        )
+        for key in keys:
+            if sort:
+                bisect.insort(self._keys, (key, user_id))
+            else:
+                self._keys.append((key, user_id))
+
+        tf: Counter[str] = Counter(tokenize(doc.get("bio")))
+        for term in _skill_terms(doc):
+            tf[term] += SKILL_TERM_BOOST
+        for term, weight in tf.items():
+            self._postings.setdefault(term, {})[user_id] = weight
+        length = sum(tf.values())
+        self._lengths[user_id] = length
+        self._total_length += length
+        self._entries[user_id] = (keys, dict(tf))
+
+    def _remove(self, user_id: str) -> None:
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return
+        keys, tf = entry
+        for key in keys:
+            i = bisect.bisect_left(self._keys, (key, user_id))
+            if i < len(self._keys) and self._keys[i] == (key, user_id):
+                del self._keys[i]
+        for term in tf:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(user_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(user_id, 0.0)
+        self._hits.pop(user_id, None)
+
+
+people_index = PeopleSearchIndex()
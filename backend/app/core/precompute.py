@@ -0,0 +1,266 @@
+"""
+Offline suggestion precompute, for warming every user's list before a rush.
+
+Loads every scoring profile and every connection / pending request once, shards
+the users across a process pool, and ranks each user's top SUGGESTION_CACHE_DEPTH
+in the workers (worker-local skill index shortlist, `compute_match_score` via
+`get_suggestions`). The parent bulk-writes each finished shard to the
+`suggestions` collection, one document per user:
+
+    {_id: user oid, run_id, computed_at, ranked: [{user_id, score}, ...]}
+
+Every run is recorded in `suggestion_runs`. `--resume` continues the latest
+unfinished run and skips users that already have a document from it, so an
+interrupted job loses at most the shards that were in flight.
+
+`suggest_users` serves these lists while they are younger than
+SUGGESTIONS_PRECOMPUTED_MAX_AGE_SECONDS. A profile edit discards the edited
+user's document and those of every owner whose cached list it invalidated
+(`profile_saved`), so a dropped cache entry is never refilled from a list
+ranked before the edit; a match request discards the pair's. Other lists are
+tolerated until they age out.
+
+    python -m app.core.precompute --workers 8 [--resume]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from pymongo import DESCENDING, MongoClient, ReplaceOne
+
+from app.core.matching import SCORING_PROJECTION, compact_profile, get_suggestions
+from app.core.skill_index import skill_index
+from app.core.skill_stats import skill_stats, skill_weight
+from app.core.suggestion_cache import SUGGESTION_CACHE_DEPTH, Ranked
+from app.db.connect import DB_NAME, mongo_uri
+from app.models.enums import MatchRequestStatus
+
+logger = logging.getLogger(__name__)
+
+SUGGESTIONS_COLLECTION = "suggestions"
+RUNS_COLLECTION = "suggestion_runs"
+DEFAULT_SHARD_SIZE = 500
+
+PRECOMPUTED_MAX_AGE_SECONDS = float(
+    os.getenv("SUGGESTIONS_PRECOMPUTED_MAX_AGE_SECONDS", str(6 * 60 * 60))
+)
+
+# (user id, ids excluded from their list)
+ShardItem = tuple[str, list[str]]
+
+# Worker-process state, filled once per worker by _init_worker.
+_profiles: dict[str, dict] = {}
+
+
+def load_precomputed(
+    db, user_id: str, max_age_seconds: float = PRECOMPUTED_MAX_AGE_SECONDS
+) -> Ranked | None:
+    """The user's precomputed ranking, or None if missing or older than max age."""
+    doc = db[SUGGESTIONS_COLLECTION].find_one(
+        {"_id": ObjectId(user_id)}, {"computed_at": 1, "ranked": 1}
+    )
+    if doc is None:
+        return None
+    computed_at = doc["computed_at"]
+    if computed_at.tzinfo is None:  # pymongo hands back naive UTC by default
+        computed_at = computed_at.replace(tzinfo=timezone.utc)
+    if datetime.now(timezone.utc) - computed_at > timedelta(seconds=max_age_seconds):
+        return None
+    return [(str(entry["user_id"]), entry["score"]) for entry in doc["ranked"]]
+
+
+def discard_precomputed(db, user_ids: Iterable[str]) -> None:
+    oids = [ObjectId(user_id) for user_id in user_ids]
+    if oids:
+        db[SUGGESTIONS_COLLECTION].delete_many({"_id": {"$in": oids}})
+
+
+def load_exclusions(db) -> dict[str, set[str]]:
+    """user id -> users they are connected to or have a pending request with."""
+    exclusions: dict[str, set[str]] = {}
+    statuses = [MatchRequestStatus.ACCEPTED.value, MatchRequestStatus.PENDING.value]
+    for req in db["match_requests"].find(
+        {"status": {"$in": statuses}}, {"sender_id": 1, "receiver_id": 1}
+    ):
+        sender, receiver = str(req["sender_id"]), str(req["receiver_id"])
+        exclusions.setdefault(sender, set()).add(receiver)
+        exclusions.setdefault(receiver, set()).add(sender)
+    return exclusions
+
+
+def _init_worker(
+    profiles: list[dict], stats: tuple[dict[str, int], int] | None = None
+) -> None:
+    global _profiles
+    _profiles = {str(doc["_id"]): compact_profile(doc) for doc in profiles}
+    skill_index.load(_profiles.values())
+    if stats is not None:
+        skill_stats.restore(*stats)
+
+
+def rank_shard(
+    shard: list[ShardItem], depth: int = SUGGESTION_CACHE_DEPTH
+) -> tuple[list[tuple[str, Ranked]], float]:
+    """
+    Rank every user in `shard` against the worker's population. Returns the
+    rankings and the CPU seconds spent, for the per-core throughput figure.
+    """
+    start = time.process_time()
+    results = []
+    weight = skill_weight()
+    for user_id, excluded in shard:
+        user = _profiles[user_id]
+        candidate_ids = skill_index.candidate_ids(user).difference(excluded)
+        candidates = (_profiles[uid] for uid in candidate_ids)
+        ranked = get_suggestions(user, candidates, limit=depth, weight=weight)
+        results.append((user_id, [(str(doc["_id"]), score) for doc, score in ranked]))
+    return results, time.process_time() - start
+
+
+def _write_shard(db, run_id: ObjectId, results: list[tuple[str, Ranked]]) -> None:
+    now = datetime.now(timezone.utc)
+    ops = [
+        ReplaceOne(
+            {"_id": ObjectId(user_id)},
+            {
+                "run_id": run_id,
+                "computed_at": now,
+                "ranked": [
+                    {"user_id": ObjectId(uid), "score": score} for uid, score in ranked
+                ],
+            },
+            upsert=True,
+        )
+        for user_id, ranked in results
+    ]
+    if ops:
+        db[SUGGESTIONS_COLLECTION].bulk_write(ops, ordered=False)
+
+
+def _start_run(db, resume: bool) -> dict:
+    runs = db[RUNS_COLLECTION]
+    if resume:
+        run = runs.find_one({"status": "running"}, sort=[("started_at", DESCENDING)])
+        if run is not None:
+            return run
+    run = {
+        "_id": ObjectId(),
+        "started_at": datetime.now(timezone.utc),
+        "status": "running",
+    }
+    runs.insert_one(run)
+    return run
+
+
+def run_precompute(
+    db,
+    *,
+    workers: int,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    resume: bool = False,
+) -> dict:
+    """Precompute every pending user's suggestions; returns the run's stats."""
+    run = _start_run(db, resume)
+    done = {
+        str(doc["_id"])
+        for doc in db[SUGGESTIONS_COLLECTION].find({"run_id": run["_id"]}, {"_id": 1})
+    }
+
+    profiles = list(db["users"].find({}, SCORING_PROJECTION))
+    exclusions = load_exclusions(db)
+    stats = None
+    if skill_weight() is not None:
+        skill_stats.ensure_loaded(db)
+        stats = skill_stats.snapshot()
+    pending = [
+        (uid, sorted(exclusions.get(uid, ())))
+        for uid in (str(doc["_id"]) for doc in profiles)
+        if uid not in done
+    ]
+    shards = [
+        pending[start : start + shard_size]
+        for start in range(0, len(pending), shard_size)
+    ]
+    logger.info(
+        "Run %s: %d users, %d already done, %d shards on %d workers.",
+        run["_id"],
+        len(profiles),
+        len(done),
+        len(shards),
+        workers,
+    )
+
+    computed = 0
+    cpu_seconds = 0.0
+    start = time.perf_counter()
+    if shards:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(profiles, stats)
+        ) as pool:
+            futures = [pool.submit(rank_shard, shard) for shard in shards]
+            for future in as_completed(futures):
+                results, busy = future.result()
+                _write_shard(db, run["_id"], results)
+                computed += len(results)
+                cpu_seconds += busy
+                logger.info("%d / %d users written.", computed, len(pending))
+    elapsed = time.perf_counter() - start
+
+    stats = {
+        "run_id": str(run["_id"]),
+        "users": len(profiles),
+        "resumed_from": len(done),
+        "computed": computed,
+        "workers": workers,
+        "elapsed_seconds": elapsed,
+        "users_per_second": computed / elapsed if elapsed else 0.0,
+        "users_per_second_per_core": computed / cpu_seconds if cpu_seconds else 0.0,
+    }
+    db[RUNS_COLLECTION].update_one(
+        {"_id": run["_id"]},
+        {
+            "$set": {
+                "status": "complete",
+                "finished_at": datetime.now(timezone.utc),
+                "stats": stats,
+            }
+        },
+    )
+    return stats
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+    parser.add_argument(
+        "--resume", action="store_true", help="continue the last unfinished run"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    client = MongoClient(mongo_uri())
+    try:
+        stats = run_precompute(
+            client[DB_NAME],
+            workers=args.workers,
+            shard_size=args.shard_size,
+            resume=args.resume,
+        )
+    finally:
+        client.close()
+    sys.stdout.write(json.dumps(stats, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Derived profile fields persisted alongside the raw user fields.
+
+Also home of the hooks that keep in-process state (skill index, LSH index,
+people search index, suggestion cache) in step with profile writes.
+
+`skills_norm` (deduplicated, sorted, normalized skills) is written whenever
+`skills` is, so matching never has to normalize the same profile twice. `major`
+needs no derived field: it is stored as the `Major` value and compared as is.
+`username_lower` and `full_name_keys`
+(the lowercased full name and each of its words) back the directory's indexed
+name-prefix filter. `backfill_profile_fields` is the one-off
+migration for documents written before these fields existed, or before a skill
+alias they use was added.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from pymongo import UpdateOne
+
+from app.core.directory import full_name_keys
+from app.core.lsh import lsh_index
+from app.core.matching import match_scorer, normalize_set
+from app.core.people_search import people_index
+from app.core.skill_index import skill_index
+from app.core.skill_stats import skill_weight
+from app.core.skill_vocab import SKILL_ALIASES
+from app.core.suggestion_cache import SUGGESTION_CACHE_DEPTH, suggestion_cache
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def canonical_skills(skills: list[str] | None) -> list[str]:
+    return sorted(normalize_set(skills or []))
+
+
+def derived_profile_fields(fields: dict) -> dict:
+    """
+    Derived fields to `$set` next to a (partial) user write. Only the fields whose
+    source is present in `fields` are returned.
+    """
+    derived = {}
+    if "skills" in fields:
+        derived["skills_norm"] = canonical_skills(fields["skills"])
+    if "username" in fields:
+        derived["username_lower"] = (fields["username"] or "").lower()
+    if "full_name" in fields:
+        derived["full_name_keys"] = full_name_keys(fields["full_name"])
+    return derived
+
+
+def backfill_profile_fields(db) -> int:
+    """Idempotent migration: fill derived fields on users that predate them."""
+    users = db["users"]
+    ops: list[UpdateOne] = []
+    updated = 0
+    for doc in users.find(
+        {
+            "$or": [
+                {"skills_norm": {"$exists": False}},
+                # aliases, and blank skills once kept as ""
+                {"skills_norm": {"$in": ["", *sorted(SKILL_ALIASES)]}},
+                {"username_lower": {"$exists": False}},
+                {"full_name_keys": {"$exists": False}},
+            ]
+        },
+        {"skills": 1, "username": 1, "full_name": 1},
+    ):
+        fields = {"skills": doc.get("skills")}
+        fields.update({k: doc[k] for k in ("username", "full_name") if k in doc})
+        ops.append(
+            UpdateOne({"_id": doc["_id"]}, {"$set": derived_profile_fields(fields)})
+        )
+        if len(ops) >= BACKFILL_BATCH_SIZE:
+            updated += users.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        updated += users.bulk_write(ops, ordered=False).modified_count
+    # major_code used to be written but was never read; drop it before it goes stale
+    updated += users.update_many(
+        {"major_code": {"$exists": True}}, {"$unset": {"major_code": ""}}
+    ).modified_count
+
+    if updated:
+        logger.info("Backfilled derived profile fields on %d users.", updated)
+    return updated
+
+
+def profile_saved(user_doc: dict, *, scores_changed: bool = True) -> set[str]:
+    """
+    Call after a user is created or edited. Re-indexes them and drops the cached
+    suggestion lists the change can affect: their own, every list they already
+    appear in (their score there changed), and every list they could now enter.
+    An edit that leaves skills and major alone (`scores_changed=False`) changes
+    no score, so it only re-indexes.
+
+    Returns the owners of those lists. Their precomputed lists are just as
+    stale and would be served on the next cache miss, so callers discard them
+    (`discard_precomputed`).
+    """
+    user_id = str(user_doc["_id"])
+    skill_index.upsert(user_doc)
+    lsh_index.upsert(user_doc)
+    people_index.upsert(user_doc)
+    if not scores_changed:
+        return set()
+    stale = {
+        user_id,
+        *suggestion_cache.appearing(user_id),
+        *_lists_user_could_enter(user_doc),
+    }
+    suggestion_cache.invalidate(stale)
+    return stale
+
+
+def profile_deleted(user_id: str) -> set[str]:
+    """Like `profile_saved`, for a deleted user; returns the stale list owners."""
+    user_id = str(user_id)
+    skill_index.remove(user_id)
+    lsh_index.remove(user_id)
+    people_index.remove(user_id)
+    stale = {user_id, *suggestion_cache.appearing(user_id)}
+    suggestion_cache.invalidate(stale)
+    return stale
+
+
+def _lists_user_could_enter(user_doc: dict) -> list[str]:
+    """Cached owners for whom `user_doc` now scores at or above their cutoff."""
+    owners = suggestion_cache.owners()
+    if not owners:
+        return []
+
+    could_enter = []
+    for owner_id in owners & skill_index.candidate_ids(user_doc):
+        owner = skill_index.profile(owner_id)
+        ranked = suggestion_cache.peek(owner_id)
+        if owner is None or ranked is None:
+            continue
+        score = match_scorer(owner, skill_weight())(user_doc)
+        if len(ranked) < SUGGESTION_CACHE_DEPTH or score >= ranked[-1][1]:
+            could_enter.append(owner_id)
+    return could_enter
@@ -0,0 +1,88 @@
+"""
+Fast-path response serialization for documents read from our own collections.
+
+Returning models from a handler costs two full validation passes per object:
+one in `UserRead(**doc)` and another when FastAPI checks the value against
+`response_model`. Documents we wrote ourselves don't need either.
+`model_payload` copies a document into the JSON shape of a response model
+(aliases, field order, defaults) without validating it, and `FastJSONResponse`
+serializes that with orjson. Returning a response object bypasses FastAPI's
+response validation, while the route's `response_model` still documents the
+schema in OpenAPI.
+
+Output matches what the model path produces: ObjectIds and `PyObjectId` fields
+become strings, enums their values, and aware datetimes end in "Z" as pydantic
+writes them.
+
+Only use this for trusted documents. Anything built from request input still
+goes through the models.
+"""
+
+from __future__ import annotations
+
+from enum import Enum
+from functools import cache
+from typing import Any
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(payload: Any) -> bytes:
+    return orjson.dumps(payload, default=_default, option=orjson.OPT_UTC_Z)
+
+
+class FastJSONResponse(JSONResponse):
+    """A JSON response rendered with orjson; the content is not validated."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@cache
+def _fields(model: type[BaseModel]) -> tuple[tuple[str, bool, Any], ...]:
+    """(key in the JSON, required, default factory) per field, in model order."""
+    fields = []
+    for name, field in model.model_fields.items():
+        key = field.alias or name
+        if field.default_factory is not None:
+            default = field.default_factory
+        elif field.default is PydanticUndefined:
+            default = None
+        else:
+            # copy mutable defaults such as [] so payloads never share them
+            default = (lambda value: lambda: _copy(value))(field.default)
+        fields.append((key, field.is_required(), default))
+    return tuple(fields)
+
+
+def _copy(value: Any) -> Any:
+    return value.copy() if isinstance(value, (list, dict)) else value
+
+
+def model_payload(model: type[BaseModel], doc: dict, **values: Any) -> dict:
+    """
+    `doc` in the JSON shape of `model`, unvalidated. `values` set or override
+    fields (e.g. nested payloads). A missing required field raises KeyError.
+    """
+    payload = {}
+    for key, required, default in _fields(model):
+        if key in values:
+            payload[key] = values[key]
+        elif required:
+            payload[key] = doc[key]
+        else:
+            value = doc.get(key)
+            payload[key] = default() if value is None and default else value
+    return payload
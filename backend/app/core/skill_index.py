@@ -0,0 +1,143 @@
+"""
+In-process inverted index used to prune suggestion candidates.
+
+Any candidate that shares no normalized skill and no major with the current user
+scores exactly 0, so the suggestion endpoint only needs to fetch and score the
+union of the current user's posting lists.
+
+Skills are keyed by vocabulary id (app.core.skill_vocab) and each user's indexed
+skills are kept as a compact sorted id array, not a set of strings.
+
+The index is per process: it is built lazily from Mongo on first use and then kept
+current by the routers that write user profiles (`sign_up`, `update_me`,
+`delete_me`). Writes that happen before the first build are picked up by the build;
+writes that land while it is reading `users` wait for it to finish and then apply.
+"""
+
+from __future__ import annotations
+
+import threading
+from array import array
+from collections.abc import Iterable
+
+from app.core.matching import SCORING_PROJECTION, major_of, skill_ids_of, skills_of
+from app.core.skill_vocab import skill_vocab
+
+
+class SkillIndex:
+    """Maps skill id -> user ids and major -> user ids."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._built = False
+        self._by_skill: dict[int, set[str]] = {}
+        self._by_major: dict[str, set[str]] = {}
+        # user id -> (skill ids, major) as indexed, so removals don't need the old doc
+        self._entries: dict[str, tuple[array, str | None]] = {}
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def ensure_built(self, db) -> None:
+        """Load every user's skills and major once per process."""
+        if self._built:
+            return
+        with self._lock:
+            # another request may have built it while this one waited
+            if self._built:
+                return
+            self._load(db["users"].find({}, SCORING_PROJECTION))
+
+    def load(self, user_docs: Iterable[dict]) -> None:
+        """(Re)build the index from scoring-projection documents."""
+        with self._lock:
+            self._load(user_docs)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_skill.clear()
+            self._by_major.clear()
+            self._entries.clear()
+            self._built = False
+
+    def upsert(self, user_doc: dict) -> None:
+        """Index (or re-index) a user. No-op until the index has been built."""
+        user_id = str(user_doc["_id"])
+        # checked under the lock: a build holds it until it is done
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(user_id)
+            self._add(user_id, user_doc)
+
+    def remove(self, user_id: str) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(str(user_id))
+
+    def profile(self, user_id: str) -> dict | None:
+        """The indexed skills/major of a user, as a `compact_profile`."""
+        with self._lock:
+            entry = self._entries.get(str(user_id))
+        if entry is None:
+            return None
+        skill_ids, major = entry
+        return {"_id": str(user_id), "skill_ids": skill_ids, "major": major}
+
+    def candidate_ids(self, user_doc: dict) -> set[str]:
+        """Ids of every other user that can score above 0 against `user_doc`."""
+        skill_ids = user_doc.get("skill_ids")
+        if skill_ids is None:
+            # A skill nobody has been indexed with has no postings; don't intern it.
+            lookups = (skill_vocab.lookup(skill) for skill in skills_of(user_doc))
+            skill_ids = [skill_id for skill_id in lookups if skill_id is not None]
+        major = major_of(user_doc)
+        with self._lock:
+            ids: set[str] = set()
+            for skill_id in skill_ids:
+                ids |= self._by_skill.get(skill_id, set())
+            if major is not None:
+                ids |= self._by_major.get(major, set())
+        ids.discard(str(user_doc.get("_id")))
+        return ids
+
+    def _load(self, user_docs: Iterable[dict]) -> None:
+        self._by_skill.clear()
+        self._by_major.clear()
+        self._entries.clear()
+        for doc in user_docs:
+            self._add(str(doc["_id"]), doc)
+        self._built = True
+
+    def _add(self, user_id: str, doc: dict) -> None:
+        skill_ids = skill_ids_of(doc)
+        major = major_of(doc)
+        self._entries[user_id] = (skill_ids, major)
+        for skill_id in skill_ids:
+            self._by_skill.setdefault(skill_id, set()).add(user_id)
+        if major is not None:
+            self._by_major.setdefault(major, set()).add(user_id)
+
+    def _remove(self, user_id: str) -> None:
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return
+        skill_ids, major = entry
+        for skill_id in skill_ids:
+            _discard_posting(self._by_skill, skill_id, user_id)
+        if major is not None:
+            _discard_posting(self._by_major, major, user_id)
+
+
+def _discard_posting(postings: dict, key, user_id: str) -> None:
+    ids = postings.get(key)
+    if ids is None:
+        return
+    ids.discard(user_id)
+    if not ids:
+        del postings[key]
+
+
+skill_index = SkillIndex()
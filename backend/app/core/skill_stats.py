@@ -0,0 +1,185 @@
+"""
+Skill document frequencies for rarity-weighted (IDF) scoring.
+
+The `skill_stats` collection holds how many users list each canonical skill,
+plus the total number of users:
+
+    {_id: "skill:<name>", count}    {_id: "total:users", count}
+
+It is maintained with `$inc` on sign_up / update_me / delete_me (see
+`record_profile_change`), so nothing ever rescans `users` per request. Each
+process keeps an in-memory mirror that those writes update directly and that
+is reloaded from the collection every SKILL_STATS_REFRESH_SECONDS, to pick up
+writes other processes made. `idf` reads it in O(1) per skill.
+
+Set SUGGESTIONS_SCORING=idf to rank suggestions with IDF-weighted Jaccard.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import Literal
+
+from pymongo import UpdateOne
+
+from app.core.matching import skills_of
+
+logger = logging.getLogger(__name__)
+
+SkillScoring = Literal["jaccard", "idf"]
+
+SUGGESTIONS_SCORING: SkillScoring = os.getenv("SUGGESTIONS_SCORING", "jaccard")
+SKILL_STATS_REFRESH_SECONDS = float(os.getenv("SKILL_STATS_REFRESH_SECONDS", "300"))
+
+SKILL_PREFIX = "skill:"
+TOTAL_USERS_ID = "total:users"
+
+
+class SkillStats:
+    def __init__(
+        self,
+        refresh_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.refresh_seconds = refresh_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counts: dict[str, int] = {}
+        self._total_users = 0
+        self._loaded_at: float | None = None
+
+    @property
+    def total_users(self) -> int:
+        return self._total_users
+
+    def count(self, skill: str) -> int:
+        return self._counts.get(skill, 0)
+
+    def idf(self, skill: str) -> float:
+        """Smoothed inverse document frequency: 1.0 for a skill everyone has."""
+        return math.log((1 + self._total_users) / (1 + self.count(skill))) + 1.0
+
+    def ensure_loaded(self, db) -> None:
+        """Load the mirror on first use, and reload it once it is stale."""
+        loaded_at = self._loaded_at
+        if loaded_at is not None and self._clock() - loaded_at < self.refresh_seconds:
+            return
+        self.load(db["skill_stats"].find({}))
+
+    def load(self, stats_docs: Iterable[dict]) -> None:
+        counts: dict[str, int] = {}
+        total = 0
+        for doc in stats_docs:
+            if doc["_id"] == TOTAL_USERS_ID:
+                total = doc["count"]
+            elif doc["_id"].startswith(SKILL_PREFIX) and doc["count"] > 0:
+                counts[doc["_id"][len(SKILL_PREFIX) :]] = doc["count"]
+        with self._lock:
+            self._counts = counts
+            self._total_users = total
+            self._loaded_at = self._clock()
+
+    def snapshot(self) -> tuple[dict[str, int], int]:
+        """Counts and total, for handing to worker processes."""
+        with self._lock:
+            return dict(self._counts), self._total_users
+
+    def restore(self, counts: dict[str, int], total_users: int) -> None:
+        with self._lock:
+            self._counts = dict(counts)
+            self._total_users = total_users
+            self._loaded_at = self._clock()
+
+    def apply(self, deltas: dict[str, int], users_delta: int) -> None:
+        """Mirror a change already written to Mongo. No-op until loaded."""
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            for skill, delta in deltas.items():
+                count = self._counts.get(skill, 0) + delta
+                if count > 0:
+                    self._counts[skill] = count
+                else:
+                    self._counts.pop(skill, None)
+            self._total_users += users_delta
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts = {}
+            self._total_users = 0
+            self._loaded_at = None
+
+
+skill_stats = SkillStats(refresh_seconds=SKILL_STATS_REFRESH_SECONDS)
+
+
+def skill_weight() -> Callable[[str], float] | None:
+    """Per-skill weight for `match_scorer`, or None for plain Jaccard."""
+    return skill_stats.idf if SUGGESTIONS_SCORING == "idf" else None
+
+
+def record_profile_change(db, before: dict | None, after: dict | None) -> None:
+    """
+    Apply one user's create (before=None), edit, or delete (after=None) to
+    `skill_stats` and the mirror. Only skills that actually changed are written.
+    """
+    old = set(skills_of(before)) if before is not None else set()
+    new = set(skills_of(after)) if after is not None else set()
+    deltas = {skill: 1 for skill in new - old}
+    deltas.update({skill: -1 for skill in old - new})
+    users_delta = (after is not None) - (before is not None)
+
+    ops = [
+        UpdateOne(
+            {"_id": SKILL_PREFIX + skill}, {"$inc": {"count": delta}}, upsert=True
+        )
+        for skill, delta in deltas.items()
+    ]
+    if users_delta:
+        ops.append(
+            UpdateOne(
+                {"_id": TOTAL_USERS_ID}, {"$inc": {"count": users_delta}}, upsert=True
+            )
+        )
+    if not ops:
+        return
+    db["skill_stats"].bulk_write(ops, ordered=False)
+    skill_stats.apply(deltas, users_delta)
+
+
+def ensure_skill_stats(db) -> None:
+    """
+    Startup: build `skill_stats` from `users` if it has never been built, then
+    load the mirror. The build is one aggregation, run once per deployment.
+    """
+    stats = db["skill_stats"]
+    if stats.find_one({"_id": TOTAL_USERS_ID}) is None:
+        counts = db["users"].aggregate(
+            [
+                {"$unwind": "$skills_norm"},
+                {"$group": {"_id": "$skills_norm", "count": {"$sum": 1}}},
+            ]
+        )
+        ops = [
+            UpdateOne(
+                {"_id": SKILL_PREFIX + doc["_id"]},
+                {"$set": {"count": doc["count"]}},
+                upsert=True,
+            )
+            for doc in counts
+        ]
+        ops.append(
+            UpdateOne(
+                {"_id": TOTAL_USERS_ID},
+                {"$set": {"count": db["users"].count_documents({})}},
+                upsert=True,
+            )
+        )
+        stats.bulk_write(ops, ordered=False)
+        logger.info("Built skill_stats for %d skills.", len(ops) - 1)
+    skill_stats.load(stats.find({}))
@@ -0,0 +1,82 @@
+"""
+Skill vocabulary: canonical skill strings interned to dense integer ids.
+
+`canonical_skill` is the one normalization every skill goes through (strip,
+lowercase, resolve aliases such as "js" -> "javascript"), so aliases compare
+equal everywhere: in persisted `skills_norm`, in Python scoring, and in the
+aggregation backend.
+
+In-memory matching state stores a user's skills as a sorted `array("H")` of ids
+instead of a set of strings. Ids are assigned in first-seen order and are only
+meaningful inside one process; never persist them.
+"""
+
+from __future__ import annotations
+
+import threading
+from array import array
+from collections.abc import Iterable
+
+# alias -> canonical name; keys and values are already stripped and lowercase
+SKILL_ALIASES = {
+    "c sharp": "c#",
+    "cpp": "c++",
+    "golang": "go",
+    "js": "javascript",
+    "k8s": "kubernetes",
+    "ml": "machine learning",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "postgres": "postgresql",
+    "py": "python",
+    "python3": "python",
+    "react.js": "react",
+    "reactjs": "react",
+    "ts": "typescript",
+}
+
+# array("H") holds ids below 2^16; a larger vocabulary switches to "I".
+_SHORT_ID_LIMIT = 1 << 16
+
+
+def canonical_skill(skill: str) -> str:
+    name = skill.strip().lower()
+    return SKILL_ALIASES.get(name, name)
+
+
+class SkillVocabulary:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._ids: dict[str, int] = {}
+        self._names: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def intern(self, skill: str) -> int:
+        """Id of a canonical skill, assigning the next free id if it is new."""
+        skill_id = self._ids.get(skill)
+        if skill_id is not None:
+            return skill_id
+        with self._lock:
+            skill_id = self._ids.get(skill)
+            if skill_id is None:
+                skill_id = len(self._names)
+                self._names.append(skill)
+                self._ids[skill] = skill_id
+            return skill_id
+
+    def lookup(self, skill: str) -> int | None:
+        """Id of a canonical skill without interning it."""
+        return self._ids.get(skill)
+
+    def ids(self, skills: Iterable[str]) -> array:
+        """Sorted, deduplicated ids of canonical skills."""
+        ids = sorted({self.intern(skill) for skill in skills})
+        return array("H" if len(self._names) <= _SHORT_ID_LIMIT else "I", ids)
+
+    def names(self, ids: Iterable[int]) -> list[str]:
+        return [self._names[skill_id] for skill_id in ids]
+
+
+skill_vocab = SkillVocabulary()
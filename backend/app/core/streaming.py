@@ -0,0 +1,81 @@
+"""
+Streamed list responses, serialized item by item as the Mongo cursor is read.
+
+List endpoints normally build every model before FastAPI serializes the whole
+list, so memory grows with the result and the first byte waits for the last
+document. A client can opt in to streaming with its `Accept` header:
+
+- `application/x-ndjson`: one JSON object per line;
+- `application/json; stream=array`: the same JSON array the endpoint always
+  returns, byte-compatible with the unstreamed response, sent in chunks.
+
+Anything else gets the regular response. Items are payload dicts from
+`app.core.serialization` (serialized with orjson) or models (serialized with
+the same aliases as `response_model`). The status line and headers go out before the
+first item, so an error while the body is being read cuts the stream short
+(an unterminated array, or a missing final line) rather than turning into a
+500.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from typing import Literal
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.core.serialization import dumps
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+JSON_MEDIA_TYPE = "application/json"
+
+StreamMode = Literal["ndjson", "array"]
+
+
+def stream_mode(request: Request) -> StreamMode | None:
+    """The streaming format the client asked for, or None for a regular response."""
+    for accepted in request.headers.get("accept", "").split(","):
+        media_type, *params = (part.strip().lower() for part in accepted.split(";"))
+        if media_type == NDJSON_MEDIA_TYPE:
+            return "ndjson"
+        if media_type == JSON_MEDIA_TYPE and "stream=array" in params:
+            return "array"
+    return None
+
+
+Item = BaseModel | dict
+
+
+def _encode(item: Item) -> bytes:
+    if isinstance(item, BaseModel):
+        return item.model_dump_json(by_alias=True).encode()
+    return dumps(item)
+
+
+def _ndjson(items: Iterable[Item]) -> Iterator[bytes]:
+    for item in items:
+        yield _encode(item) + b"\n"
+
+
+def _json_array(items: Iterable[Item]) -> Iterator[bytes]:
+    yield b"["
+    separator = b""
+    for item in items:
+        yield separator + _encode(item)
+        separator = b","
+    yield b"]"
+
+
+def streaming_response(
+    items: Iterable[Item], mode: StreamMode, headers: dict | None = None
+) -> StreamingResponse:
+    """`items` should be lazy (a generator over a cursor) for this to pay off."""
+    if mode == "ndjson":
+        return StreamingResponse(
+            _ndjson(items), media_type=NDJSON_MEDIA_TYPE, headers=headers
+        )
+    return StreamingResponse(
+        _json_array(items), media_type=JSON_MEDIA_TYPE, headers=headers
+    )
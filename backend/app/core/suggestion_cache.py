@@ -0,0 +1,136 @@
+"""
+Per-user cache of ranked suggestions (user id + score, never full profiles).
+
+Entries expire after a TTL and the least recently used entry is evicted once the
+cache is full. A reverse index (suggested user -> owners of lists containing them)
+lets profile writes drop exactly the lists they can affect; see
+app.core.profiles for the invalidation rules.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+
+# Lists are cached at the endpoint's max `limit`; smaller limits are slices.
+SUGGESTION_CACHE_DEPTH = 50
+
+Ranked = list[tuple[str, float]]
+
+
+class SuggestionCache:
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # owner id -> (expires_at, ranked); ordered oldest use first
+        self._entries: OrderedDict[str, tuple[float, Ranked]] = OrderedDict()
+        self._appears_in: dict[str, set[str]] = {}
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    def get(self, owner_id: str) -> Ranked | None:
+        with self._lock:
+            entry = self._entries.get(owner_id)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            expires_at, ranked = entry
+            if expires_at <= self._clock():
+                self._drop(owner_id)
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(owner_id)
+            self._counters["hits"] += 1
+            return list(ranked)
+
+    def peek(self, owner_id: str) -> Ranked | None:
+        """Cached list without touching LRU order or counters."""
+        with self._lock:
+            entry = self._entries.get(owner_id)
+            return list(entry[1]) if entry is not None else None
+
+    def put(self, owner_id: str, ranked: Ranked) -> None:
+        with self._lock:
+            self._drop(owner_id)
+            self._entries[owner_id] = (self._clock() + self.ttl_seconds, list(ranked))
+            for user_id, _ in ranked:
+                self._appears_in.setdefault(user_id, set()).add(owner_id)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._counters["evictions"] += 1
+
+    def owners(self) -> set[str]:
+        with self._lock:
+            return set(self._entries)
+
+    def invalidate(self, owner_ids: Iterable[str]) -> int:
+        """Drop the lists owned by `owner_ids`; returns how many were cached."""
+        dropped = 0
+        with self._lock:
+            for owner_id in owner_ids:
+                if self._drop(owner_id):
+                    dropped += 1
+            self._counters["invalidations"] += dropped
+        return dropped
+
+    def appearing(self, user_id: str) -> set[str]:
+        """Owners of the cached lists that contain `user_id`."""
+        with self._lock:
+            return set(self._appears_in.get(user_id, ()))
+
+    def invalidate_appearing(self, user_id: str) -> int:
+        """Drop every cached list that contains `user_id`."""
+        return self.invalidate(self.appearing(user_id))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._appears_in.clear()
+            for key in self._counters:
+                self._counters[key] = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+            }
+
+    def _drop(self, owner_id: str) -> bool:
+        entry = self._entries.pop(owner_id, None)
+        if entry is None:
+            return False
+        for user_id, _ in entry[1]:
+            owners = self._appears_in.get(user_id)
+            if owners is not None:
+                owners.discard(owner_id)
+                if not owners:
+                    del self._appears_in[user_id]
+        return True
+
+
+suggestion_cache = SuggestionCache(
+    max_entries=int(os.getenv("SUGGESTION_CACHE_MAX_ENTRIES", "10000")),
+    ttl_seconds=float(os.getenv("SUGGESTION_CACHE_TTL_SECONDS", "300")),
+)
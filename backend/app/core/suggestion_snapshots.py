@@ -0,0 +1,150 @@
+"""
+Short-lived ranked snapshots behind suggestion cursors.
+
+The first page of `/api/users/suggestions` stores the ranking it was sliced from
+and hands out an opaque cursor (snapshot id + offset). Later pages are slices of
+that same list, so they never overlap or re-rank, even if profiles change while
+the user is scrolling. A snapshot that runs out is extended once from the ranker
+with everything it already holds excluded, which keeps earlier pages stable.
+
+Snapshots expire after a TTL, and the store is capped by the total number of
+ranked entries it holds across all snapshots. Least recently used snapshots are
+evicted first.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from app.core.suggestion_cache import Ranked
+
+# How deep "load more" can go before the feed ends.
+SNAPSHOT_MAX_DEPTH = int(os.getenv("SUGGESTION_SNAPSHOT_MAX_DEPTH", "500"))
+
+
+@dataclass
+class Snapshot:
+    owner_id: str
+    mode: str
+    ranked: Ranked
+    # True once the ranker returned fewer users than asked for
+    exhausted: bool
+    expires_at: float
+
+
+class SuggestionSnapshots:
+    def __init__(
+        self,
+        max_total_entries: int = 200_000,
+        ttl_seconds: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_total_entries = max_total_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._snapshots: OrderedDict[str, Snapshot] = OrderedDict()
+        self._total_entries = 0
+        self._counters = {"created": 0, "evictions": 0, "expirations": 0}
+
+    def create(self, owner_id: str, mode: str, ranked: Ranked, exhausted: bool) -> str:
+        snapshot_id = secrets.token_urlsafe(12)
+        snapshot = Snapshot(
+            owner_id=owner_id,
+            mode=mode,
+            ranked=list(ranked),
+            exhausted=exhausted,
+            expires_at=self._clock() + self.ttl_seconds,
+        )
+        with self._lock:
+            self._snapshots[snapshot_id] = snapshot
+            self._total_entries += len(snapshot.ranked)
+            self._counters["created"] += 1
+            self._enforce_cap()
+        return snapshot_id
+
+    def get(self, snapshot_id: str, owner_id: str) -> Snapshot | None:
+        """The snapshot, if it exists, is unexpired, and belongs to `owner_id`."""
+        with self._lock:
+            snapshot = self._snapshots.get(snapshot_id)
+            if snapshot is None or snapshot.owner_id != owner_id:
+                return None
+            if snapshot.expires_at <= self._clock():
+                self._drop(snapshot_id)
+                self._counters["expirations"] += 1
+                return None
+            self._snapshots.move_to_end(snapshot_id)
+            return snapshot
+
+    def extend(self, snapshot_id: str, more: Ranked, exhausted: bool) -> None:
+        with self._lock:
+            snapshot = self._snapshots.get(snapshot_id)
+            if snapshot is None:
+                return
+            snapshot.ranked.extend(more)
+            snapshot.exhausted = exhausted
+            self._total_entries += len(more)
+            self._enforce_cap(keep=snapshot_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+            self._total_entries = 0
+            for key in self._counters:
+                self._counters[key] = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counters,
+                "snapshots": len(self._snapshots),
+                "total_entries": self._total_entries,
+                "max_total_entries": self.max_total_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+    def _enforce_cap(self, keep: str | None = None) -> None:
+        for snapshot_id in list(self._snapshots):
+            if self._total_entries <= self.max_total_entries:
+                break
+            if snapshot_id == keep:
+                continue
+            self._drop(snapshot_id)
+            self._counters["evictions"] += 1
+
+    def _drop(self, snapshot_id: str) -> None:
+        snapshot = self._snapshots.pop(snapshot_id, None)
+        if snapshot is not None:
+            self._total_entries -= len(snapshot.ranked)
+
+
+def encode_cursor(snapshot_id: str, offset: int) -> str:
+    raw = f"{snapshot_id}:{offset}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int] | None:
+    """(snapshot id, offset), or None if the cursor is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        snapshot_id, offset = raw.rsplit(":", 1)
+        offset = int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if offset < 0 or not snapshot_id:
+        return None
+    return snapshot_id, offset
+
+
+suggestion_snapshots = SuggestionSnapshots(
+    max_total_entries=int(os.getenv("SUGGESTION_SNAPSHOT_MAX_ENTRIES", "200000")),
+    ttl_seconds=float(os.getenv("SUGGESTION_SNAPSHOT_TTL_SECONDS", "600")),
+)
@@ -0,0 +1,189 @@
+"""
+Suggestion ranking backends.
+
+- "python" (default): shortlist from an in-process index (exact inverted index,
+  or MinHash/LSH in approximate mode), stream the shortlist's scoring projection
+  from Mongo through a bounded heap, return (user id, score) pairs.
+- "aggregation": push the whole computation into MongoDB. The pipeline scores
+  with `$setIntersection` / `$setUnion` over `skills_norm`, adds the major bonus,
+  sorts, limits, and returns only `limit` documents projected to `UserRead`.
+
+Select with the SUGGESTIONS_BACKEND environment variable. The aggregation backend
+keeps no in-process state, so its rankings bypass the suggestion cache, and it
+always scores plain Jaccard (SUGGESTIONS_SCORING=idf applies to "python" only).
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Collection
+from typing import Literal
+
+from bson import ObjectId
+from pymongo import ASCENDING
+
+from app.core.lsh import lsh_index
+from app.core.matching import (
+    MAJOR_MATCH_BONUS,
+    SCORING_PROJECTION,
+    SKILLS_WEIGHT,
+    get_suggestions,
+    major_of,
+    skills_of,
+)
+from app.core.skill_index import skill_index
+from app.core.skill_stats import skill_stats, skill_weight
+from app.models.schemas import UserRead
+
+SuggestionMode = Literal["exact", "approximate"]
+SuggestionBackend = Literal["python", "aggregation"]
+
+# "approximate" shortlists candidates via MinHash/LSH instead of the exact index.
+DEFAULT_SUGGESTIONS_MODE: SuggestionMode = os.getenv("SUGGESTIONS_MODE", "exact")
+SUGGESTIONS_BACKEND: SuggestionBackend = os.getenv("SUGGESTIONS_BACKEND", "python")
+
+# Exactly the stored fields UserRead is built from (password, email etc. excluded).
+USER_READ_PROJECTION = {
+    (field.alias or name): 1 for name, field in UserRead.model_fields.items()
+}
+
+
+# Single-field indexes that prefix the directory's `users_major_id` and
+# `users_skills_norm_id`, which serve the candidate `$match` just as well.
+_SUPERSEDED_USER_INDEXES = ("users_skills_norm", "users_major")
+
+
+def ensure_suggestion_indexes(db) -> None:
+    """
+    Indexes for the per-request exclusion query over `match_requests` (one `$or`
+    branch each). The aggregation backend's candidate `$match` uses the `major`
+    and `skills_norm` prefixes of `ensure_directory_indexes`'s compound indexes.
+    """
+    existing = db["users"].index_information()
+    for name in _SUPERSEDED_USER_INDEXES:
+        if name in existing:
+            db["users"].drop_index(name)
+    db["match_requests"].create_index(
+        [("sender_id", ASCENDING), ("status", ASCENDING)],
+        name="match_requests_by_sender",
+    )
+    db["match_requests"].create_index(
+        [("receiver_id", ASCENDING), ("status", ASCENDING)],
+        name="match_requests_by_receiver",
+    )
+
+
+def start_lsh_build(db) -> None:
+    """Startup: when approximate mode is the default, build its index right away."""
+    if DEFAULT_SUGGESTIONS_MODE == "approximate":
+        lsh_index.build_in_background(db)
+
+
+def rank_suggestion_ids(
+    db,
+    current_user: dict,
+    limit: int,
+    mode: SuggestionMode = "exact",
+    exclude: Collection[str] = (),
+) -> list[tuple[str, float]]:
+    """
+    Python backend: best `limit` (user id, score) pairs for `current_user`.
+    Ids in `exclude` are dropped from the shortlist before anything is fetched,
+    so the heap fills from the next-best candidates and still yields `limit`.
+    """
+    if mode == "approximate" and lsh_index.build_in_background(db):
+        # LSH buckets give a shortlist of likely high-Jaccard users. Until they
+        # are built, approximate requests get the exact ranking below.
+        candidate_ids = lsh_index.candidate_ids(current_user)
+    else:
+        # Only users sharing a skill or the major can score above 0; the inverted
+        # index narrows the fetch to those instead of scanning every profile.
+        skill_index.ensure_built(db)
+        candidate_ids = skill_index.candidate_ids(current_user)
+    candidate_oids = [ObjectId(uid) for uid in candidate_ids if uid not in exclude]
+    if not candidate_oids:
+        return []
+
+    weight = skill_weight()
+    if weight is not None:
+        skill_stats.ensure_loaded(db)
+
+    # Stream narrow docs into a bounded heap; memory is O(limit), not O(users).
+    cursor = db["users"].find({"_id": {"$in": candidate_oids}}, SCORING_PROJECTION)
+    ranked = get_suggestions(current_user, cursor, limit=limit, weight=weight)
+    return [(str(doc["_id"]), score) for doc, score in ranked]
+
+
+def match_score_expression(current_user: dict) -> dict:
+    """
+    Aggregation expression equal to `compute_match_score(current_user, $$ROOT)`:
+    same operands, same operation order, so the doubles come out identical.
+    """
+    mine = sorted(set(skills_of(current_user)))
+    theirs = {"$ifNull": ["$skills_norm", []]}
+    return {
+        "$add": [
+            {
+                "$multiply": [
+                    SKILLS_WEIGHT,
+                    {
+                        "$let": {
+                            "vars": {
+                                "inter": {
+                                    "$size": {"$setIntersection": [theirs, mine]}
+                                },
+                                "union": {"$size": {"$setUnion": [theirs, mine]}},
+                            },
+                            "in": {
+                                "$cond": [
+                                    {"$eq": ["$$union", 0]},
+                                    0.0,
+                                    {"$divide": ["$$inter", "$$union"]},
+                                ]
+                            },
+                        }
+                    },
+                ]
+            },
+            {
+                "$cond": [
+                    {"$eq": ["$major", major_of(current_user)]},
+                    MAJOR_MATCH_BONUS,
+                    0.0,
+                ]
+            },
+        ]
+    }
+
+
+def suggestion_pipeline(
+    current_user: dict, limit: int, exclude: Collection[str] = ()
+) -> list[dict]:
+    excluded = [ObjectId(current_user["_id"]), *(ObjectId(uid) for uid in exclude)]
+    mine = sorted(set(skills_of(current_user)))
+    return [
+        # Same pruning as the skill index: only overlap can score above 0.
+        {
+            "$match": {
+                "_id": {"$nin": excluded},
+                "$or": [
+                    {"skills_norm": {"$in": mine}},
+                    {"major": major_of(current_user)},
+                ],
+            }
+        },
+        {"$addFields": {"match_score": match_score_expression(current_user)}},
+        {"$sort": {"match_score": -1, "_id": 1}},
+        {"$limit": limit},
+        {"$project": {**USER_READ_PROJECTION, "match_score": 1}},
+    ]
+
+
+def aggregate_suggestions(
+    db, current_user: dict, limit: int, exclude: Collection[str] = ()
+) -> list[dict]:
+    """Aggregation backend: `UserRead` fields plus `match_score`, best first."""
+    if limit <= 0:
+        return []
+    pipeline = suggestion_pipeline(current_user, limit, exclude)
+    return list(db["users"].aggregate(pipeline))
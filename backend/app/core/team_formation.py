@@ -0,0 +1,403 @@
+"""
+Course-wide team formation: split a course roster into teams at once.
+
+The objective is the total pairwise `compute_match_score` inside teams. Team
+sizes are as even as possible, none above `team_size` (600 students in teams of
+4 give 150 teams of 4; 10 in teams of 4 give 4, 3, 3).
+
+The solver scores every pair once (`SparseScoringEngine.pairwise`), then repeats
+until its time budget runs out:
+
+- greedy seed: open each team with a random unassigned student and keep adding
+  whoever adds the most score to that team;
+- local search: for each student, find the best swap with a student of another
+  team in one vectorized pass and apply it while it improves the total, until a
+  full pass finds nothing.
+
+Restarts run in parallel, one stream per worker process, and the best solution
+wins. The result is printed as proposed teams; `--write` stores them in the
+`group_proposals` staging collection (replacing the course's earlier proposals),
+where the app does not see them. Once reviewed, `--promote` moves them into
+`groups`, each owned by its first member.
+
+    python -m app.core.team_formation "CSCE 3444" --roster roster.txt \
+        --team-size 4 [--budget 2] [--workers 8] [--write]
+    python -m app.core.team_formation "CSCE 3444" --promote
+
+The roster file holds one user id or email per line; emails match in any case.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import MongoClient
+from pymongo.collation import Collation, CollationStrength
+from pymongo.errors import BulkWriteError
+
+from app.core.conditional import initial_version
+from app.core.group_profiles import build_group_profile
+from app.core.matching import SCORING_PROJECTION
+from app.core.sparse_scoring import SparseScoringEngine
+from app.db.connect import DB_NAME, mongo_uri
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET_SECONDS = 2.0
+
+PROPOSALS_COLLECTION = "group_proposals"
+
+# Stored emails keep the case of their local part as typed at sign-up.
+_CASE_INSENSITIVE = Collation("en", strength=CollationStrength.SECONDARY)
+
+# Swaps must gain more than this to count, so float noise can't loop forever.
+_MIN_GAIN = 1e-9
+# How many swap attempts between deadline checks.
+_DEADLINE_STRIDE = 64
+
+
+@dataclass
+class TeamSolution:
+    teams: list[list[int]]  # indices into the scored population
+    objective: float
+    restarts: int
+    elapsed_seconds: float
+
+
+def team_sizes(n: int, team_size: int) -> list[int]:
+    """Fewest teams of at most `team_size`, sizes differing by at most one."""
+    if team_size < 1:
+        raise ValueError("team_size must be at least 1")
+    if n == 0:
+        return []
+    teams = -(-n // team_size)
+    base, extra = divmod(n, teams)
+    return [base + 1] * extra + [base] * (teams - extra)
+
+
+def objective(scores: np.ndarray, assignment: np.ndarray) -> float:
+    """Total score over every pair of students on the same team."""
+    same_team = assignment[:, None] == assignment[None, :]
+    return float(np.triu(np.where(same_team, scores, 0.0), 1).sum())
+
+
+def greedy_seed(
+    scores: np.ndarray, sizes: list[int], rng: np.random.Generator
+) -> np.ndarray:
+    n = len(scores)
+    assignment = np.full(n, -1, dtype=np.int64)
+    unassigned = np.ones(n, dtype=bool)
+    openers = iter(rng.permutation(n))
+    for team, size in enumerate(sizes):
+        opener = next(i for i in openers if unassigned[i])
+        assignment[opener] = team
+        unassigned[opener] = False
+        gain = scores[opener].copy()
+        for _ in range(size - 1):
+            # jitter breaks the many exact ties so restarts explore differently
+            candidates = np.where(unassigned, gain + rng.random(n) * _MIN_GAIN, -np.inf)
+            pick = int(np.argmax(candidates))
+            assignment[pick] = team
+            unassigned[pick] = False
+            gain += scores[pick]
+    return assignment
+
+
+def local_search(
+    scores: np.ndarray,
+    assignment: np.ndarray,
+    teams: int,
+    deadline: float,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Best-improvement swaps, in place, until no swap helps or time is up."""
+    n = len(scores)
+    rows = np.arange(n)
+    # affinity[i, t]: summed score of student i with the members of team t
+    affinity = scores @ np.eye(teams)[assignment]
+    attempts = 0
+    improved = True
+    while improved:
+        improved = False
+        for a in rng.permutation(n):
+            if attempts % _DEADLINE_STRIDE == 0 and time.perf_counter() >= deadline:
+                return assignment
+            attempts += 1
+            home = assignment[a]
+            own = affinity[rows, assignment]
+            gain = (
+                affinity[a, assignment]
+                - affinity[a, home]
+                + affinity[:, home]
+                - own
+                - 2.0 * scores[a]
+            )
+            gain[assignment == home] = -np.inf
+            b = int(np.argmax(gain))
+            if gain[b] <= _MIN_GAIN:
+                continue
+            away = assignment[b]
+            affinity[:, home] += scores[:, b] - scores[:, a]
+            affinity[:, away] += scores[:, a] - scores[:, b]
+            assignment[a], assignment[b] = away, home
+            improved = True
+    return assignment
+
+
+def _restarts(
+    scores: np.ndarray,
+    sizes: list[int],
+    seed: int,
+    budget_seconds: float,
+    max_restarts: int | None,
+) -> tuple[float, np.ndarray, int]:
+    """One worker's restart stream; at least one restart, however small the budget."""
+    rng = np.random.default_rng(seed)
+    deadline = time.perf_counter() + budget_seconds
+    best_value, best = -np.inf, None
+    restarts = 0
+    while best is None or (
+        time.perf_counter() < deadline
+        and (max_restarts is None or restarts < max_restarts)
+    ):
+        assignment = greedy_seed(scores, sizes, rng)
+        local_search(scores, assignment, len(sizes), deadline, rng)
+        value = objective(scores, assignment)
+        restarts += 1
+        if value > best_value:
+            best_value, best = value, assignment
+    return best_value, best, restarts
+
+
+def solve(
+    scores: np.ndarray,
+    team_size: int,
+    *,
+    budget_seconds: float = DEFAULT_BUDGET_SECONDS,
+    workers: int = 1,
+    seed: int = 0,
+    max_restarts: int | None = None,
+) -> TeamSolution:
+    """
+    Teams maximizing total within-team score. `scores` is a symmetric n x n
+    matrix; its diagonal is ignored. `max_restarts` caps each worker's restarts
+    (otherwise they run until the budget is spent).
+    """
+    start = time.perf_counter()
+    scores = np.array(scores, dtype=np.float64)
+    np.fill_diagonal(scores, 0.0)
+    sizes = team_sizes(len(scores), team_size)
+    if not sizes:
+        return TeamSolution([], 0.0, 0, 0.0)
+
+    if workers <= 1:
+        results = [_restarts(scores, sizes, seed, budget_seconds, max_restarts)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    _restarts, scores, sizes, seed + i, budget_seconds, max_restarts
+                )
+                for i in range(workers)
+            ]
+            results = [future.result() for future in futures]
+
+    value, assignment, _ = max(results, key=lambda result: result[0])
+    teams = [np.flatnonzero(assignment == t).tolist() for t in range(len(sizes))]
+    return TeamSolution(
+        teams=teams,
+        objective=value,
+        restarts=sum(result[2] for result in results),
+        elapsed_seconds=time.perf_counter() - start,
+    )
+
+
+def load_roster(db, entries: list[str]) -> tuple[list[dict], list[str]]:
+    """Scoring profiles of the roster (ids or emails), and entries not found."""
+    oids, emails, keys = [], [], []
+    for entry in entries:
+        try:
+            oids.append(ObjectId(entry))
+            keys.append(entry)
+        except (InvalidId, TypeError):
+            emails.append(entry.lower())
+            keys.append(entry.lower())
+    found = list(
+        db["users"].find(
+            {"$or": [{"_id": {"$in": oids}}, {"email": {"$in": emails}}]},
+            {"_id": 1, "email": 1, **SCORING_PROJECTION},
+            collation=_CASE_INSENSITIVE,
+        )
+    )
+    known = {str(user["_id"]) for user in found} | {
+        user["email"].lower() for user in found if user.get("email")
+    }
+    missing = [entry for entry, key in zip(entries, keys) if key not in known]
+    return found, missing
+
+
+def proposed_groups(
+    course_code: str, team_size: int, students: list[dict], teams: list[list[int]]
+) -> list[dict]:
+    """Draft group documents, one per team, owned by their first member."""
+    proposed_at = datetime.now(timezone.utc)
+    groups = []
+    for number, team in enumerate(teams, start=1):
+        member_ids = [students[i]["_id"] for i in team]
+        groups.append(
+            {
+                "name": f"{course_code} Team {number}",
+                "description": f"Proposed team for {course_code}.",
+                "course_code": course_code,
+                "max_members": team_size,
+                "tags": [],
+                "created_by": member_ids[0],
+                "member_ids": member_ids,
+                "proposed_at": proposed_at,
+            }
+        )
+    return groups
+
+
+def write_proposals(db, course_code: str, groups: list[dict]) -> int:
+    """Replace the course's staged proposals with `groups`; returns how many."""
+    proposals = db[PROPOSALS_COLLECTION]
+    proposals.delete_many({"course_code": course_code})
+    if not groups:
+        return 0
+    return len(proposals.insert_many(groups).inserted_ids)
+
+
+def promote_proposals(db, course_code: str) -> int:
+    """
+    Insert the course's staged proposals as live groups in one bulk write and
+    unstage those that landed; returns how many. Skill profiles are counted now,
+    from the members' current documents; members deleted meanwhile are dropped.
+    """
+    proposals = db[PROPOSALS_COLLECTION]
+    drafts = list(proposals.find({"course_code": course_code}))
+    if not drafts:
+        return 0
+    member_ids = [oid for draft in drafts for oid in draft["member_ids"]]
+    members = {
+        user["_id"]: user
+        for user in db["users"].find(
+            {"_id": {"$in": member_ids}}, {"_id": 1, **SCORING_PROJECTION}
+        )
+    }
+    created_at = datetime.now(timezone.utc)
+    groups = []
+    for draft in drafts:
+        group = {key: value for key, value in draft.items() if key != "proposed_at"}
+        group["member_ids"] = [oid for oid in draft["member_ids"] if oid in members]
+        if not group["member_ids"]:
+            continue
+        group["created_by"] = group["member_ids"][0]
+        group["created_at"] = created_at
+        group["skill_profile"] = build_group_profile(
+            members[oid] for oid in group["member_ids"]
+        )
+        group.update(initial_version(created_at))
+        groups.append(group)
+
+    failed: set[int] = set()
+    try:
+        db["groups"].insert_many(groups, ordered=False)
+    except BulkWriteError as exc:
+        # e.g. a team name already taken; the others are still inserted
+        for error in exc.details.get("writeErrors", []):
+            failed.add(error["index"])
+            logger.warning("Group not promoted: %s", error.get("errmsg"))
+    promoted = [group["_id"] for i, group in enumerate(groups) if i not in failed]
+    if promoted:
+        proposals.delete_many({"_id": {"$in": promoted}})
+    return len(promoted)
+
+
+def form_teams(
+    db,
+    course_code: str,
+    roster: list[str],
+    team_size: int,
+    *,
+    budget_seconds: float = DEFAULT_BUDGET_SECONDS,
+    workers: int = 1,
+    write: bool = False,
+) -> dict:
+    students, missing = load_roster(db, roster)
+    if missing:
+        logger.warning("%d roster entries not found: %s", len(missing), missing)
+    scores = SparseScoringEngine(students).pairwise()
+    solution = solve(scores, team_size, budget_seconds=budget_seconds, workers=workers)
+    groups = proposed_groups(course_code, team_size, students, solution.teams)
+    written = write_proposals(db, course_code, groups) if write else 0
+    return {
+        "course_code": course_code,
+        "students": len(students),
+        "missing": missing,
+        "teams": [
+            {"name": group["name"], "member_ids": [str(m) for m in group["member_ids"]]}
+            for group in groups
+        ],
+        "objective": solution.objective,
+        "restarts": solution.restarts,
+        "elapsed_seconds": solution.elapsed_seconds,
+        "written": written,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("course_code")
+    parser.add_argument("--roster", help="one user id or email per line")
+    parser.add_argument("--team-size", type=int)
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--write", action="store_true", help="stage the teams as group proposals"
+    )
+    parser.add_argument(
+        "--promote", action="store_true", help="turn staged proposals into groups"
+    )
+    args = parser.parse_args(argv)
+    if not args.promote and (args.roster is None or args.team_size is None):
+        parser.error("--roster and --team-size are required unless --promote")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    client = MongoClient(mongo_uri())
+    try:
+        if args.promote:
+            report = {
+                "course_code": args.course_code,
+                "promoted": promote_proposals(client[DB_NAME], args.course_code),
+            }
+        else:
+            with open(args.roster) as f:
+                roster = [line.strip() for line in f if line.strip()]
+            report = form_teams(
+                client[DB_NAME],
+                args.course_code,
+                roster,
+                args.team_size,
+                budget_seconds=args.budget,
+                workers=args.workers,
+                write=args.write,
+            )
+    finally:
+        client.close()
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
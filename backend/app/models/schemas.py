@@ -43,6 +43,28 @@ class SuggestionRead(UserRead):
     match_score: float
 
 
+# Batch lookup: ids in, profiles out in request order, unknown ids listed
+class UserBatchRequest(BaseModel):
+    ids: List[str] = Field(min_length=1, max_length=500)
+
+
+class UserBatchRead(BaseModel):
+    users: List[UserRead]
+    missing: List[str] = []
+
+
+# Search hit: just enough to render a result row; score is set for text search
+class UserSearchHit(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: PyObjectId = Field(alias="_id")
+    username: str
+    full_name: str
+    major: Optional[Major] = None
+    avatar_url: Optional[str] = None
+    score: Optional[float] = None
+
+
 # schema for patch aka to edit current user
 class UserUpdate(BaseModel):
     username: Optional[str] = None
@@ -104,6 +126,18 @@ class GroupRead(GroupBase):
     created_at: datetime
 
 
+class GroupRecommendation(GroupBase):
+    """A recommended group: no member documents, just how full it is and the fit."""
+
+    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
+
+    id: Optional[PyObjectId] = Field(alias="_id", default=None)
+    created_by: PyObjectId
+    created_at: datetime
+    member_count: int
+    match_score: float
+
+
 class GroupUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
@@ -2,12 +2,18 @@ import os
 from datetime import datetime, timedelta, timezone
 
 import bcrypt
+from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from pydantic import BaseModel
 from pymongo.errors import DuplicateKeyError
 
+from app.core.auth_cache import auth_cache
+from app.core.conditional import initial_version
+from app.core.precompute import discard_precomputed
+from app.core.profiles import derived_profile_fields, profile_saved
+from app.core.skill_stats import record_profile_change
 from app.db.connect import get_db
 from app.models.schemas import UserCreate, UserRead
 
@@ -16,6 +22,12 @@ router = APIRouter()
 JWT_ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
+# Tokens carry the user id in `sub` and the user's `token_version` in `tv`;
+# bumping the stored version revokes every token issued before. Tokens from
+# before that had the email in `sub`: accepted (and resolved by email) until
+# this is switched off, one token lifetime after the id-based tokens shipped.
+ACCEPT_EMAIL_SUBJECT = os.getenv("ACCEPT_EMAIL_SUBJECT_TOKENS", "1") != "0"
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
@@ -43,27 +55,92 @@ def create_access_token(data: dict) -> str:
     return jwt.encode(to_encode, _get_jwt_secret(), algorithm=JWT_ALGORITHM)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials.",
-        headers={"WWW-Authenticate": "Bearer"},
+def issue_access_token(user: dict) -> str:
+    return create_access_token(
+        {"sub": str(user["_id"]), "tv": user.get("token_version", 0)}
     )
+
+
+def _decode(token: str) -> dict | None:
     try:
         payload = jwt.decode(token, _get_jwt_secret(), algorithms=[JWT_ALGORITHM])
-        email: str | None = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        return None
+    return payload if isinstance(payload.get("sub"), str) else None
+
+
+def _user_id_subject(payload: dict) -> str | None:
+    """The user id in `sub`, or None for a legacy email subject."""
+    subject = payload["sub"]
+    return subject if ObjectId.is_valid(subject) else None
+
+
+def authenticate(token: str, db) -> dict | None:
+    """
+    The user `token` belongs to, or None. Shared by get_current_user and the
+    DM WebSocket; cached per token (see app.core.auth_cache).
+    """
+    cached = auth_cache.get(token)
+    if cached is not None:
+        return cached[1]
+
+    generation = auth_cache.generation()
+    payload = _decode(token)
+    if payload is None:
+        return None
+    user_id = _user_id_subject(payload)
+    if user_id is not None:
+        user = db["users"].find_one({"_id": ObjectId(user_id)})
+    elif ACCEPT_EMAIL_SUBJECT:
+        user = db["users"].find_one({"email": payload["sub"]})
+    else:
+        return None
+    if user is None or user.get("token_version", 0) != payload.get("tv", 0):
+        return None
+    user["_id"] = str(user["_id"])
+    auth_cache.put(token, payload, user, generation)
+    return user
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials.",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
-    user = db["users"].find_one({"email": email})
+
+def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_db)):
+    user = authenticate(token, db)
     if user is None:
-        raise credentials_exception
-    user["_id"] = str(user["_id"])
+        raise _credentials_exception()
     return user
 
 
+def get_current_user_id(token: str = Depends(oauth2_scheme), db=Depends(get_db)) -> str:
+    """
+    Just the caller's id, for endpoints that need nothing else. An id-based
+    token is resolved from its claims alone, with no read of `users`: the
+    signature, `exp` and this process's revocations (app.core.auth_cache) are
+    checked, but a revocation made by another worker only reaches here when
+    the token expires. Legacy email tokens go through `authenticate`.
+    """
+    cached = auth_cache.get(token)
+    if cached is not None:
+        return cached[1]["_id"]
+
+    payload = _decode(token)
+    user_id = _user_id_subject(payload) if payload is not None else None
+    if user_id is None:
+        user = authenticate(token, db) if payload is not None else None
+        if user is None:
+            raise _credentials_exception()
+        return user["_id"]
+    if auth_cache.is_revoked(user_id, payload.get("tv", 0)):
+        raise _credentials_exception()
+    return user_id
+
+
 def hash_password(raw_pass: str) -> str:
     pwd_bytes = raw_pass.encode("utf-8")
     salt = bcrypt.gensalt()
@@ -88,6 +165,8 @@ def sign_up(user: UserCreate, db=Depends(get_db)):
     new_user = user.model_dump()
     new_user["password"] = hash_password(new_user["password"])
     new_user["created_at"] = datetime.now(timezone.utc)
+    new_user.update(initial_version(new_user["created_at"]))
+    new_user.update(derived_profile_fields(new_user))
 
     try:
         result = db["users"].insert_one(new_user)
@@ -97,8 +176,11 @@ def sign_up(user: UserCreate, db=Depends(get_db)):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A user with this email or username already exists.",
         )
+    # a new user has no precomputed list of their own
+    discard_precomputed(db, profile_saved(new_user) - {new_user["_id"]})
+    record_profile_change(db, None, new_user)
 
-    access_token = create_access_token({"sub": new_user["email"]})
+    access_token = issue_access_token(new_user)
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -126,8 +208,23 @@ def login(credentials: OAuth2PasswordRequestForm = Depends(), db=Depends(get_db)
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token = create_access_token({"sub": user_db["email"]})
+    access_token = issue_access_token(user_db)
     return {
         "access_token": access_token,
         "token_type": "bearer",
     }
+
+
+# auth cache counters, for sizing the cache
+@router.get("/cache/stats")
+def auth_cache_stats(current_user=Depends(get_current_user)):
+    return auth_cache.stats()
+
+
+# revoke every token issued to the current user, this one included
+@router.post("/logout-all", status_code=status.HTTP_200_OK)
+def logout_all(current_user=Depends(get_current_user), db=Depends(get_db)):
+    user_oid = ObjectId(current_user["_id"])
+    db["users"].update_one({"_id": user_oid}, {"$inc": {"token_version": 1}})
+    auth_cache.revoke(current_user["_id"], current_user.get("token_version", 0) + 1)
+    return {"detail": "All sessions signed out"}
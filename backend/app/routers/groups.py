@@ -1,16 +1,45 @@
 from datetime import datetime, timezone
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pymongo import ReturnDocument
 from pymongo.errors import DuplicateKeyError
 
+from app.core.conditional import (
+    VERSION_FIELDS,
+    conditional_response,
+    initial_version,
+    validators,
+    versioned,
+)
+from app.core.group_profiles import (
+    HAS_ROOM,
+    MEMBER_COUNT,
+    GroupFit,
+    build_group_profile,
+    membership_inc,
+    recommended_groups,
+)
+from app.core.matching import SCORING_PROJECTION
+from app.core.serialization import FastJSONResponse, model_payload
+from app.core.streaming import stream_mode, streaming_response
+from app.core.suggestions import USER_READ_PROJECTION
 from app.db.connect import get_db
-from app.models.schemas import GroupCreate, GroupRead, GroupUpdate, UserRead
+from app.models.schemas import (
+    GroupCreate,
+    GroupRead,
+    GroupRecommendation,
+    GroupUpdate,
+    UserRead,
+)
 from app.routers.auth import get_current_user
 from app.routers.match import get_connection_ids
 
 router = APIRouter()
 
+# UserRead's fields plus what the group's validators need (app.core.conditional)
+MEMBER_PROJECTION = {**USER_READ_PROJECTION, **VERSION_FIELDS}
+
 
 def _resolve_invite_oids(
     invite_user_ids_raw: list[str],
@@ -51,31 +80,50 @@ def _require_connected(inviter_oid: ObjectId, target_oids: list[ObjectId], db) -
         )
 
 
-def _require_users_exist(target_oids: list[ObjectId], db) -> None:
-    """Raise 404 if any target user document is missing."""
+def _require_users_exist(target_oids: list[ObjectId], db) -> list[dict]:
+    """Raise 404 if any target user document is missing; return their scoring fields."""
     if not target_oids:
-        return
-    found = db["users"].find({"_id": {"$in": target_oids}}, {"_id": 1})
+        return []
+    found = list(
+        db["users"].find(
+            {"_id": {"$in": target_oids}}, {"_id": 1, **SCORING_PROJECTION}
+        )
+    )
     found_ids = {u["_id"] for u in found}
     if any(oid not in found_ids for oid in target_oids):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="One or more selected users not found.",
         )
+    return found
+
+
+def _member_profile(db, user_oid: ObjectId) -> dict:
+    """
+    The user's stored scoring fields, for the group's skill_profile `$inc`.
+    Not current_user: another process's auth cache may predate their last edit.
+    """
+    member = db["users"].find_one({"_id": user_oid}, SCORING_PROJECTION)
+    if member is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found.",
+        )
+    return member
 
 
 # Helpers:
-def _group_doc_to_group_read(group_doc: dict, members: list[UserRead]) -> GroupRead:
-    return GroupRead(
-        _id=str(group_doc["_id"]),
-        created_by=str(group_doc["created_by"]),
-        members=members,
-        created_at=group_doc["created_at"],
-        name=group_doc["name"],
-        description=group_doc["description"],
-        course_code=group_doc.get("course_code"),
-        max_members=group_doc["max_members"],
-        tags=group_doc.get("tags", []),
+# Group responses are built from our own documents: payloads, not models
+# (see app.core.serialization).
+def _group_payload(group_doc: dict, member_docs: list[dict]) -> dict:
+    members = [model_payload(UserRead, doc) for doc in member_docs]
+    return model_payload(GroupRead, group_doc, members=members)
+
+
+def _group_response(db, group_doc: dict, status_code: int = 200) -> FastJSONResponse:
+    member_docs = _member_docs(db, group_doc.get("member_ids", []))
+    return FastJSONResponse(
+        _group_payload(group_doc, member_docs), status_code=status_code
     )
 
 
@@ -99,15 +147,42 @@ def _get_group_doc_or_404(db, oid: ObjectId) -> dict:
     return group_doc
 
 
-def _fetch_members_as_user_reads(db, member_ids: list) -> list[UserRead]:
+def _member_docs(db, member_ids: list) -> list[dict]:
+    """Members in `member_ids` order (not the `$in` query's); deleted ones skipped."""
     if not member_ids:
         return []
     user_filter = {"_id": {"$in": member_ids}}
-    members = []
-    for user_doc in db["users"].find(user_filter):
-        user_doc["_id"] = str(user_doc["_id"])
-        members.append(UserRead(**user_doc))
-    return members
+    docs = {doc["_id"]: doc for doc in db["users"].find(user_filter, MEMBER_PROJECTION)}
+    return [docs[oid] for oid in member_ids if oid in docs]
+
+
+# Membership writes are a single find_one_and_update whose filter carries the
+# preconditions; only when it matches nothing is the group read again, to say why.
+def _add_member(db, oid: ObjectId, user_oid: ObjectId, member: dict) -> dict:
+    """Add `member` (user_oid) if not in the group and it has room; the group after."""
+    group_doc = db["groups"].find_one_and_update(
+        {"_id": oid, "member_ids": {"$ne": user_oid}, "$expr": HAS_ROOM},
+        versioned(
+            {
+                "$addToSet": {"member_ids": user_oid},
+                "$inc": membership_inc(member, 1),
+            }
+        ),
+        return_document=ReturnDocument.AFTER,
+    )
+    if group_doc is not None:
+        return group_doc
+
+    group_doc = _get_group_doc_or_404(db, oid)
+    if user_oid in group_doc.get("member_ids", []):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="User already in group.",
+        )
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Group is full.",
+    )
 
 
 def _require_group_owner(
@@ -152,11 +227,14 @@ def create_group(
                 detail="Too many members for group size.",
             )
         _require_connected(creator_oid, invite_oids, db)
-        _require_users_exist(invite_oids, db)
+    # the creator's stored profile too, as for joins (see `_member_profile`)
+    members = _require_users_exist([creator_oid, *invite_oids], db)
 
     group_dict["created_by"] = creator_oid  # current users id
     group_dict["created_at"] = datetime.now(timezone.utc)
     group_dict["member_ids"] = [creator_oid, *invite_oids]
+    group_dict.update(initial_version(group_dict["created_at"]))
+    group_dict["skill_profile"] = build_group_profile(members)
 
     # inserting to MongoDb
     try:
@@ -173,36 +251,65 @@ def create_group(
         )
 
     group_dict["_id"] = result.inserted_id  # id for the group
-    group_dict["_id"] = str(group_dict["_id"])
 
-    members = _fetch_members_as_user_reads(db, group_dict["member_ids"])
-    group_read = _group_doc_to_group_read(group_doc=group_dict, members=members)
-    return group_read
+    return _group_response(db, group_dict, status_code=status.HTTP_201_CREATED)
+
 
+def _group_payloads(db, group_docs):
+    for group_doc in group_docs:
+        member_docs = _member_docs(db, group_doc.get("member_ids", []))
+        yield _group_payload(group_doc, member_docs)
 
-# List all groups
+
+# List all groups; streams when asked to via Accept (see app.core.streaming)
 @router.get("/", response_model=list[GroupRead])
-def list_groups(db=Depends(get_db), current_user=Depends(get_current_user)):
-    list_of_groups = []
+def list_groups(
+    request: Request, db=Depends(get_db), current_user=Depends(get_current_user)
+):
     groups_cursor = db["groups"].find({})
+    mode = stream_mode(request)
+    if mode is not None:
+        return streaming_response(_group_payloads(db, groups_cursor), mode)
+    return FastJSONResponse(list(_group_payloads(db, groups_cursor)))
 
-    for group_doc in groups_cursor:
-        members = _fetch_members_as_user_reads(db, group_doc.get("member_ids", []))
-        group_read = _group_doc_to_group_read(group_doc=group_doc, members=members)
-        list_of_groups.append(group_read)
 
-    return list_of_groups
+# open groups ranked for the current user; declared before /{group_id}
+@router.get("/recommended", response_model=list[GroupRecommendation])
+def recommend_groups(
+    limit: int = Query(10, ge=1, le=50),
+    fit: GroupFit = Query("match"),
+    db=Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    return FastJSONResponse(
+        [
+            model_payload(
+                GroupRecommendation,
+                group_doc,
+                member_count=group_doc.get("member_count", 0),
+                match_score=round(score, 4),
+            )
+            for group_doc, score in recommended_groups(db, current_user, limit, fit)
+        ]
+    )
 
 
-# single group by id
+# single group by id; ETag / Last-Modified cover the group and its members
 @router.get("/{group_id}", response_model=GroupRead)
 def get_group_by_id(
-    group_id: str, db=Depends(get_db), current_user=Depends(get_current_user)
+    group_id: str,
+    request: Request,
+    db=Depends(get_db),
+    current_user=Depends(get_current_user),
 ):
     oid = _parse_group_id(group_id)
     group_doc = _get_group_doc_or_404(db, oid)
-    members = _fetch_members_as_user_reads(db, group_doc.get("member_ids", []))
-    return _group_doc_to_group_read(group_doc=group_doc, members=members)
+    member_docs = _member_docs(db, group_doc.get("member_ids", []))
+    return conditional_response(
+        request,
+        validators(group_doc, *member_docs),
+        lambda: _group_payload(group_doc, member_docs),
+    )
 
 
 # update group details
@@ -220,23 +327,28 @@ def update_group(
             status_code=status.HTTP_400_BAD_REQUEST, detail="No fields provided."
         )
 
+    too_small = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="max_members cannot be less than current member count.",
+    )
+    group_filter = {"_id": oid}
     if "max_members" in update_data:
         current_member_count = len(group_doc.get("member_ids", []))
         if update_data["max_members"] < current_member_count:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="max_members cannot be less than current member count.",
-            )
-
-    db["groups"].update_one({"_id": oid}, {"$set": update_data})
-    updated_group_doc = db["groups"].find_one({"_id": oid})
+            raise too_small
+        # members may join between the check above and the write
+        group_filter["$expr"] = {"$lte": [MEMBER_COUNT, update_data["max_members"]]}
+
+    updated_group_doc = db["groups"].find_one_and_update(
+        group_filter,
+        versioned({"$set": update_data}),
+        return_document=ReturnDocument.AFTER,
+    )
     if not updated_group_doc:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Group not found."
-        )
+        _get_group_doc_or_404(db, oid)
+        raise too_small
 
-    members = _fetch_members_as_user_reads(db, updated_group_doc.get("member_ids", []))
-    return _group_doc_to_group_read(group_doc=updated_group_doc, members=members)
+    return _group_response(db, updated_group_doc)
 
 
 # delete group
@@ -255,36 +367,10 @@ def add_member(
     group_id: str, db=Depends(get_db), current_user=Depends(get_current_user)
 ):
     oid = _parse_group_id(group_id)
-    group_doc = _get_group_doc_or_404(db, oid)
     current_user_oid = ObjectId(current_user["_id"])
-    member_ids = group_doc.get("member_ids", [])
-
-    if current_user_oid in member_ids:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="User already in group.",
-        )
-
-    # checking length of group
-    group_max_members = group_doc["max_members"]
-    if len(member_ids) >= group_max_members:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Group is full.",
-        )
-
-    db["groups"].update_one(
-        {"_id": oid},
-        {"$addToSet": {"member_ids": current_user_oid}},
-    )
-    updated_group_doc = db["groups"].find_one({"_id": oid})
-    if not updated_group_doc:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Group not found.",
-        )
-    members = _fetch_members_as_user_reads(db, updated_group_doc.get("member_ids", []))
-    return _group_doc_to_group_read(group_doc=updated_group_doc, members=members)
+    member = _member_profile(db, current_user_oid)
+    updated_group_doc = _add_member(db, oid, current_user_oid, member)
+    return _group_response(db, updated_group_doc)
 
 
 @router.post("/{group_id}/leave", response_model=GroupRead)
@@ -292,37 +378,37 @@ def leave_group(
     group_id: str, db=Depends(get_db), current_user=Depends(get_current_user)
 ):
     oid = _parse_group_id(group_id)
-    group_doc = _get_group_doc_or_404(db, oid)
     current_user_oid = ObjectId(current_user["_id"])
-    member_ids = group_doc.get("member_ids", [])
+    member = _member_profile(db, current_user_oid)
+
+    updated_group_doc = db["groups"].find_one_and_update(
+        {
+            "_id": oid,
+            "member_ids": current_user_oid,
+            "created_by": {"$ne": current_user_oid},
+        },
+        versioned(
+            {
+                "$pull": {"member_ids": current_user_oid},
+                "$inc": membership_inc(member, -1),
+            }
+        ),
+        return_document=ReturnDocument.AFTER,
+    )
+    if updated_group_doc is not None:
+        return _group_response(db, updated_group_doc)
 
+    group_doc = _get_group_doc_or_404(db, oid)
     if group_doc["created_by"] == current_user_oid:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Owner cannot leave the group. Delete the group or transfer ownership first.",
         )
-
-    if current_user_oid not in member_ids:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User is not a member of this group.",
-        )
-
-    db["groups"].update_one(
-        {"_id": oid},
-        {"$pull": {"member_ids": current_user_oid}},
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="User is not a member of this group.",
     )
 
-    updated_group_doc = db["groups"].find_one({"_id": oid})
-
-    if not updated_group_doc:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Group not found.",
-        )
-    members = _fetch_members_as_user_reads(db, updated_group_doc.get("member_ids", []))
-    return _group_doc_to_group_read(group_doc=updated_group_doc, members=members)
-
 
 # owner adds a connection directly to the group
 @router.post("/{group_id}/members/{user_id}", response_model=GroupRead)
@@ -336,6 +422,8 @@ def add_member_as_owner(
 
     user_oid = _resolve_invite_oids([user_id], owner_oid)[0]
 
+    # fail early from the document the owner check loaded; `_add_member`
+    # checks again against the current one
     member_ids = group_doc.get("member_ids", [])
     if user_oid in member_ids:
         raise HTTPException(
@@ -350,17 +438,7 @@ def add_member_as_owner(
         )
 
     _require_connected(owner_oid, [user_oid], db)
-    _require_users_exist([user_oid], db)
+    (new_member,) = _require_users_exist([user_oid], db)
 
-    db["groups"].update_one(
-        {"_id": oid},
-        {"$addToSet": {"member_ids": user_oid}},
-    )
-    updated_group_doc = db["groups"].find_one({"_id": oid})
-    if not updated_group_doc:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Group not found.",
-        )
-    members = _fetch_members_as_user_reads(db, updated_group_doc.get("member_ids", []))
-    return _group_doc_to_group_read(group_doc=updated_group_doc, members=members)
+    updated_group_doc = _add_member(db, oid, user_oid, new_member)
+    return _group_response(db, updated_group_doc)
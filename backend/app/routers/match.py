@@ -3,7 +3,12 @@ from typing import Literal
 
 from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException, status
+from pymongo import ReturnDocument
 
+from app.core.precompute import discard_precomputed
+from app.core.serialization import FastJSONResponse, model_payload
+from app.core.suggestion_cache import suggestion_cache
+from app.core.suggestions import USER_READ_PROJECTION
 from app.db.connect import get_db
 from app.models.enums import MatchRequestStatus
 from app.models.schemas import (
@@ -34,42 +39,48 @@ def _serialize_match_request_doc(req: dict) -> dict:
     return req
 
 
-def _get_pending_request_for_receiver(
-    request_id: str,
-    current_user: dict,
-    db,
-    action: str,
-):
-    request_oid = _parse_object_id(request_id, "request id")
-
-    match_request = db["match_requests"].find_one({"_id": request_oid})
+def _pending_request_error(
+    request_oid: ObjectId, receiver_oid: ObjectId, db, action: str
+) -> HTTPException:
+    """Why a conditional update of a pending request matched nothing."""
+    match_request = db["match_requests"].find_one(
+        {"_id": request_oid}, {"receiver_id": 1, "status": 1}
+    )
     if not match_request:
-        raise HTTPException(
+        return HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Match request not found.",
         )
 
-    receiver_oid = ObjectId(current_user["_id"])
     if match_request["receiver_id"] != receiver_oid:
-        raise HTTPException(
+        return HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"You can only {action} requests sent to you.",
         )
 
-    if match_request["status"] != MatchRequestStatus.PENDING.value:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="This request has already been processed.",
-        )
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="This request has already been processed.",
+    )
 
-    return request_oid, receiver_oid
+
+def _user_payloads(db, user_oids) -> dict[ObjectId, dict]:
+    """UserRead payloads for `user_oids`, in one query; missing users are absent."""
+    if not user_oids:
+        return {}
+    return {
+        user["_id"]: model_payload(UserRead, user)
+        for user in db["users"].find(
+            {"_id": {"$in": list(user_oids)}}, USER_READ_PROJECTION
+        )
+    }
 
 
 def _get_requests_for_user(
     current_user: dict,
     db,
     direction: Literal["incoming", "outgoing"],
-) -> list[MatchRequestWithUser]:
+) -> FastJSONResponse:
     current_user_oid = ObjectId(current_user["_id"])
     is_incoming = direction == "incoming"
 
@@ -77,31 +88,26 @@ def _get_requests_for_user(
     counterpart_field = "sender_id" if is_incoming else "receiver_id"
     counterpart_payload_key = "sender" if is_incoming else "receiver"
 
-    request_cursor = db["match_requests"].find(
-        {
-            filter_field: current_user_oid,
-            "status": MatchRequestStatus.PENDING.value,
-        }
+    requests = list(
+        db["match_requests"].find(
+            {
+                filter_field: current_user_oid,
+                "status": MatchRequestStatus.PENDING.value,
+            }
+        )
+    )
+    counterparts = _user_payloads(db, {req[counterpart_field] for req in requests})
+
+    return FastJSONResponse(
+        [
+            model_payload(
+                MatchRequestWithUser,
+                req,
+                **{counterpart_payload_key: counterparts.get(req[counterpart_field])},
+            )
+            for req in requests
+        ]
     )
-
-    requests_list = []
-    for req in request_cursor:
-        req = _serialize_match_request_doc(req)
-        counterpart_id = req[counterpart_field]
-
-        counterpart_user = db["users"].find_one({"_id": ObjectId(counterpart_id)})
-        counterpart_user_obj = None
-        if counterpart_user:
-            counterpart_user["_id"] = str(counterpart_user["_id"])
-            counterpart_user_obj = UserRead(**counterpart_user)
-
-        payload = {
-            **req,
-            counterpart_payload_key: counterpart_user_obj,
-        }
-        requests_list.append(MatchRequestWithUser(**payload))
-
-    return requests_list
 
 
 @router.post("/match/request/{receiver_id}", response_model=MatchRequestRead)
@@ -159,6 +165,9 @@ def send_match_request(
 
     result = db["match_requests"].insert_one(match_request)
     match_request["_id"] = result.inserted_id
+    # both sides' cached suggestion lists were built without this request
+    suggestion_cache.invalidate([str(sender_oid), str(receiver_oid)])
+    discard_precomputed(db, [str(sender_oid), str(receiver_oid)])
     match_request = _serialize_match_request_doc(match_request)
 
     return MatchRequestRead(**match_request)
@@ -195,14 +204,12 @@ def update_match_request(
         "accept" if request_update.status == MatchRequestStatus.ACCEPTED else "reject"
     )
 
-    request_oid, receiver_oid = _get_pending_request_for_receiver(
-        request_id=request_id,
-        current_user=current_user,
-        db=db,
-        action=action,
-    )
+    request_oid = _parse_object_id(request_id, "request id")
+    receiver_oid = ObjectId(current_user["_id"])
 
-    update_result = db["match_requests"].update_one(
+    # one round trip when it goes through; the request is only read again to
+    # report why it did not
+    updated_request = db["match_requests"].find_one_and_update(
         {
             "_id": request_oid,
             "receiver_id": receiver_oid,
@@ -214,44 +221,51 @@ def update_match_request(
                 "updated_at": datetime.now(UTC),
             }
         },
+        return_document=ReturnDocument.AFTER,
     )
+    if updated_request is None:
+        raise _pending_request_error(request_oid, receiver_oid, db, action)
 
-    if update_result.modified_count == 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="This request has already been processed.",
-        )
-
-    updated_request = db["match_requests"].find_one({"_id": request_oid})
     updated_request = _serialize_match_request_doc(updated_request)
+    # a rejected pair becomes suggestible again
+    pair = [updated_request["sender_id"], updated_request["receiver_id"]]
+    suggestion_cache.invalidate(pair)
+    discard_precomputed(db, pair)
 
     return MatchRequestRead(**updated_request)
 
 
-def get_connection_ids(user_oid: ObjectId, db) -> set[ObjectId]:
-    """Return ObjectIds of users with an accepted MatchRequest with user_oid."""
-    accepted_requests = db["match_requests"].find(
+def _counterpart_ids(
+    user_oid: ObjectId, db, statuses: list[MatchRequestStatus]
+) -> set[ObjectId]:
+    """Users on the other side of user_oid's match requests in `statuses`."""
+    requests = db["match_requests"].find(
         {
-            "$or": [
-                {
-                    "sender_id": user_oid,
-                    "status": MatchRequestStatus.ACCEPTED.value,
-                },
-                {
-                    "receiver_id": user_oid,
-                    "status": MatchRequestStatus.ACCEPTED.value,
-                },
-            ]
-        }
+            "$or": [{"sender_id": user_oid}, {"receiver_id": user_oid}],
+            "status": {"$in": [s.value for s in statuses]},
+        },
+        {"sender_id": 1, "receiver_id": 1},
     )
 
-    connection_ids: set[ObjectId] = set()
-    for req in accepted_requests:
+    counterpart_ids: set[ObjectId] = set()
+    for req in requests:
         other_user_id = (
             req["receiver_id"] if req["sender_id"] == user_oid else req["sender_id"]
         )
-        connection_ids.add(other_user_id)
-    return connection_ids
+        counterpart_ids.add(other_user_id)
+    return counterpart_ids
+
+
+def get_connection_ids(user_oid: ObjectId, db) -> set[ObjectId]:
+    """Return ObjectIds of users with an accepted MatchRequest with user_oid."""
+    return _counterpart_ids(user_oid, db, [MatchRequestStatus.ACCEPTED])
+
+
+def get_suggestion_exclusion_ids(user_oid: ObjectId, db) -> set[ObjectId]:
+    """Users not worth suggesting: already connected, or a request is pending."""
+    return _counterpart_ids(
+        user_oid, db, [MatchRequestStatus.ACCEPTED, MatchRequestStatus.PENDING]
+    )
 
 
 @router.get("/match/connections", response_model=list[UserRead])
@@ -261,12 +275,4 @@ def get_connections(
 ):
     current_user_oid = ObjectId(current_user["_id"])
     connection_ids = get_connection_ids(current_user_oid, db)
-
-    connections = []
-    for other_oid in connection_ids:
-        user = db["users"].find_one({"_id": other_oid})
-        if user:
-            user["_id"] = str(user["_id"])
-            connections.append(UserRead(**user))
-
-    return connections
+    return FastJSONResponse(list(_user_payloads(db, connection_ids).values()))
@@ -1,5 +1,7 @@
 # sender uses POST response; receiver uses WS + GET.
 import json
+from collections.abc import Iterable, Iterator
+from itertools import islice
 
 from bson import ObjectId
 from fastapi import (
@@ -7,24 +9,26 @@ from fastapi import (
     Depends,
     HTTPException,
     Query,
+    Request,
     WebSocket,
     WebSocketDisconnect,
     status,
 )
 from fastapi.encoders import jsonable_encoder
-from jose import JWTError, jwt
 
 from app.core.messaging import (
     connection_manager,
     conversation_has_participant,
+    conversations_for_user,
     get_or_create_conversation,
-    list_conversations_for_user,
     list_messages_page,
     message_doc_to_api_dict,
-    other_participant_id,
     try_commit_dm,
     try_delete_dm_message,
 )
+from app.core.serialization import FastJSONResponse, model_payload
+from app.core.streaming import stream_mode, streaming_response
+from app.core.suggestions import USER_READ_PROJECTION
 from app.db.connect import get_db
 from app.models.schemas import (
     ConversationRead,
@@ -33,7 +37,7 @@ from app.models.schemas import (
     MessageRead,
     UserRead,
 )
-from app.routers.auth import JWT_ALGORITHM, _get_jwt_secret, get_current_user
+from app.routers.auth import authenticate, get_current_user_id
 
 router = APIRouter()
 
@@ -43,27 +47,31 @@ ERR_INVALID_ENVELOPE = "invalid_envelope"
 ERR_UNKNOWN_TYPE = "unknown_type"
 
 
-def _conversation_to_read(db, conv: dict) -> ConversationRead:
-    """Build ConversationRead with embedded UserRead for each participant."""
-    participants: list[UserRead] = []
-    for pid in conv.get("participant_ids", []):
-        doc = db["users"].find_one({"_id": pid})
-        if doc is None:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Participant user missing for this conversation.",
+# Inbox conversations whose participants are fetched with one users query.
+CONVERSATION_BATCH_SIZE = 100
+
+
+def _conversation_payloads(db, convs: Iterable[dict]) -> Iterator[dict]:
+    """
+    ConversationRead-shaped payloads with a UserRead payload per participant,
+    one `$in` query per `CONVERSATION_BATCH_SIZE` conversations. A deleted
+    participant is left out: their conversations are only removed once their
+    account cleanup job gets to them.
+    """
+    convs = iter(convs)
+    while batch := list(islice(convs, CONVERSATION_BATCH_SIZE)):
+        ids = {pid for conv in batch for pid in conv.get("participant_ids", [])}
+        users = {
+            doc["_id"]: model_payload(UserRead, doc)
+            for doc in db["users"].find(
+                {"_id": {"$in": list(ids)}}, USER_READ_PROJECTION
             )
-        doc = doc.copy()
-        doc["_id"] = str(doc["_id"])
-        participants.append(UserRead(**doc))
-
-    return ConversationRead(
-        id=str(conv["_id"]),
-        participants=participants,
-        last_message_at=conv.get("last_message_at"),
-        last_message_preview=conv.get("last_message_preview"),
-        created_at=conv["created_at"],
-    )
+        }
+        for conv in batch:
+            participants = [
+                users[pid] for pid in conv.get("participant_ids", []) if pid in users
+            ]
+            yield model_payload(ConversationRead, conv, participants=participants)
 
 
 def _ws_error_envelope(code: str, message: str) -> dict:
@@ -123,12 +131,12 @@ def _raise_http_for_failed_delete_dm(result) -> None:
 def open_or_get_dm(
     body: DmOpenRequest,
     db=Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user_id: str = Depends(get_current_user_id),
 ):
     """Create or return the 1:1 DM with the other user (idempotent)."""
     try:
         other_oid = ObjectId(body.other_user_id)
-        me_oid = ObjectId(current_user["_id"])
+        me_oid = ObjectId(current_user_id)
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid user id."
@@ -147,19 +155,25 @@ def open_or_get_dm(
         )
 
     conv = get_or_create_conversation(db, me_oid, other_oid)
-    return _conversation_to_read(db, conv)
+    (payload,) = _conversation_payloads(db, [conv])
+    return FastJSONResponse(payload)
 
 
 # REST: List all conversations the current user participates in (inbox).
 @router.get("/conversations", response_model=list[ConversationRead])
 def list_my_conversations(
+    request: Request,
     db=Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user_id: str = Depends(get_current_user_id),
 ):
     """Inbox: conversations for the current user, newest activity first."""
-    user_oid = ObjectId(current_user["_id"])
-    convs = list_conversations_for_user(db, user_oid)
-    return [_conversation_to_read(db, c) for c in convs]
+    user_oid = ObjectId(current_user_id)
+    convs = conversations_for_user(db, user_oid)
+    payloads = _conversation_payloads(db, convs)
+    mode = stream_mode(request)
+    if mode is not None:
+        return streaming_response(payloads, mode)
+    return FastJSONResponse(list(payloads))
 
 
 # REST: Paginated message history for one conversation.
@@ -175,7 +189,7 @@ def get_conversation_messages(
         description="Message id; return only messages older than this anchor.",
     ),
     db=Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user_id: str = Depends(get_current_user_id),
 ):
     """Paginated message history; membership required."""
     try:
@@ -193,7 +207,7 @@ def get_conversation_messages(
             detail="Conversation not found.",
         )
 
-    me = ObjectId(current_user["_id"])
+    me = ObjectId(current_user_id)
     if not conversation_has_participant(conv, me):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -201,7 +215,9 @@ def get_conversation_messages(
         )
 
     rows = list_messages_page(db, conv_oid, limit=limit, before_message_id=before)
-    return [MessageRead(**message_doc_to_api_dict(doc)) for doc in rows]
+    return FastJSONResponse(
+        [model_payload(MessageRead, message_doc_to_api_dict(doc)) for doc in rows]
+    )
 
 
 # REST: Send a message; sender uses this response as source of truth.
@@ -215,20 +231,17 @@ async def send_conversation_message(
     conversation_id: str,
     body: MessageCreate,
     db=Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user_id: str = Depends(get_current_user_id),
 ):
-    sender_oid = ObjectId(current_user["_id"])
+    sender_oid = ObjectId(current_user_id)
     result = try_commit_dm(db, sender_oid, conversation_id, body.content)
     _raise_http_for_failed_dm(result)
     assert result.message is not None
     api_dict = result.message
     msg_read = MessageRead(**api_dict)
-    conv = db["conversations"].find_one({"_id": ObjectId(conversation_id)})
-    if conv is not None:
-        peer = other_participant_id(conv, sender_oid)
-        if peer is not None:
-            frame = _ws_message_created_envelope(api_dict)
-            await connection_manager.send_envelope(str(peer), frame)
+    if result.recipient_id is not None:
+        frame = _ws_message_created_envelope(api_dict)
+        await connection_manager.send_envelope(str(result.recipient_id), frame)
     return msg_read
 
 
@@ -240,9 +253,9 @@ def delete_conversation_message(
     conversation_id: str,
     message_id: str,
     db=Depends(get_db),
-    current_user=Depends(get_current_user),
+    current_user_id: str = Depends(get_current_user_id),
 ):
-    requester_oid = ObjectId(current_user["_id"])
+    requester_oid = ObjectId(current_user_id)
     result = try_delete_dm_message(db, requester_oid, conversation_id, message_id)
     _raise_http_for_failed_delete_dm(result)
     return None
@@ -256,22 +269,12 @@ async def dm_socket(
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
 
-    try:
-        payload = jwt.decode(token, _get_jwt_secret(), algorithms=[JWT_ALGORITHM])
-        email = payload.get("sub")
-        if not email:
-            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
-            return
-    except JWTError:
-        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
-        return
-
-    user = db["users"].find_one({"email": email})
-    if not user:
+    user = authenticate(token, db)
+    if user is None:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
 
-    user_id_str = str(user["_id"])
+    user_id_str = user["_id"]
 
     await websocket.accept()
     await connection_manager.register(user_id_str, websocket)
@@ -1,33 +1,127 @@
+from typing import Literal
+
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from pymongo import ASCENDING, ReturnDocument
 
-from app.core.matching import get_suggestions
+from app.core.account_cleanup import start_cleanup
+from app.core.auth_cache import auth_cache
+from app.core.conditional import conditional_response, validators, versioned
+from app.core.directory import directory_query
+from app.core.group_profiles import member_profile_changed
+from app.core.matching import SCORING_PROJECTION
+from app.core.people_search import people_index
+from app.core.precompute import discard_precomputed, load_precomputed
+from app.core.profiles import (
+    derived_profile_fields,
+    profile_deleted,
+    profile_saved,
+)
+from app.core.serialization import FastJSONResponse, model_payload
+from app.core.skill_stats import record_profile_change
+from app.core.streaming import stream_mode, streaming_response
+from app.core.suggestion_cache import SUGGESTION_CACHE_DEPTH, Ranked, suggestion_cache
+from app.core.suggestion_snapshots import (
+    SNAPSHOT_MAX_DEPTH,
+    decode_cursor,
+    encode_cursor,
+    suggestion_snapshots,
+)
+from app.core.suggestions import (
+    DEFAULT_SUGGESTIONS_MODE,
+    SUGGESTIONS_BACKEND,
+    USER_READ_PROJECTION,
+    SuggestionMode,
+    aggregate_suggestions,
+    rank_suggestion_ids,
+)
 from app.db.connect import get_db
-from app.models.schemas import SuggestionRead, UserRead, UserUpdate
+from app.models.enums import Major
+from app.models.schemas import (
+    SuggestionRead,
+    UserBatchRead,
+    UserBatchRequest,
+    UserRead,
+    UserSearchHit,
+    UserUpdate,
+)
 from app.routers.auth import get_current_user
+from app.routers.match import get_suggestion_exclusion_ids
 
 router = APIRouter()
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_DIRECTORY_PAGE = 200
+
 # all routes are protected, meaning only those who have an account aka have access token
 # are able to use any of the following api calls. Outsiders are not able to hit endpoint and see
 # student sensitive data
 
 
-# list all users, returns list of all users
+# Responses built from user documents are payloads, not models
+# (see app.core.serialization).
+def _user_payloads(user_docs):
+    for user_doc in user_docs:
+        yield model_payload(UserRead, user_doc)
+
+
+# list users, oldest first; filtered and paged with ?after=<last _id>&limit=
+# X-Next-Cursor carries the `after` for the next page when there is one.
+# Streams when asked to via Accept (see app.core.streaming).
 @router.get("/", response_model=list[UserRead])
-def list_users(db=Depends(get_db), current_user=Depends(get_current_user)):
-    # db is the Mongo Database object
-    allUsers = db["users"].find({})
-    users = []
-    for user_doc in allUsers:
-        user_doc["_id"] = str(user_doc["_id"])
-        users.append(UserRead(**user_doc))
-    return users
+def list_users(
+    request: Request,
+    after: str | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_DIRECTORY_PAGE),
+    major: Major | None = None,
+    skill: str | None = None,
+    name: str | None = Query(None, description="prefix of username or full name"),
+    db=Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    after_oid = None
+    if after is not None:
+        try:
+            after_oid = ObjectId(after)
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor.",
+            )
 
+    query = directory_query(after=after_oid, major=major, skill=skill, name=name)
+    cursor = db["users"].find(query, USER_READ_PROJECTION).sort("_id", ASCENDING)
+    mode = stream_mode(request)
+    if limit is None:
+        if mode is not None:
+            return streaming_response(_user_payloads(cursor), mode)
+        return FastJSONResponse(list(_user_payloads(cursor)))
 
-# current user
+    # one extra document tells whether another page exists
+    users = list(_user_payloads(cursor.limit(limit + 1)))
+    headers = {}
+    if len(users) > limit:
+        users = users[:limit]
+        headers[NEXT_CURSOR_HEADER] = str(users[-1]["_id"])
+    if mode is not None:
+        return streaming_response(users, mode, headers=headers)
+    return FastJSONResponse(users, headers=headers)
+
+
+# current user; conditional on ETag / Last-Modified (see app.core.conditional)
 @router.get("/me", response_model=UserRead)
-def get_me(current_user=Depends(get_current_user)):
-    return UserRead(**current_user)
+def get_me(request: Request, current_user=Depends(get_current_user)):
+    return conditional_response(
+        request, validators(current_user), lambda: model_payload(UserRead, current_user)
+    )
 
 
 # update current user
@@ -37,57 +131,290 @@ def update_me(
 ):
     update_data = user_update.model_dump(exclude_unset=True, mode="json")
     if not update_data:
-        return UserRead(**current_user)
+        return FastJSONResponse(model_payload(UserRead, current_user))
 
     # sanitize skills field
     if "skills" in update_data and update_data["skills"] is None:
         update_data["skills"] = []
 
-    db["users"].update_one(
-        {"_id": ObjectId(current_user["_id"])}, {"$set": update_data}
-    )
+    # keep skills_norm and the name keys in step with the raw fields
+    update_data.update(derived_profile_fields(update_data))
 
-    updated = db["users"].find_one({"_id": ObjectId(current_user["_id"])})
-    if not updated:
+    update = versioned({"$set": update_data})
+    # the write's own before image, not the (possibly cached) current_user: two
+    # concurrent edits must each move the counters from what they replaced
+    before = db["users"].find_one_and_update(
+        {"_id": ObjectId(current_user["_id"])},
+        update,
+        return_document=ReturnDocument.BEFORE,
+    )
+    if not before:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found.",
         )
 
-    updated["_id"] = str(updated["_id"])
-    return UserRead(**updated)
+    updated = {
+        **before,
+        **update["$set"],
+        "_id": str(before["_id"]),
+        "version": before.get("version", 0) + 1,
+    }
+    auth_cache.invalidate_user(updated["_id"])
+    scores_changed = "skills" in update_data or "major" in update_data
+    discard_precomputed(db, profile_saved(updated, scores_changed=scores_changed))
+    if "skills" in update_data:
+        record_profile_change(db, before, updated)
+    if scores_changed:
+        member_profile_changed(db, before["_id"], before, updated)
+    return FastJSONResponse(model_payload(UserRead, updated))
 
 
-# delete current user
+# delete current user; their requests, DMs and group memberships are cleaned
+# up in the background (see app.core.account_cleanup)
 # frontend will have to clear token and redirect to login/register page
 @router.delete("/me", status_code=status.HTTP_200_OK)
 def delete_me(current_user=Depends(get_current_user), db=Depends(get_db)):
-    db["users"].delete_one({"_id": ObjectId(current_user["_id"])})
+    deleted = db["users"].find_one_and_delete(
+        {"_id": ObjectId(current_user["_id"])}, SCORING_PROJECTION
+    )
+    auth_cache.revoke(current_user["_id"])
+    stale_owners = profile_deleted(current_user["_id"])
+    if deleted:
+        record_profile_change(db, deleted, None)
+        start_cleanup(db, deleted)
+    discard_precomputed(db, stale_owners)
     return {"detail": "User deleted"}
 
 
+def _exclusions(db, current_user: dict) -> set[str]:
+    """Connected users and users with a pending request either way."""
+    user_oid = ObjectId(current_user["_id"])
+    return {str(oid) for oid in get_suggestion_exclusion_ids(user_oid, db)}
+
+
+def _load_suggestions(db, ranked: list[tuple[str, float]]) -> list[dict]:
+    """Fetch full profiles for ranked ids, preserving rank order."""
+    if not ranked:
+        return []
+
+    winner_oids = [ObjectId(uid) for uid, _ in ranked]
+    profiles = {
+        doc["_id"]: doc
+        for doc in db["users"].find({"_id": {"$in": winner_oids}}, USER_READ_PROJECTION)
+    }
+
+    suggestions = []
+    for oid, (_, score) in zip(winner_oids, ranked):
+        profile = profiles.get(oid)
+        if profile is None:  # deleted between ranking and fetch
+            continue
+        suggestions.append(model_payload(SuggestionRead, profile, match_score=score))
+    return suggestions
+
+
+def _rank(
+    db, current_user: dict, mode: SuggestionMode, limit: int, exclude: set[str]
+) -> Ranked:
+    """(user id, score) pairs from whichever backend serves `mode`."""
+    if mode == "exact" and SUGGESTIONS_BACKEND == "aggregation":
+        docs = aggregate_suggestions(db, current_user, limit, exclude)
+        return [(str(doc["_id"]), doc["match_score"]) for doc in docs]
+    return rank_suggestion_ids(db, current_user, limit, mode, exclude)
+
+
+def _start_snapshot(
+    response: Response,
+    current_user: dict,
+    mode: SuggestionMode,
+    ranked: Ranked,
+    served: int,
+    exhausted: bool,
+) -> None:
+    """Keep the first page's ranking so later pages are slices of it."""
+    if served >= len(ranked) and exhausted:
+        return
+    snapshot_id = suggestion_snapshots.create(
+        current_user["_id"], mode, ranked[:SNAPSHOT_MAX_DEPTH], exhausted
+    )
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(snapshot_id, served)
+
+
+def _suggestions_page(
+    response: Response, db, current_user: dict, cursor: str, limit: int
+) -> list[dict]:
+    decoded = decode_cursor(cursor)
+    if decoded is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor.",
+        )
+    snapshot_id, offset = decoded
+    snapshot = suggestion_snapshots.get(snapshot_id, current_user["_id"])
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Cursor expired; request the first page again.",
+        )
+
+    end = min(offset + limit, SNAPSHOT_MAX_DEPTH)
+    if end > len(snapshot.ranked) and not snapshot.exhausted:
+        # Rank deeper once, skipping everything already served or queued, so
+        # earlier pages stay exactly as they were.
+        have = len(snapshot.ranked)
+        target = min(max(end, 2 * have), SNAPSHOT_MAX_DEPTH)
+        exclude = _exclusions(db, current_user)
+        exclude.update(uid for uid, _ in snapshot.ranked)
+        more = _rank(db, current_user, snapshot.mode, target - have, exclude)
+        exhausted = len(more) < target - have or target >= SNAPSHOT_MAX_DEPTH
+        suggestion_snapshots.extend(snapshot_id, more, exhausted)
+
+    page = snapshot.ranked[offset:end]
+    if end < len(snapshot.ranked) or (
+        not snapshot.exhausted and end < SNAPSHOT_MAX_DEPTH
+    ):
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(snapshot_id, end)
+    return _load_suggestions(db, page)
+
+
 # suggest compatible users based on skills + major
+# The next page, if any, is named by the X-Next-Cursor response header.
 @router.get("/suggestions", response_model=list[SuggestionRead])
 def suggest_users(
-    limit: int = Query(default=10, le=50),
+    response: Response,
+    limit: int = Query(default=10, le=SUGGESTION_CACHE_DEPTH),
+    mode: SuggestionMode | None = Query(default=None),
+    cursor: str | None = Query(
+        default=None,
+        description="X-Next-Cursor from the previous page; returns the next page.",
+    ),
+    db=Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    suggestions = _suggestions(response, db, current_user, limit, mode, cursor)
+    # the helpers set X-Next-Cursor on the injected response
+    return FastJSONResponse(suggestions, headers=dict(response.headers))
+
+
+def _suggestions(
+    response: Response,
+    db,
+    current_user: dict,
+    limit: int,
+    mode: SuggestionMode | None,
+    cursor: str | None,
+) -> list[dict]:
+    if cursor is not None:
+        return _suggestions_page(response, db, current_user, cursor, limit)
+
+    mode = mode or DEFAULT_SUGGESTIONS_MODE
+    if mode == "approximate":
+        # Approximate rankings are not cached; the cache only holds exact lists.
+        exclude = _exclusions(db, current_user)
+        ranked = rank_suggestion_ids(db, current_user, limit, mode, exclude)
+        _start_snapshot(
+            response, current_user, mode, ranked, limit, len(ranked) < limit
+        )
+        return _load_suggestions(db, ranked)
+
+    if SUGGESTIONS_BACKEND == "aggregation":
+        # Mongo ranks and projects; only `limit` documents cross the wire.
+        exclude = _exclusions(db, current_user)
+        suggestions = [
+            model_payload(SuggestionRead, doc)
+            for doc in aggregate_suggestions(db, current_user, limit, exclude)
+        ]
+        ranked = [(str(s["_id"]), s["match_score"]) for s in suggestions]
+        _start_snapshot(
+            response, current_user, mode, ranked, limit, len(ranked) < limit
+        )
+        return suggestions
+
+    # Rankings are cached at full depth, so any limit is a slice of one entry.
+    # Cached lists already exclude connections; match request writes drop them.
+    # On a miss, a fresh list from the offline precompute job beats re-ranking.
+    ranked = suggestion_cache.get(current_user["_id"])
+    if ranked is None:
+        ranked = load_precomputed(db, current_user["_id"])
+        if ranked is not None:
+            suggestion_cache.put(current_user["_id"], ranked)
+    if ranked is None:
+        exclude = _exclusions(db, current_user)
+        ranked = rank_suggestion_ids(
+            db, current_user, SUGGESTION_CACHE_DEPTH, exclude=exclude
+        )
+        suggestion_cache.put(current_user["_id"], ranked)
+    _start_snapshot(
+        response,
+        current_user,
+        mode,
+        ranked,
+        limit,
+        len(ranked) < SUGGESTION_CACHE_DEPTH,
+    )
+    return _load_suggestions(db, ranked[:limit])
+
+
+# suggestion cache counters, for sizing the cache
+@router.get("/suggestions/stats")
+def suggestion_cache_stats(current_user=Depends(get_current_user)):
+    return {**suggestion_cache.stats(), "snapshots": suggestion_snapshots.stats()}
+
+
+# people search: name autocomplete (mode=prefix) or bio/skills text search (mode=text)
+@router.get("/search", response_model=list[UserSearchHit])
+def search_users(
+    q: str = Query(..., min_length=1, max_length=100),
+    mode: Literal["prefix", "text"] = "prefix",
+    limit: int = Query(10, ge=1, le=50),
     db=Depends(get_db),
     current_user=Depends(get_current_user),
 ):
-    # NOTE: loads all users into memory — fine for a university-scale app,
-    # but will need server-side filtering if the user base grows significantly.
-    candidates = []
-    for doc in db["users"].find({"_id": {"$ne": ObjectId(current_user["_id"])}}):
-        doc["_id"] = str(doc["_id"])
-        candidates.append(doc)
+    people_index.ensure_built(db)
+    if mode == "prefix":
+        hits = [
+            model_payload(UserSearchHit, hit) for hit in people_index.prefix(q, limit)
+        ]
+    else:
+        hits = [
+            model_payload(UserSearchHit, hit, score=round(score, 4))
+            for hit, score in people_index.text(q, limit)
+        ]
+    return FastJSONResponse(hits)
 
-    ranked = get_suggestions(current_user, candidates, limit=limit)
-    return [SuggestionRead(**user, match_score=score) for user, score in ranked]
+
+# many users by id in one query: users in request order (duplicates once),
+# ids with no user listed in `missing`
+@router.post("/batch", response_model=UserBatchRead)
+def get_users_batch(
+    body: UserBatchRequest,
+    db=Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    invalid = [user_id for user_id in body.ids if not ObjectId.is_valid(user_id)]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid user id format: {', '.join(invalid[:5])}.",
+        )
+
+    oids = list(dict.fromkeys(ObjectId(user_id) for user_id in body.ids))
+    found = {
+        doc["_id"]: doc
+        for doc in db["users"].find({"_id": {"$in": oids}}, USER_READ_PROJECTION)
+    }
+    users = [model_payload(UserRead, found[oid]) for oid in oids if oid in found]
+    missing = [str(oid) for oid in oids if oid not in found]
+    return FastJSONResponse({"users": users, "missing": missing})
 
 
-# get one user by id , returns UserRead model
+# get one user by id , returns UserRead model; conditional like /me
 @router.get("/{user_id}", response_model=UserRead)
 def get_user_by_id(
-    user_id: str, db=Depends(get_db), current_user=Depends(get_current_user)
+    user_id: str,
+    request: Request,
+    db=Depends(get_db),
+    current_user=Depends(get_current_user),
 ):
     try:
         oid = ObjectId(user_id)
@@ -104,5 +431,6 @@ def get_user_by_id(
             detail="User not found.",
         )
 
-    user_doc["_id"] = str(user_doc["_id"])
-    return UserRead(**user_doc)
+    return conditional_response(
+        request, validators(user_doc), lambda: model_payload(UserRead, user_doc)
+    )
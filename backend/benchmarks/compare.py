@@ -0,0 +1,90 @@
+"""
+Compare two benchmark reports and flag regressions.
+
+Results are matched by population size (`users`) and metric path. Latencies
+(`*_ms`, `*_us`) regress when they grow, rates (`*per_second`) when they
+shrink. Exits 1 if any metric regressed by more than --threshold.
+
+    python -m benchmarks.compare base.json head.json --threshold 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+
+def _flatten(prefix: str, value, out: dict[str, float]) -> None:
+    if isinstance(value, dict):
+        for key, sub in value.items():
+            _flatten(f"{prefix}/{key}" if prefix else key, sub, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = float(value)
+
+
+def metrics(report: dict) -> dict[str, float]:
+    out: dict[str, float] = {}
+    for result in report["results"]:
+        _flatten(f"users={result.get('users')}", result, out)
+    return out
+
+
+def _direction(metric: str) -> int:
+    """+1 if bigger is better, -1 if smaller is better, 0 if not a perf metric."""
+    name = metric.rsplit("/", 1)[-1]
+    if name.endswith("per_second"):
+        return 1
+    if name.endswith("_ms") or name.endswith("_us"):
+        return -1
+    return 0
+
+
+def compare(base: dict, head: dict, threshold: float) -> list[dict]:
+    if base["benchmark"] != head["benchmark"]:
+        raise ValueError("reports are from different benchmarks")
+    base_metrics, head_metrics = metrics(base), metrics(head)
+    rows = []
+    for metric, before in base_metrics.items():
+        direction = _direction(metric)
+        after = head_metrics.get(metric)
+        if not direction or after is None or before == 0:
+            continue
+        change = (after - before) / before
+        rows.append(
+            {
+                "metric": metric,
+                "base": before,
+                "head": after,
+                "change": change,
+                "regressed": change * direction < -threshold,
+            }
+        )
+    return rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    rows = compare(base, head, args.threshold)
+    for row in rows:
+        flag = "REGRESSED" if row["regressed"] else ""
+        sys.stdout.write(
+            f"{row['metric']:<60} {row['base']:>14.3f} {row['head']:>14.3f} "
+            f"{row['change']:>+8.1%} {flag}\n"
+        )
+    if any(row["regressed"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Recall vs latency of approximate (MinHash/LSH) suggestions against the exact path.
+
+Both paths shortlist candidates from an in-memory index and re-rank the shortlist
+with the exact scorer, exactly as `suggest_users` does, minus MongoDB. Recall@k
+counts an approximate result as correct when it is in the exact top-k (ties at
+the k-th score included).
+
+    python -m benchmarks.lsh_recall --sizes 10000 100000 1000000 --output lsh.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from app.core.lsh import MinHashLSH
+from app.core.matching import get_suggestions, match_scorer
+from app.core.skill_index import SkillIndex
+from benchmarks.report import write_report
+from benchmarks.synthetic import generate_users, percentile
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def _rank(index, by_id, query, k):
+    ids = index.candidate_ids(query)
+    return get_suggestions(query, (by_id[i] for i in ids), limit=k), len(ids)
+
+
+def run_size(n: int, *, queries: int, k: int, num_perm: int, bands: int) -> dict:
+    users = generate_users(n)
+    by_id = {u["_id"]: u for u in users}
+
+    exact_index = SkillIndex()
+    _, exact_build_ms = _timed(lambda: exact_index.load(users))
+    lsh = MinHashLSH(num_perm=num_perm, bands=bands)
+    _, lsh_build_ms = _timed(lambda: lsh.load(users))
+
+    sample = random.Random(n).sample(users, min(queries, n))
+    exact_ms, approx_ms, exact_sizes, approx_sizes, recalls = [], [], [], [], []
+    for query in sample:
+        (exact, exact_n), ms = _timed(lambda: _rank(exact_index, by_id, query, k))
+        exact_ms.append(ms)
+        exact_sizes.append(exact_n)
+        (approx, approx_n), ms = _timed(lambda: _rank(lsh, by_id, query, k))
+        approx_ms.append(ms)
+        approx_sizes.append(approx_n)
+
+        if not exact:
+            continue
+        cutoff = exact[-1][1]
+        score = match_scorer(query)
+        hits = sum(1 for doc, _ in approx if score(doc) >= cutoff)
+        recalls.append(hits / len(exact))
+
+    def summary(latencies, sizes):
+        return {
+            "p50_ms": percentile(latencies, 50),
+            "p99_ms": percentile(latencies, 99),
+            "mean_shortlist": sum(sizes) / len(sizes),
+        }
+
+    return {
+        "users": n,
+        "queries": len(sample),
+        "k": k,
+        "num_perm": num_perm,
+        "bands": bands,
+        "build_ms": {"exact": exact_build_ms, "approximate": lsh_build_ms},
+        "exact": summary(exact_ms, exact_sizes),
+        "approximate": summary(approx_ms, approx_sizes),
+        "recall_at_k": sum(recalls) / len(recalls) if recalls else None,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--num-perm", type=int, default=64)
+    parser.add_argument("--bands", type=int, default=32)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = [
+        run_size(
+            n, queries=args.queries, k=args.k, num_perm=args.num_perm, bands=args.bands
+        )
+        for n in args.sizes
+    ]
+    write_report("lsh_recall", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Throughput and latency of the matching core on synthetic populations, offline.
+
+For each population size this measures:
+
+- `compute_match_score` on random pairs (per-call p50/p99 and pairs/s);
+- `SparseScoringEngine` over the whole population: the one-off build, then
+  `top_k` per query against it;
+- `get_suggestions` over the whole population as a stream (the heap path taken
+  for Mongo cursors), on raw documents and on compact profiles.
+
+Needs no MongoDB. Compare two reports with `python -m benchmarks.compare`.
+
+    python -m benchmarks.matching --sizes 1000 10000 100000 1000000 \
+        --output matching.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from app.core.matching import compact_profile, compute_match_score, get_suggestions
+from app.core.sparse_scoring import SparseScoringEngine
+from benchmarks.report import write_report
+from benchmarks.synthetic import generate_users, percentile
+
+
+def _latency_summary(samples_ns: list[int], unit: str) -> dict:
+    scale = {"us": 1e3, "ms": 1e6}[unit]
+    total_s = sum(samples_ns) / 1e9
+    return {
+        f"p50_{unit}": percentile(samples_ns, 50) / scale,
+        f"p99_{unit}": percentile(samples_ns, 99) / scale,
+        "per_second": len(samples_ns) / total_s if total_s else 0.0,
+    }
+
+
+def bench_pairs(users: list[dict], pairs: int, rng: random.Random) -> dict:
+    compute_match_score(users[0], users[-1])
+    samples = []
+    for _ in range(pairs):
+        a, b = rng.choice(users), rng.choice(users)
+        start = time.perf_counter_ns()
+        compute_match_score(a, b)
+        samples.append(time.perf_counter_ns() - start)
+    return {"pairs": pairs, **_latency_summary(samples, "us")}
+
+
+def bench_engine(candidates: list[dict], queries: list[dict], limit: int) -> dict:
+    start = time.perf_counter_ns()
+    engine = SparseScoringEngine(candidates)
+    build_ms = (time.perf_counter_ns() - start) / 1e6
+    engine.top_k(queries[0], limit)  # untimed warm-up
+    samples = []
+    for query in queries:
+        start = time.perf_counter_ns()
+        engine.top_k(query, limit)
+        samples.append(time.perf_counter_ns() - start)
+    summary = _latency_summary(samples, "ms")
+    summary["candidates_per_second"] = summary["per_second"] * len(candidates)
+    return {"build_ms": build_ms, "queries": len(queries), **summary}
+
+
+def bench_suggestions(candidates: list[dict], queries: list[dict], limit: int) -> dict:
+    # untimed warm-up: first-call imports and allocator growth aren't the subject
+    get_suggestions(queries[0], iter(candidates), limit)
+    samples = []
+    for query in queries:
+        source = iter(candidates)
+        start = time.perf_counter_ns()
+        get_suggestions(query, source, limit=limit)
+        samples.append(time.perf_counter_ns() - start)
+    summary = _latency_summary(samples, "ms")
+    summary["candidates_per_second"] = summary["per_second"] * len(candidates)
+    return {"queries": len(queries), **summary}
+
+
+def run_size(n: int, *, queries: int, pairs: int, limit: int) -> dict:
+    users = generate_users(n)
+    compact = [compact_profile(user) for user in users]
+    rng = random.Random(n)
+    sample = rng.sample(range(n), min(queries, n))
+
+    return {
+        "users": n,
+        "limit": limit,
+        "compute_match_score": bench_pairs(users, pairs, rng),
+        "sparse_engine": bench_engine(users, [users[i] for i in sample], limit),
+        "get_suggestions": {
+            "stream": bench_suggestions(users, [users[i] for i in sample], limit),
+            "stream_compact": bench_suggestions(
+                compact, [compact[i] for i in sample], limit
+            ),
+        },
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--pairs", type=int, default=20_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = [
+        run_size(n, queries=args.queries, pairs=args.pairs, limit=args.limit)
+        for n in args.sizes
+    ]
+    write_report("matching", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
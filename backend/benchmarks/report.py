@@ -0,0 +1,54 @@
+"""
+JSON reports shared by the benchmarks.
+
+Every report carries enough metadata (commit, interpreter, library versions,
+machine) that two runs can be compared with `python -m benchmarks.compare`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def metadata() -> dict:
+    return {
+        "commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_report(benchmark: str, results: list[dict], output: str | None) -> None:
+    """Write the report to `output`, or to stdout when it is None."""
+    payload = json.dumps(
+        {"benchmark": benchmark, "meta": metadata(), "results": results}, indent=2
+    )
+    if output:
+        with open(output, "w") as f:
+            f.write(payload + "\n")
+    else:
+        sys.stdout.write(payload + "\n")
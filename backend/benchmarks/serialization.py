@@ -0,0 +1,169 @@
+"""
+CPU cost of serializing list_groups responses, model path against payload path.
+
+The model path is what list_groups did before `app.core.serialization`: build
+`UserRead`/`GroupRead` models from the documents, then let FastAPI validate the
+result against `response_model`, dump it to JSON-able data and render it with
+`json.dumps`. The payload path copies the documents into payloads with
+`model_payload` and renders them with orjson. Both produce the same JSON (the
+benchmark checks), so the difference is pure overhead.
+
+For each members-per-group size: microseconds per group and per serialized
+object (a group or one of its members) on each path, and the speedup.
+
+Needs no MongoDB.
+
+    python -m benchmarks.serialization --groups 500 --members 1 4 8 \
+        --output serialization.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+from app.core.serialization import dumps, model_payload
+from app.models.schemas import GroupRead, UserRead
+from benchmarks.report import write_report
+from benchmarks.synthetic import generate_users
+
+GROUP_LIST = TypeAdapter(list[GroupRead])
+
+
+def user_docs(n: int) -> list[dict]:
+    """`generate_users` fleshed out to everything UserRead reads."""
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    docs = []
+    for i, user in enumerate(generate_users(n)):
+        docs.append(
+            {
+                "_id": ObjectId(),
+                "username": f"user{i}",
+                "full_name": f"User Number{i}",
+                "major": user["major"],
+                "bio": "Looking for a capstone team." if i % 2 else None,
+                "skills": user["skills_norm"],
+                "external_links": {"github": f"https://github.com/user{i}"},
+                "avatar_url": None,
+                "created_at": start + timedelta(minutes=i),
+            }
+        )
+    return docs
+
+
+def group_docs(n_groups: int, members: list[dict], per_group: int) -> list[dict]:
+    start = datetime(2025, 2, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Group {g}",
+            "description": "Capstone project team",
+            "course_code": "CSCE 3444",
+            "max_members": max(per_group, 5),
+            "tags": ["Capstone", "Project"],
+            "created_by": members[g * per_group]["_id"],
+            "created_at": start + timedelta(minutes=g),
+            "member_ids": [
+                m["_id"] for m in members[g * per_group : (g + 1) * per_group]
+            ],
+        }
+        for g in range(n_groups)
+    ]
+
+
+def model_path(groups: list[dict], users: dict) -> bytes:
+    reads = []
+    for group in groups:
+        members = []
+        for oid in group["member_ids"]:
+            doc = dict(users[oid])
+            doc["_id"] = str(doc["_id"])
+            members.append(UserRead(**doc))
+        reads.append(
+            GroupRead(
+                _id=str(group["_id"]),
+                created_by=str(group["created_by"]),
+                members=members,
+                created_at=group["created_at"],
+                name=group["name"],
+                description=group["description"],
+                course_code=group.get("course_code"),
+                max_members=group["max_members"],
+                tags=group.get("tags", []),
+            )
+        )
+    # FastAPI's serialize_response followed by JSONResponse.render
+    content = [read.model_dump(by_alias=True) for read in reads]
+    validated = GROUP_LIST.validate_python(content)
+    data = GROUP_LIST.dump_python(validated, mode="json", by_alias=True)
+    return json.dumps(
+        data, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode()
+
+
+def payload_path(groups: list[dict], users: dict) -> bytes:
+    return dumps(
+        [
+            model_payload(
+                GroupRead,
+                group,
+                members=[
+                    model_payload(UserRead, users[oid]) for oid in group["member_ids"]
+                ],
+            )
+            for group in groups
+        ]
+    )
+
+
+def _best_seconds(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_size(n_groups: int, per_group: int, repeats: int) -> dict:
+    members = user_docs(n_groups * per_group)
+    users = {doc["_id"]: doc for doc in members}
+    groups = group_docs(n_groups, members, per_group)
+
+    if json.loads(model_path(groups, users)) != json.loads(payload_path(groups, users)):
+        raise AssertionError("model and payload paths disagree")
+
+    objects = n_groups * (1 + per_group)
+    model_s = _best_seconds(lambda: model_path(groups, users), repeats)
+    payload_s = _best_seconds(lambda: payload_path(groups, users), repeats)
+    return {
+        "groups": n_groups,
+        "members_per_group": per_group,
+        "objects": objects,
+        "model_us_per_group": model_s / n_groups * 1e6,
+        "payload_us_per_group": payload_s / n_groups * 1e6,
+        "model_us_per_object": model_s / objects * 1e6,
+        "payload_us_per_object": payload_s / objects * 1e6,
+        "speedup": model_s / payload_s,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--groups", type=int, default=500)
+    parser.add_argument("--members", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = [run_size(args.groups, m, args.repeats) for m in args.members]
+    write_report("serialization", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
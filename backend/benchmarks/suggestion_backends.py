@@ -0,0 +1,161 @@
+"""
+Network bytes and latency of the "python" vs "aggregation" suggestion backends.
+
+Needs a reachable MongoDB (MONGO_URI, or --uri). Seeds a scratch database with
+synthetic users, runs both backends for a sample of users, and reports per-query
+p50/p99 latency plus the bytes Mongo sent back (BSON size of every command reply,
+captured with a pymongo command listener). The scratch database is dropped at
+the end unless --keep is given.
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.suggestion_backends \
+        --sizes 10000 100000 --output backends.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+import bson
+from bson import ObjectId
+from pymongo import MongoClient, monitoring
+
+from app.core.directory import ensure_directory_indexes
+from app.core.skill_index import skill_index
+from app.core.suggestions import (
+    aggregate_suggestions,
+    ensure_suggestion_indexes,
+    rank_suggestion_ids,
+)
+from benchmarks.report import write_report
+from benchmarks.synthetic import generate_users, percentile
+
+SEED_BATCH = 5_000
+
+
+class ReplyBytes(monitoring.CommandListener):
+    """Sums the BSON size of every successful command reply."""
+
+    def __init__(self) -> None:
+        self.total = 0
+
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        self.total += len(bson.encode(event.reply))
+
+    def failed(self, event) -> None:
+        pass
+
+
+def _seed(db, n: int) -> list[dict]:
+    users = generate_users(n)
+    now = datetime.now(timezone.utc)
+    docs = []
+    for i, user in enumerate(users):
+        user["_id"] = ObjectId()
+        docs.append(
+            {
+                **user,
+                "username": f"user{i}",
+                "full_name": f"Synthetic User {i}",
+                "bio": "Benchmark profile " * 8,
+                "skills": [s.title() for s in user["skills_norm"]],
+                "external_links": {"github": f"https://github.com/user{i}"},
+                "email": f"user{i}@my.unt.edu",
+                "password": "$2b$12$" + "x" * 53,
+                "created_at": now,
+            }
+        )
+    db["users"].drop()
+    for start in range(0, n, SEED_BATCH):
+        db["users"].insert_many(docs[start : start + SEED_BATCH])
+    ensure_suggestion_indexes(db)
+    ensure_directory_indexes(db)
+    return users
+
+
+def _measure(fn, listener: ReplyBytes):
+    before = listener.total
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000, listener.total - before
+
+
+def _python_backend(db, user, limit):
+    ranked = rank_suggestion_ids(db, user, limit)
+    # The router then fetches the winners' profiles; count that round trip too.
+    oids = [ObjectId(uid) for uid, _ in ranked]
+    list(db["users"].find({"_id": {"$in": oids}}))
+
+
+def run_size(client, listener, db_name, n, *, queries, limit) -> dict:
+    db = client[db_name]
+    users = _seed(db, n)
+
+    # The python backend's index is process state; rebuild it for this population.
+    skill_index.clear()
+    index_build_ms, index_build_bytes = _measure(
+        lambda: skill_index.ensure_built(db), listener
+    )
+
+    sample = random.Random(n).sample(users, min(queries, n))
+    results = {}
+    for name, backend in (
+        ("python", _python_backend),
+        ("aggregation", aggregate_suggestions),
+    ):
+        latencies, sizes = [], []
+        for user in sample:
+            ms, nbytes = _measure(lambda: backend(db, user, limit), listener)
+            latencies.append(ms)
+            sizes.append(nbytes)
+        results[name] = {
+            "p50_ms": percentile(latencies, 50),
+            "p99_ms": percentile(latencies, 99),
+            "mean_reply_bytes": sum(sizes) / len(sizes),
+        }
+    results["python"]["index_build"] = {
+        "ms": index_build_ms,
+        "reply_bytes": index_build_bytes,
+    }
+    return {"users": n, "queries": len(sample), "limit": limit, **results}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uri", default=os.getenv("MONGO_URI"))
+    parser.add_argument("--db", default="suggestion_backends_bench")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch db")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+    if not args.uri:
+        parser.error("set MONGO_URI or pass --uri")
+
+    listener = ReplyBytes()
+    client = MongoClient(args.uri, event_listeners=[listener])
+    try:
+        results = [
+            run_size(
+                client, listener, args.db, n, queries=args.queries, limit=args.limit
+            )
+            for n in args.sizes
+        ]
+    finally:
+        skill_index.clear()
+        if not args.keep:
+            client.drop_database(args.db)
+        client.close()
+
+    write_report("suggestion_backends", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Synthetic user populations for benchmarks.
+
+Skill popularity follows a Zipf law over a fixed vocabulary (a few skills such as
+"python" are everywhere, most are rare) and majors follow a skewed categorical
+distribution. Documents are shaped like the scoring projection of `users`
+(`_id`, `skills_norm`, `major`), so they can be fed straight into the matching
+code without MongoDB.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from app.models.enums import Major
+
+MAJOR_WEIGHTS = {
+    Major.CS: 0.45,
+    Major.CE: 0.15,
+    Major.IT: 0.10,
+    Major.DS: 0.12,
+    Major.CYBER: 0.10,
+    Major.OTHER: 0.08,
+}
+
+
+def generate_users(
+    n: int,
+    *,
+    seed: int = 3444,
+    vocab_size: int = 2000,
+    zipf_exponent: float = 1.1,
+    mean_skills: float = 6.0,
+) -> list[dict]:
+    rng = np.random.default_rng(seed)
+
+    ranks = np.arange(1, vocab_size + 1, dtype=np.float64)
+    cdf = np.cumsum(ranks**-zipf_exponent)
+    cdf /= cdf[-1]
+    vocab = [f"skill{i}" for i in range(vocab_size)]
+
+    counts = np.clip(rng.poisson(mean_skills, size=n), 0, 40)
+    draws = np.searchsorted(cdf, rng.random(int(counts.sum())))
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    majors = [major.value for major in MAJOR_WEIGHTS]
+    weights = np.fromiter(MAJOR_WEIGHTS.values(), dtype=np.float64)
+    major_idx = rng.choice(len(majors), size=n, p=weights / weights.sum())
+
+    users = []
+    for i in range(n):
+        picked = {vocab[k] for k in draws[offsets[i] : offsets[i + 1]]}
+        users.append(
+            {
+                "_id": f"u{i}",
+                "skills_norm": sorted(picked),
+                "major": majors[major_idx[i]],
+            }
+        )
+    return users
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for no samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(np.ceil(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
@@ -0,0 +1,90 @@
+"""
+Solution quality of the team formation solver against its wall-clock budget.
+
+For each course size, on a synthetic population: the objective (total
+within-team `compute_match_score`) of a random split, of one greedy seed, and
+of the full solver at each time budget, with the restarts it managed and the
+time it actually took. `pairwise_ms` is the cost of scoring every pair.
+
+Needs no MongoDB.
+
+    python -m benchmarks.team_formation --sizes 600 --team-size 4 \
+        --budgets 0.1 0.5 2 --workers 4 --output team_formation.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from app.core.sparse_scoring import SparseScoringEngine
+from app.core.team_formation import greedy_seed, objective, solve, team_sizes
+from benchmarks.report import write_report
+from benchmarks.synthetic import generate_users
+
+
+def run_size(
+    n: int, *, team_size: int, budgets: list[float], workers: int, seed: int
+) -> dict:
+    users = generate_users(n)
+    start = time.perf_counter()
+    scores = SparseScoringEngine(users).pairwise()
+    pairwise_ms = (time.perf_counter() - start) * 1e3
+    np.fill_diagonal(scores, 0.0)
+
+    rng = np.random.default_rng(seed)
+    sizes = team_sizes(n, team_size)
+    random_split = np.repeat(np.arange(len(sizes)), sizes)[rng.permutation(n)]
+
+    by_budget = {}
+    for budget in budgets:
+        solution = solve(
+            scores, team_size, budget_seconds=budget, workers=workers, seed=seed
+        )
+        by_budget[f"budget={budget:g}s"] = {
+            "objective": solution.objective,
+            "restarts": solution.restarts,
+            "elapsed_ms": solution.elapsed_seconds * 1e3,
+        }
+
+    return {
+        "users": n,
+        "team_size": team_size,
+        "teams": len(sizes),
+        "workers": workers,
+        "pairwise_ms": pairwise_ms,
+        "random_objective": objective(scores, random_split),
+        "greedy_objective": objective(scores, greedy_seed(scores, sizes, rng)),
+        "solver": by_budget,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[600])
+    parser.add_argument("--team-size", type=int, default=4)
+    parser.add_argument(
+        "--budgets", type=float, nargs="+", default=[0.0, 0.1, 0.5, 1.0, 2.0]
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = [
+        run_size(
+            n,
+            team_size=args.team_size,
+            budgets=args.budgets,
+            workers=args.workers,
+            seed=args.seed,
+        )
+        for n in args.sizes
+    ]
+    write_report("team_formation", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
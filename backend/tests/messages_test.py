@@ -1,4 +1,5 @@
 import asyncio
+import json
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock
 
@@ -17,7 +18,8 @@ from app.core.messaging import (
     try_delete_dm_message,
 )
 from app.db.connect import get_db
-from app.routers.auth import get_current_user
+from app.routers.auth import get_current_user, get_current_user_id
+from tests.mongo_commands import mock_database, mongo_commands
 
 TEST_USER_ID = str(ObjectId())
 OTHER_USER_ID = str(ObjectId())
@@ -35,6 +37,7 @@ def mock_db():
 def client(mock_db):
     app.dependency_overrides[get_db] = lambda: mock_db
     app.dependency_overrides[get_current_user] = lambda: {"_id": TEST_USER_ID}
+    app.dependency_overrides[get_current_user_id] = lambda: TEST_USER_ID
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -142,6 +145,7 @@ class TestTryCommitDm:
         assert result.message["_id"] == TEST_MSG_ID
         assert result.message["conversation_id"] == TEST_CONV_ID
         assert result.message["sender_id"] == TEST_USER_ID
+        assert result.recipient_id == ObjectId(OTHER_USER_ID)
         mock_db["messages"].insert_one.assert_called_once()
         mock_db["conversations"].update_one.assert_called_once()
 
@@ -348,6 +352,82 @@ class TestMessagesRouter:
         body = resp.json()
         assert "participants" in body
 
+    @pytest.fixture()
+    def db(self, client):
+        db = mock_database()
+        app.dependency_overrides[get_db] = lambda: db
+        return db
+
+    @staticmethod
+    def _user_doc(user_id):
+        return {
+            "_id": ObjectId(user_id),
+            "username": "someone",
+            "full_name": "Some One",
+            "major": "Computer Science",
+            "skills": [],
+            "created_at": datetime.now(timezone.utc),
+        }
+
+    def test_list_conversations_ndjson_stream(self, client, db, valid_conv_doc):
+        db["conversations"].find.return_value.sort.return_value = [valid_conv_doc]
+        # in whatever order Mongo returns them; conversations keep their own
+        db["users"].find.return_value = [
+            self._user_doc(OTHER_USER_ID),
+            self._user_doc(TEST_USER_ID),
+        ]
+
+        resp = client.get(
+            "/api/messages/conversations",
+            headers={"Accept": "application/x-ndjson"},
+        )
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/x-ndjson"
+        (line,) = resp.text.splitlines()
+        conv = json.loads(line)
+        assert conv["_id"] == TEST_CONV_ID
+        assert [p["_id"] for p in conv["participants"]] == [TEST_USER_ID, OTHER_USER_ID]
+
+    def test_list_conversations_leaves_out_deleted_participants(
+        self, client, db, valid_conv_doc
+    ):
+        db["conversations"].find.return_value.sort.return_value = [valid_conv_doc]
+        # the other account was deleted; cleanup hasn't run yet
+        db["users"].find.return_value = [self._user_doc(TEST_USER_ID)]
+
+        resp = client.get("/api/messages/conversations")
+
+        assert resp.status_code == 200
+        (conv,) = resp.json()
+        assert [p["_id"] for p in conv["participants"]] == [TEST_USER_ID]
+
+    def test_inbox_fetches_every_participant_in_one_query(
+        self, client, db, valid_conv_doc
+    ):
+        others = [str(ObjectId()) for _ in range(3)]
+        convs = [
+            {
+                **valid_conv_doc,
+                "_id": ObjectId(),
+                "participant_ids": [ObjectId(TEST_USER_ID), ObjectId(other)],
+            }
+            for other in others
+        ]
+        db["conversations"].find.return_value.sort.return_value = convs
+        db["users"].find.return_value = [
+            self._user_doc(user_id) for user_id in [TEST_USER_ID, *others]
+        ]
+
+        resp = client.get("/api/messages/conversations")
+
+        assert [conv["participants"][1]["_id"] for conv in resp.json()] == others
+        (user_filter, _), _ = db["users"].find.call_args
+        assert set(user_filter["_id"]["$in"]) == {
+            ObjectId(user_id) for user_id in [TEST_USER_ID, *others]
+        }
+        assert mongo_commands(db) == {"conversations.find": 1, "users.find": 1}
+
     def test_get_messages_forbidden_returns_403(self, client, mock_db):
         mock_db["conversations"].find_one.return_value = {
             "_id": ObjectId(TEST_CONV_ID),
@@ -359,7 +439,7 @@ class TestMessagesRouter:
         assert resp.status_code == 403
 
     def test_send_message_success_returns_201(self, client, mock_db, valid_conv_doc):
-        mock_db["conversations"].find_one.side_effect = [valid_conv_doc, valid_conv_doc]
+        mock_db["conversations"].find_one.return_value = valid_conv_doc
         mock_db["messages"].insert_one.return_value.inserted_id = ObjectId(TEST_MSG_ID)
 
         resp = client.post(
@@ -372,6 +452,8 @@ class TestMessagesRouter:
         assert body["_id"] == TEST_MSG_ID
         assert body["conversation_id"] == TEST_CONV_ID
         assert body["content"] == "hello"
+        # the peer comes from the conversation read for the permission check
+        mock_db["conversations"].find_one.assert_called_once()
 
     def test_delete_message_success_returns_204(self, client, mock_db, valid_conv_doc):
         conversations = MagicMock()
@@ -0,0 +1,54 @@
+"""
+Count the Mongo commands an endpoint sends, against a mocked database.
+
+Each collection method call is one round trip to the server (cursor batches
+aside), so tests pin an endpoint's cost with:
+
+    db = mock_database()
+    ...  # configure db["groups"].find_one_and_update.return_value etc.
+    client.post(...)
+    assert mongo_commands(db) == {"groups.find_one_and_update": 1, ...}
+"""
+
+from collections import Counter, defaultdict
+from unittest.mock import MagicMock
+
+COMMANDS = frozenset(
+    {
+        "aggregate",
+        "bulk_write",
+        "count_documents",
+        "delete_many",
+        "delete_one",
+        "distinct",
+        "find",
+        "find_one",
+        "find_one_and_delete",
+        "find_one_and_replace",
+        "find_one_and_update",
+        "insert_many",
+        "insert_one",
+        "replace_one",
+        "update_many",
+        "update_one",
+    }
+)
+
+
+def mock_database() -> MagicMock:
+    """A MagicMock db whose collections are stable per name, like a real one."""
+    collections: defaultdict[str, MagicMock] = defaultdict(MagicMock)
+    db = MagicMock()
+    db.__getitem__.side_effect = collections.__getitem__
+    db.collections = collections
+    return db
+
+
+def mongo_commands(db: MagicMock) -> Counter:
+    """Commands sent so far through a `mock_database()`, as "collection.method"."""
+    return Counter(
+        f"{name}.{call[0]}"
+        for name, collection in db.collections.items()
+        for call in collection.method_calls
+        if call[0] in COMMANDS
+    )
@@ -1,3 +1,4 @@
+import json
 from datetime import datetime, timezone
 from unittest.mock import MagicMock
 
@@ -7,11 +8,16 @@ from fastapi.testclient import TestClient
 from pymongo.errors import DuplicateKeyError
 
 from app.app import app
+from app.core import account_cleanup
+from app.core.auth_cache import auth_cache
 from app.db.connect import get_db
+from app.routers import auth as auth_router
 from app.routers.auth import (
     create_access_token,
     get_current_user,
+    get_current_user_id,
     hash_password,
+    issue_access_token,
     verify_password,
 )
 
@@ -29,6 +35,13 @@ def _set_jwt_secret(monkeypatch):
     monkeypatch.setenv("JWT_SECRET", TEST_JWT_SECRET)
 
 
+@pytest.fixture(autouse=True)
+def _fresh_auth_cache():
+    auth_cache.clear()
+    yield
+    auth_cache.clear()
+
+
 @pytest.fixture()
 def valid_user_doc():
     return {
@@ -61,6 +74,12 @@ def mock_db():
     return db
 
 
+@pytest.fixture(autouse=True)
+def _no_background_cleanup(monkeypatch):
+    """delete_me queues a cleanup job; keep it off the real worker thread."""
+    monkeypatch.setattr(account_cleanup.cleanup_worker, "submit", MagicMock())
+
+
 @pytest.fixture()
 def client(mock_db):
     """TestClient with get_db overridden to use mock_db."""
@@ -159,6 +178,33 @@ class TestSignUp:
         assert saved_doc["password"] != "Secret123!"
         assert verify_password("Secret123!", saved_doc["password"])
 
+    def test_sign_up_persists_normalized_fields(self, client, mock_db):
+        mock_db["users"].insert_one.return_value = MagicMock(
+            inserted_id=ObjectId(FAKE_OBJ_ID)
+        )
+        payload = {**VALID_SIGNUP_PAYLOAD, "skills": ["Python", " python", "SQL"]}
+
+        client.post("/api/auth/sign-up", json=payload)
+
+        saved_doc = mock_db["users"].insert_one.call_args[0][0]
+        assert saved_doc["skills"] == ["Python", " python", "SQL"]
+        assert saved_doc["skills_norm"] == ["python", "sql"]
+        assert "major_code" not in saved_doc
+
+    def test_sign_up_counts_skills_in_skill_stats(self, client, mock_db):
+        mock_db["users"].insert_one.return_value = MagicMock(
+            inserted_id=ObjectId(FAKE_OBJ_ID)
+        )
+        payload = {**VALID_SIGNUP_PAYLOAD, "skills": ["Go"]}
+
+        client.post("/api/auth/sign-up", json=payload)
+
+        (ops,), _ = mock_db["skill_stats"].bulk_write.call_args
+        assert {op._filter["_id"]: op._doc for op in ops} == {
+            "skill:go": {"$inc": {"count": 1}},
+            "total:users": {"$inc": {"count": 1}},
+        }
+
 
 # ---------------------------------------------------------------------------
 # POST /auth/login
@@ -265,3 +311,175 @@ class TestGetCurrentUser:
         with pytest.raises(HTTPException) as exc_info:
             get_current_user(token=token, db=mock_db)
         assert exc_info.value.status_code == 401
+
+
+# ---------------------------------------------------------------------------
+# Auth cache
+# ---------------------------------------------------------------------------
+
+
+class TestAuthCache:
+    def _headers(self):
+        return {
+            "Authorization": f"Bearer {create_access_token({'sub': 'test@my.unt.edu'})}"
+        }
+
+    def test_repeat_requests_read_the_user_once(self, client, mock_db, valid_user_doc):
+        mock_db["users"].find_one.return_value = valid_user_doc.copy()
+        headers = self._headers()
+
+        first = client.get("/api/users/me", headers=headers)
+        second = client.get("/api/users/me", headers=headers)
+
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json()
+        mock_db["users"].find_one.assert_called_once_with({"email": "test@my.unt.edu"})
+        stats = client.get("/api/auth/cache/stats", headers=headers).json()
+        assert stats["hits"] == 2 and stats["misses"] == 1
+
+    def test_deleted_user_is_rejected_on_the_next_request(
+        self, client, mock_db, valid_user_doc
+    ):
+        mock_db["users"].find_one.return_value = valid_user_doc.copy()
+        headers = self._headers()
+        assert client.get("/api/users/me", headers=headers).status_code == 200
+        mock_db["users"].find_one_and_delete.return_value = valid_user_doc.copy()
+
+        assert client.delete("/api/users/me", headers=headers).status_code == 200
+        mock_db["users"].find_one.return_value = None
+
+        assert client.get("/api/users/me", headers=headers).status_code == 401
+
+    def test_update_me_drops_the_cached_profile(self, client, mock_db, valid_user_doc):
+        mock_db["users"].find_one.return_value = valid_user_doc.copy()
+        headers = self._headers()
+        client.get("/api/users/me", headers=headers)
+
+        renamed = {**valid_user_doc, "username": "renamed"}
+        mock_db["users"].find_one.return_value = renamed
+        mock_db["users"].find_one_and_update.return_value = valid_user_doc.copy()
+        client.patch("/api/users/me", headers=headers, json={"username": "renamed"})
+
+        resp = client.get("/api/users/me", headers=headers)
+        assert resp.json()["username"] == "renamed"
+
+
+# ---------------------------------------------------------------------------
+# User-id subjects, token versions and the id-only dependency
+# ---------------------------------------------------------------------------
+
+
+def _claims(token):
+    from jose import jwt
+
+    return jwt.decode(token, TEST_JWT_SECRET, algorithms=["HS256"])
+
+
+class TestUserIdTokens:
+    def test_login_issues_user_id_subject(self, client, mock_db, valid_user_doc):
+        mock_db["users"].find_one.return_value = valid_user_doc.copy()
+
+        resp = client.post(
+            "/api/auth/login",
+            data={"username": "test@my.unt.edu", "password": "Secret123!"},
+        )
+
+        claims = _claims(resp.json()["access_token"])
+        assert claims["sub"] == FAKE_OBJ_ID
+        assert claims["tv"] == 0
+
+    def test_user_id_token_resolves_by_id(self, mock_db, valid_user_doc):
+        mock_db["users"].find_one.return_value = valid_user_doc.copy()
+
+        user = get_current_user(token=issue_access_token(valid_user_doc), db=mock_db)
+
+        assert user["_id"] == FAKE_OBJ_ID
+        mock_db["users"].find_one.assert_called_once_with(
+            {"_id": ObjectId(FAKE_OBJ_ID)}
+        )
+
+    def test_stale_token_version_is_rejected(self, mock_db, valid_user_doc):
+        from fastapi import HTTPException
+
+        token = issue_access_token(valid_user_doc)
+        mock_db["users"].find_one.return_value = {**valid_user_doc, "token_version": 1}
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_user(token=token, db=mock_db)
+        assert exc_info.value.status_code == 401
+
+    def test_legacy_email_tokens_can_be_switched_off(
+        self, monkeypatch, mock_db, valid_user_doc
+    ):
+        from fastapi import HTTPException
+
+        mock_db["users"].find_one.return_value = valid_user_doc.copy()
+        monkeypatch.setattr(auth_router, "ACCEPT_EMAIL_SUBJECT", False)
+
+        with pytest.raises(HTTPException):
+            get_current_user(
+                token=create_access_token({"sub": "test@my.unt.edu"}), db=mock_db
+            )
+
+    def test_id_only_dependency_skips_the_database(self, mock_db, valid_user_doc):
+        token = issue_access_token(valid_user_doc)
+
+        assert get_current_user_id(token=token, db=mock_db) == FAKE_OBJ_ID
+        mock_db["users"].find_one.assert_not_called()
+
+    def test_id_only_dependency_resolves_legacy_tokens(self, mock_db, valid_user_doc):
+        mock_db["users"].find_one.return_value = valid_user_doc.copy()
+        token = create_access_token({"sub": "test@my.unt.edu"})
+
+        assert get_current_user_id(token=token, db=mock_db) == FAKE_OBJ_ID
+
+    def test_id_only_dependency_rejects_bad_tokens(self, mock_db):
+        from fastapi import HTTPException
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_user_id(token="garbage.token.here", db=mock_db)
+        assert exc_info.value.status_code == 401
+
+    def test_logout_all_revokes_issued_tokens(self, client, mock_db, valid_user_doc):
+        mock_db["users"].find_one.return_value = valid_user_doc.copy()
+        token = issue_access_token(valid_user_doc)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        assert client.post("/api/auth/logout-all", headers=headers).status_code == 200
+        mock_db["users"].update_one.assert_called_once_with(
+            {"_id": ObjectId(FAKE_OBJ_ID)}, {"$inc": {"token_version": 1}}
+        )
+        mock_db["users"].find_one.return_value = {**valid_user_doc, "token_version": 1}
+
+        assert client.get("/api/users/me", headers=headers).status_code == 401
+        # the id-only endpoints learn of it without a database read
+        resp = client.get("/api/messages/conversations", headers=headers)
+        assert resp.status_code == 401
+
+        fresh = issue_access_token({**valid_user_doc, "token_version": 1})
+        assert get_current_user_id(token=fresh, db=mock_db) == FAKE_OBJ_ID
+
+    def test_deleted_user_is_rejected_by_id_only_endpoints(
+        self, client, mock_db, valid_user_doc
+    ):
+        mock_db["users"].find_one.return_value = valid_user_doc.copy()
+        headers = {"Authorization": f"Bearer {issue_access_token(valid_user_doc)}"}
+        mock_db["users"].find_one_and_delete.return_value = valid_user_doc.copy()
+
+        assert client.delete("/api/users/me", headers=headers).status_code == 200
+
+        resp = client.get("/api/messages/conversations", headers=headers)
+        assert resp.status_code == 401
+
+    def test_websocket_handshake_accepts_user_id_tokens(
+        self, client, mock_db, valid_user_doc
+    ):
+        mock_db["users"].find_one.return_value = valid_user_doc.copy()
+        token = issue_access_token(valid_user_doc)
+
+        with client.websocket_connect(f"/api/messages/ws?token={token}") as ws:
+            ws.send_text(json.dumps({"type": "ping", "payload": {}}))
+            assert json.loads(ws.receive_text())["type"] == "pong"
+        mock_db["users"].find_one.assert_called_once_with(
+            {"_id": ObjectId(FAKE_OBJ_ID)}
+        )
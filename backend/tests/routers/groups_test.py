@@ -1,3 +1,4 @@
+import json
 from datetime import datetime, timezone
 from unittest.mock import MagicMock
 
@@ -8,9 +9,12 @@ from fastapi.testclient import TestClient
 from pymongo.errors import DuplicateKeyError
 
 from app.app import app
+from app.core.group_profiles import HAS_ROOM
 from app.db.connect import get_db
+from app.models.schemas import UserRead
 from app.routers import groups as groups_router
 from app.routers.auth import get_current_user
+from tests.mongo_commands import mock_database, mongo_commands
 
 TEST_USER_ID = str(ObjectId())
 TEST_GROUP_ID = str(ObjectId())
@@ -125,26 +129,36 @@ class TestGetGroupDocOr404:
         assert exc_info.value.detail == "Group not found."
 
 
-class TestFetchMembersAsUserReads:
+class TestMemberDocs:
     def test_empty_member_ids_returns_empty_and_no_db_call(self, mock_db):
         """Empty list → returns [] and does not query DB."""
-        result = groups_router._fetch_members_as_user_reads(mock_db, [])
+        result = groups_router._member_docs(mock_db, [])
         assert result == []
         mock_db["users"].find.assert_not_called()
 
-    def test_non_empty_member_ids_calls_db_and_returns_user_reads(
+    def test_non_empty_member_ids_projects_user_read_and_version_fields(
         self, mock_db, valid_user_doc
     ):
-        """Non-empty list → calls db['users'].find with correct filter, returns UserRead with _id stringified."""
-        member_oid = ObjectId(TEST_USER_ID)
-        member_ids = [member_oid]
+        """Non-empty list → one $in query projected to UserRead's fields plus versions."""
+        member_ids = [ObjectId(TEST_USER_ID)]
         user_doc = valid_user_doc.copy()
         mock_db["users"].find.return_value = [user_doc]
-        result = groups_router._fetch_members_as_user_reads(mock_db, member_ids)
-        mock_db["users"].find.assert_called_once_with({"_id": {"$in": member_ids}})
-        assert len(result) == 1
-        assert result[0].id == str(member_oid)
-        assert result[0].username == user_doc["username"]
+        result = groups_router._member_docs(mock_db, member_ids)
+        mock_db["users"].find.assert_called_once_with(
+            {"_id": {"$in": member_ids}}, groups_router.MEMBER_PROJECTION
+        )
+        assert result == [user_doc]
+        assert {"version", "updated_at"} <= set(groups_router.MEMBER_PROJECTION)
+
+    def test_group_payload_has_user_read_shaped_members(
+        self, valid_group_doc, valid_user_doc
+    ):
+        payload = groups_router._group_payload(valid_group_doc, [valid_user_doc])
+        (member,) = payload["members"]
+        assert member["_id"] == valid_user_doc["_id"]
+        assert list(member) == [
+            (f.alias or name) for name, f in UserRead.model_fields.items()
+        ]
 
 
 class TestRequireGroupOwner:
@@ -215,8 +229,11 @@ class TestCreateGroup:
         assert "created_at" in call_args
         assert call_args["name"] == VALID_GROUP_CREATE_PAYLOAD["name"]
 
-    def test_create_group_duplicate_key_returns_400(self, client, mock_db):
+    def test_create_group_duplicate_key_returns_400(
+        self, client, mock_db, valid_user_doc
+    ):
         """DuplicateKeyError on insert_one → 400 with 'A group with this name already exists.'"""
+        mock_db["users"].find.return_value = [valid_user_doc.copy()]
         mock_db["groups"].insert_one.side_effect = DuplicateKeyError("dup")
 
         resp = client.post("/api/groups/", json=VALID_GROUP_CREATE_PAYLOAD)
@@ -224,8 +241,11 @@ class TestCreateGroup:
         assert resp.status_code == 400
         assert "A group with this name already exists." in resp.json()["detail"]
 
-    def test_create_group_generic_db_error_returns_500(self, client, mock_db):
+    def test_create_group_generic_db_error_returns_500(
+        self, client, mock_db, valid_user_doc
+    ):
         """HTTPException from insert path → 500 with 'Failed to create group.'"""
+        mock_db["users"].find.return_value = [valid_user_doc.copy()]
         mock_db["groups"].insert_one.side_effect = HTTPException(
             status_code=500, detail="db error"
         )
@@ -251,7 +271,7 @@ class TestCreateGroupWithInvites:
             groups_router, "get_connection_ids", lambda oid, db: {invitee_oid}
         )
         mock_db["users"].find.side_effect = [
-            [{"_id": invitee_oid}],  # existence check
+            [valid_user_doc.copy(), {"_id": invitee_oid}],  # members' profiles
             [valid_user_doc.copy()],  # member expansion
         ]
         mock_db["groups"].insert_one.return_value = MagicMock(
@@ -265,6 +285,7 @@ class TestCreateGroupWithInvites:
         call_args = mock_db["groups"].insert_one.call_args[0][0]
         assert invitee_oid in call_args["member_ids"]
         assert ObjectId(TEST_USER_ID) in call_args["member_ids"]
+        assert call_args["skill_profile"]["size"] == 2
 
     def test_create_group_with_non_connected_invite_returns_403(
         self, client, mock_db, monkeypatch
@@ -343,15 +364,17 @@ class TestAddMemberAsOwner:
             [{"_id": invitee_oid}],  # existence check
             [valid_user_doc.copy()],  # member expansion
         ]
-        mock_db["groups"].find_one.return_value = updated
+        mock_db["groups"].find_one_and_update.return_value = updated
 
         resp = client.post(f"/api/groups/{TEST_GROUP_ID}/members/{str(invitee_oid)}")
 
         assert resp.status_code == 200
-        mock_db["groups"].update_one.assert_called_once()
-        call_args = mock_db["groups"].update_one.call_args[0]
-        assert call_args[0] == {"_id": group_doc["_id"]}
+        mock_db["groups"].find_one_and_update.assert_called_once()
+        call_args = mock_db["groups"].find_one_and_update.call_args[0]
+        assert call_args[0]["_id"] == group_doc["_id"]
+        assert call_args[0]["member_ids"] == {"$ne": invitee_oid}
         assert "$addToSet" in call_args[1]
+        mock_db["groups"].find_one.assert_not_called()
 
     def test_add_member_not_connected_returns_403(
         self, client, mock_db, valid_group_doc, monkeypatch
@@ -367,7 +390,7 @@ class TestAddMemberAsOwner:
 
         assert resp.status_code == 403
         assert "connected" in resp.json()["detail"]
-        mock_db["groups"].update_one.assert_not_called()
+        mock_db["groups"].find_one_and_update.assert_not_called()
 
     def test_add_member_already_in_group_returns_409(
         self, client, mock_db, valid_group_doc
@@ -384,7 +407,7 @@ class TestAddMemberAsOwner:
 
         assert resp.status_code == 409
         assert "already in group" in resp.json()["detail"]
-        mock_db["groups"].update_one.assert_not_called()
+        mock_db["groups"].find_one_and_update.assert_not_called()
 
     def test_add_member_group_full_returns_400(
         self, client, mock_db, valid_group_doc, monkeypatch
@@ -402,7 +425,7 @@ class TestAddMemberAsOwner:
 
         assert resp.status_code == 400
         assert "Group is full" in resp.json()["detail"]
-        mock_db["groups"].update_one.assert_not_called()
+        mock_db["groups"].find_one_and_update.assert_not_called()
 
     def test_add_member_non_owner_returns_403(self, client, mock_db, valid_group_doc):
         """Caller isn't the owner → 403 via _require_group_owner (real dependency)."""
@@ -460,12 +483,70 @@ class TestListGroups:
         assert data[1]["name"] == "Study Group 2"
         assert len(data[1]["members"]) == len(group2["member_ids"])
 
+    def test_list_groups_ndjson_stream(
+        self, client, mock_db, valid_group_doc, valid_user_doc
+    ):
+        """Accept: application/x-ndjson → one GroupRead per line."""
+        mock_db["groups"].find.return_value = [valid_group_doc.copy()]
+        mock_db["users"].find.return_value = [valid_user_doc.copy()]
+
+        resp = client.get("/api/groups/", headers={"Accept": "application/x-ndjson"})
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/x-ndjson"
+        (line,) = resp.text.splitlines()
+        group = json.loads(line)
+        assert group["_id"] == TEST_GROUP_ID
+        assert group["members"][0]["username"] == "groupuser"
+
     def test_list_groups_unauthenticated_returns_401(self, client_no_auth):
         """No Bearer token → 401 Unauthorized."""
         resp = client_no_auth.get("/api/groups/")
         assert resp.status_code == 401
 
 
+# ---------------------------------------------------------------------------
+# GET /api/groups/recommended (recommend_groups)
+# ---------------------------------------------------------------------------
+
+
+class TestRecommendGroups:
+    def test_ranks_by_stored_profile_without_loading_members(
+        self, client, mock_db, valid_group_doc
+    ):
+        """Scores come from skill_profile alone; users collection is never read."""
+        near = {
+            **valid_group_doc,
+            "member_count": 2,
+            "skill_profile": {"size": 2, "skills": {"python": 2}, "majors": {}},
+        }
+        far = {
+            **valid_group_doc,
+            "_id": ObjectId(),
+            "member_count": 1,
+            "skill_profile": {"size": 1, "skills": {"sql": 1}, "majors": {}},
+        }
+        mock_db["groups"].find.return_value = [far, near]
+        app.dependency_overrides[get_current_user] = lambda: {
+            "_id": TEST_USER_ID,
+            "skills_norm": ["python"],
+        }
+
+        resp = client.get("/api/groups/recommended", params={"limit": 5})
+
+        assert resp.status_code == 200
+        data = resp.json()
+        assert [g["_id"] for g in data] == [TEST_GROUP_ID, str(far["_id"])]
+        assert data[0]["member_count"] == 2
+        assert data[0]["match_score"] > data[1]["match_score"]
+        assert "members" not in data[0]
+        mock_db["users"].find.assert_not_called()
+
+    def test_rejects_unknown_fit(self, client):
+        resp = client.get("/api/groups/recommended", params={"fit": "random"})
+        assert resp.status_code == 422
+
+
 # ---------------------------------------------------------------------------
 # GET /api/groups/{group_id} (get_group_by_id)
 # ---------------------------------------------------------------------------
@@ -489,6 +570,62 @@ class TestGetGroupById:
         assert len(body["members"]) == 1
         assert body["members"][0]["username"] == valid_user_doc["username"]
 
+    def test_get_group_by_id_matching_etag_is_304(
+        self, client, mock_db, valid_group_doc, valid_user_doc
+    ):
+        mock_db["groups"].find_one.return_value = valid_group_doc.copy()
+        mock_db["users"].find.return_value = [valid_user_doc.copy()]
+        etag = client.get(f"/api/groups/{TEST_GROUP_ID}").headers["etag"]
+
+        resp = client.get(
+            f"/api/groups/{TEST_GROUP_ID}", headers={"If-None-Match": f"W/{etag}"}
+        )
+
+        assert resp.status_code == 304
+        assert resp.content == b""
+
+    def test_get_group_by_id_etag_follows_member_versions(
+        self, client, mock_db, valid_group_doc, valid_user_doc
+    ):
+        """A member's profile edit changes the group's ETag without a group write."""
+        mock_db["groups"].find_one.return_value = valid_group_doc.copy()
+        mock_db["users"].find.return_value = [valid_user_doc.copy()]
+        etag = client.get(f"/api/groups/{TEST_GROUP_ID}").headers["etag"]
+        mock_db["users"].find.return_value = [{**valid_user_doc, "version": 3}]
+
+        resp = client.get(
+            f"/api/groups/{TEST_GROUP_ID}", headers={"If-None-Match": etag}
+        )
+
+        assert resp.status_code == 200
+        assert resp.headers["etag"] != etag
+
+    def test_get_group_by_id_is_stable_across_member_fetch_order(
+        self, client, mock_db, valid_group_doc, valid_user_doc
+    ):
+        other = {**valid_user_doc, "_id": ObjectId(), "username": "other"}
+        group_doc = {
+            **valid_group_doc,
+            "member_ids": [ObjectId(TEST_USER_ID), other["_id"]],
+        }
+        mock_db["groups"].find_one.return_value = group_doc
+        mock_db["users"].find.return_value = [valid_user_doc.copy(), other]
+        first = client.get(f"/api/groups/{TEST_GROUP_ID}")
+        mock_db["users"].find.return_value = [other, valid_user_doc.copy()]
+
+        resp = client.get(
+            f"/api/groups/{TEST_GROUP_ID}",
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+
+        assert resp.status_code == 304
+        second = client.get(f"/api/groups/{TEST_GROUP_ID}")
+        assert second.json()["members"] == first.json()["members"]
+        assert [m["username"] for m in first.json()["members"]] == [
+            "groupuser",
+            "other",
+        ]
+
     def test_get_group_by_id_invalid_format_returns_400(self, client):
         """Invalid group_id format → 400 with correct message."""
         resp = client.get("/api/groups/not-an-objectid")
@@ -528,7 +665,7 @@ class TestUpdateGroup:
         updated_doc = group_doc.copy()
         updated_doc["name"] = "Updated Name"
         updated_doc["description"] = "Updated description."
-        mock_db["groups"].find_one.return_value = updated_doc
+        mock_db["groups"].find_one_and_update.return_value = updated_doc
         mock_db["users"].find.return_value = [valid_user_doc.copy()]
 
         resp = client.patch(
@@ -540,10 +677,11 @@ class TestUpdateGroup:
         body = resp.json()
         assert body["name"] == "Updated Name"
         assert body["description"] == "Updated description."
-        mock_db["groups"].update_one.assert_called_once()
-        call_args = mock_db["groups"].update_one.call_args[0]
+        mock_db["groups"].find_one_and_update.assert_called_once()
+        call_args = mock_db["groups"].find_one_and_update.call_args[0]
         assert call_args[0] == {"_id": group_doc["_id"]}
         assert "$set" in call_args[1]
+        mock_db["groups"].find_one.assert_not_called()
 
     def test_update_group_empty_payload_returns_400(
         self, client, mock_db, valid_group_doc
@@ -576,13 +714,35 @@ class TestUpdateGroup:
             in resp.json()["detail"]
         )
 
+    def test_update_group_max_members_is_checked_in_the_write(
+        self, client, mock_db, valid_group_doc
+    ):
+        """Members joined since the owner check → the filter misses → 400."""
+        group_doc = valid_group_doc.copy()
+        app.dependency_overrides[groups_router._require_group_owner] = (
+            lambda group_id=None, db=None, current_user=None: group_doc
+        )
+        mock_db["groups"].find_one_and_update.return_value = None
+        mock_db["groups"].find_one.return_value = {
+            **group_doc,
+            "member_ids": [ObjectId(TEST_USER_ID), ObjectId(), ObjectId()],
+        }
+
+        resp = client.patch(f"/api/groups/{TEST_GROUP_ID}", json={"max_members": 2})
+
+        assert resp.status_code == 400
+        assert "max_members cannot be less" in resp.json()["detail"]
+        (group_filter, _), _ = mock_db["groups"].find_one_and_update.call_args
+        assert group_filter["$expr"]["$lte"][1] == 2
+
     def test_update_group_not_found_after_update_returns_404(
         self, client, mock_db, valid_group_doc
     ):
-        """find_one returns None after update_one → 404."""
+        """The group is gone by the time of the write → 404."""
         app.dependency_overrides[groups_router._require_group_owner] = (
             lambda group_id=None, db=None, current_user=None: valid_group_doc.copy()
         )
+        mock_db["groups"].find_one_and_update.return_value = None
         mock_db["groups"].find_one.return_value = None
 
         resp = client.patch(f"/api/groups/{TEST_GROUP_ID}", json={"name": "New Name"})
@@ -626,24 +786,37 @@ class TestAddMember:
         group_doc["member_ids"] = [other_oid]
         updated_doc = group_doc.copy()
         updated_doc["member_ids"] = [other_oid, ObjectId(TEST_USER_ID)]
-        mock_db["groups"].find_one.side_effect = [group_doc, updated_doc]
+        mock_db["groups"].find_one_and_update.return_value = updated_doc
         mock_db["users"].find.return_value = [valid_user_doc.copy()]
+        mock_db["users"].find_one.return_value = {"skills_norm": ["python"]}
 
         resp = client.post(f"/api/groups/{TEST_GROUP_ID}/join")
 
         assert resp.status_code == 200
         body = resp.json()
         assert len(body["members"]) >= 1
-        mock_db["groups"].update_one.assert_called_once()
-        call_args = mock_db["groups"].update_one.call_args[0]
-        assert call_args[0] == {"_id": group_doc["_id"]}
+        mock_db["groups"].find_one_and_update.assert_called_once()
+        call_args = mock_db["groups"].find_one_and_update.call_args[0]
+        assert call_args[0] == {
+            "_id": group_doc["_id"],
+            "member_ids": {"$ne": ObjectId(TEST_USER_ID)},
+            "$expr": HAS_ROOM,
+        }
         assert "$addToSet" in call_args[1]
+        # from the stored profile, not the cached current_user
+        assert call_args[1]["$inc"] == {
+            "skill_profile.size": 1,
+            "skill_profile.skills.python": 1,
+            "version": 1,
+        }
+        assert "updated_at" in call_args[1]["$set"]
 
     def test_join_group_already_member_returns_409(
         self, client, mock_db, valid_group_doc
     ):
         """User already in member_ids → 409 'User already in group.'"""
         group_doc = valid_group_doc.copy()
+        mock_db["groups"].find_one_and_update.return_value = None
         mock_db["groups"].find_one.return_value = group_doc
 
         resp = client.post(f"/api/groups/{TEST_GROUP_ID}/join")
@@ -657,6 +830,7 @@ class TestAddMember:
         group_doc["max_members"] = 2
         group_doc["member_ids"] = [ObjectId(), ObjectId()]
         group_doc["created_by"] = group_doc["member_ids"][0]
+        mock_db["groups"].find_one_and_update.return_value = None
         mock_db["groups"].find_one.return_value = group_doc
 
         resp = client.post(f"/api/groups/{TEST_GROUP_ID}/join")
@@ -671,7 +845,8 @@ class TestAddMember:
         assert "Invalid group id format" in resp.json()["detail"]
 
     def test_join_group_not_found_returns_404(self, client, mock_db):
-        """Valid group_id but find_one returns None → 404."""
+        """Valid group_id but no such group → 404."""
+        mock_db["groups"].find_one_and_update.return_value = None
         mock_db["groups"].find_one.return_value = None
 
         resp = client.post(f"/api/groups/{TEST_GROUP_ID}/join")
@@ -694,25 +869,37 @@ class TestLeaveGroup:
         group_doc = valid_group_doc.copy()
         group_doc["created_by"] = other_user_oid
         group_doc["member_ids"] = [other_user_oid, ObjectId(TEST_USER_ID)]
-        mock_db["groups"].find_one.return_value = group_doc
         after_leave = group_doc.copy()
         after_leave["member_ids"] = [other_user_oid]
-        mock_db["groups"].find_one.side_effect = [group_doc, after_leave]
-        mock_db["users"].find.return_value = [valid_user_doc.copy()]
+        mock_db["groups"].find_one_and_update.return_value = after_leave
+        mock_db["users"].find.return_value = [{**valid_user_doc, "_id": other_user_oid}]
+        mock_db["users"].find_one.return_value = {"skills_norm": ["python"]}
 
         resp = client.post(f"/api/groups/{TEST_GROUP_ID}/leave")
 
         assert resp.status_code == 200
         body = resp.json()
         assert len(body["members"]) == 1
-        mock_db["groups"].update_one.assert_called_once()
-        call_args = mock_db["groups"].update_one.call_args[0]
+        mock_db["groups"].find_one_and_update.assert_called_once()
+        call_args = mock_db["groups"].find_one_and_update.call_args[0]
+        assert call_args[0] == {
+            "_id": group_doc["_id"],
+            "member_ids": ObjectId(TEST_USER_ID),
+            "created_by": {"$ne": ObjectId(TEST_USER_ID)},
+        }
         assert "$pull" in call_args[1]
+        assert call_args[1]["$inc"] == {
+            "skill_profile.size": -1,
+            "skill_profile.skills.python": -1,
+            "version": 1,
+        }
+        assert "updated_at" in call_args[1]["$set"]
 
     def test_leave_group_owner_cannot_leave_returns_403(
         self, client, mock_db, valid_group_doc
     ):
         """created_by == current user → 403 owner cannot leave."""
+        mock_db["groups"].find_one_and_update.return_value = None
         mock_db["groups"].find_one.return_value = valid_group_doc.copy()
 
         resp = client.post(f"/api/groups/{TEST_GROUP_ID}/leave")
@@ -727,6 +914,7 @@ class TestLeaveGroup:
         group_doc["member_ids"] = [
             group_doc["created_by"]
         ]  # only owner, not current user
+        mock_db["groups"].find_one_and_update.return_value = None
         mock_db["groups"].find_one.return_value = group_doc
 
         resp = client.post(f"/api/groups/{TEST_GROUP_ID}/leave")
@@ -741,10 +929,96 @@ class TestLeaveGroup:
         assert "Invalid group id format" in resp.json()["detail"]
 
     def test_leave_group_not_found_returns_404(self, client, mock_db):
-        """Valid group_id but find_one returns None → 404."""
+        """Valid group_id but no such group → 404."""
+        mock_db["groups"].find_one_and_update.return_value = None
         mock_db["groups"].find_one.return_value = None
 
         resp = client.post(f"/api/groups/{TEST_GROUP_ID}/leave")
 
         assert resp.status_code == 404
         assert "Group not found" in resp.json()["detail"]
+
+
+# ---------------------------------------------------------------------------
+# Mongo round trips per write endpoint
+# ---------------------------------------------------------------------------
+
+
+class TestRoundTrips:
+    @pytest.fixture()
+    def db(self, client):
+        db = mock_database()
+        app.dependency_overrides[get_db] = lambda: db
+        return db
+
+    def test_join_is_one_write_between_profile_and_member_fetches(
+        self, client, db, valid_group_doc, valid_user_doc
+    ):
+        db["groups"].find_one_and_update.return_value = valid_group_doc.copy()
+        db["users"].find.return_value = [valid_user_doc.copy()]
+
+        assert client.post(f"/api/groups/{TEST_GROUP_ID}/join").status_code == 200
+        assert mongo_commands(db) == {
+            "users.find_one": 1,  # the joiner's stored profile
+            "groups.find_one_and_update": 1,
+            "users.find": 1,
+        }
+
+    def test_refused_join_reads_the_group_once_to_explain(
+        self, client, db, valid_group_doc
+    ):
+        db["groups"].find_one_and_update.return_value = None
+        db["groups"].find_one.return_value = valid_group_doc.copy()
+
+        assert client.post(f"/api/groups/{TEST_GROUP_ID}/join").status_code == 409
+        assert mongo_commands(db) == {
+            "users.find_one": 1,
+            "groups.find_one_and_update": 1,
+            "groups.find_one": 1,
+        }
+
+    def test_leave_is_one_write_between_profile_and_member_fetches(
+        self, client, db, valid_group_doc, valid_user_doc
+    ):
+        db["groups"].find_one_and_update.return_value = valid_group_doc.copy()
+        db["users"].find.return_value = [valid_user_doc.copy()]
+
+        assert client.post(f"/api/groups/{TEST_GROUP_ID}/leave").status_code == 200
+        assert mongo_commands(db) == {
+            "users.find_one": 1,  # the leaver's stored profile
+            "groups.find_one_and_update": 1,
+            "users.find": 1,
+        }
+
+    def test_add_member_as_owner(self, client, db, valid_group_doc, valid_user_doc):
+        invitee_oid = ObjectId()
+        db["groups"].find_one.return_value = valid_group_doc.copy()
+        db["match_requests"].find.return_value = [
+            {"sender_id": ObjectId(TEST_USER_ID), "receiver_id": invitee_oid}
+        ]
+        db["users"].find.side_effect = [[{"_id": invitee_oid}], [valid_user_doc]]
+        db["groups"].find_one_and_update.return_value = valid_group_doc.copy()
+
+        resp = client.post(f"/api/groups/{TEST_GROUP_ID}/members/{invitee_oid}")
+
+        assert resp.status_code == 200
+        assert mongo_commands(db) == {
+            "groups.find_one": 1,  # owner check
+            "match_requests.find": 1,  # connection check
+            "users.find": 2,  # invitee's profile, then the members
+            "groups.find_one_and_update": 1,
+        }
+
+    def test_update_group(self, client, db, valid_group_doc, valid_user_doc):
+        db["groups"].find_one.return_value = valid_group_doc.copy()
+        db["groups"].find_one_and_update.return_value = valid_group_doc.copy()
+        db["users"].find.return_value = [valid_user_doc.copy()]
+
+        resp = client.patch(f"/api/groups/{TEST_GROUP_ID}", json={"name": "New"})
+
+        assert resp.status_code == 200
+        assert mongo_commands(db) == {
+            "groups.find_one": 1,  # owner check
+            "groups.find_one_and_update": 1,
+            "users.find": 1,
+        }
@@ -0,0 +1,197 @@
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from pymongo import ReturnDocument
+
+from app.app import app
+from app.core.suggestion_cache import suggestion_cache
+from app.db.connect import get_db
+from app.routers.auth import get_current_user
+from tests.mongo_commands import mock_database, mongo_commands
+
+TEST_USER_ID = str(ObjectId())
+SENDER_ID = ObjectId()
+REQUEST_ID = ObjectId()
+
+
+@pytest.fixture()
+def db():
+    return mock_database()
+
+
+@pytest.fixture()
+def client(db):
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: {
+        "_id": TEST_USER_ID,
+        "username": "receiver",
+    }
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    suggestion_cache.clear()
+
+
+def _request_doc(**overrides):
+    doc = {
+        "_id": REQUEST_ID,
+        "sender_id": SENDER_ID,
+        "receiver_id": ObjectId(TEST_USER_ID),
+        "status": "pending",
+        "created_at": datetime.now(timezone.utc),
+        "updated_at": None,
+    }
+    doc.update(overrides)
+    return doc
+
+
+def _patch(client, status="accepted", request_id=REQUEST_ID):
+    return client.patch(f"/api/match/requests/{request_id}", json={"status": status})
+
+
+# ---------------------------------------------------------------------------
+# PATCH /api/match/requests/{request_id} (update_match_request)
+# ---------------------------------------------------------------------------
+
+
+class TestUpdateMatchRequest:
+    def test_accept_is_a_single_conditional_write(self, client, db):
+        accepted = _request_doc(
+            status="accepted", updated_at=datetime.now(timezone.utc)
+        )
+        db["match_requests"].find_one_and_update.return_value = accepted
+
+        resp = _patch(client)
+
+        assert resp.status_code == 200
+        assert resp.json()["status"] == "accepted"
+        (request_filter, update), kwargs = db[
+            "match_requests"
+        ].find_one_and_update.call_args
+        assert request_filter == {
+            "_id": REQUEST_ID,
+            "receiver_id": ObjectId(TEST_USER_ID),
+            "status": "pending",
+        }
+        assert update["$set"]["status"] == "accepted"
+        assert kwargs["return_document"] == ReturnDocument.AFTER
+        assert mongo_commands(db) == {
+            "match_requests.find_one_and_update": 1,
+            "suggestions.delete_many": 1,  # the pair's precomputed suggestions
+        }
+
+    def test_missing_request_returns_404(self, client, db):
+        db["match_requests"].find_one_and_update.return_value = None
+        db["match_requests"].find_one.return_value = None
+
+        resp = _patch(client)
+
+        assert resp.status_code == 404
+        assert resp.json()["detail"] == "Match request not found."
+
+    def test_request_sent_to_someone_else_returns_403(self, client, db):
+        db["match_requests"].find_one_and_update.return_value = None
+        db["match_requests"].find_one.return_value = _request_doc(
+            receiver_id=ObjectId()
+        )
+
+        resp = _patch(client, status="rejected")
+
+        assert resp.status_code == 403
+        assert resp.json()["detail"] == "You can only reject requests sent to you."
+
+    def test_processed_request_returns_400(self, client, db):
+        db["match_requests"].find_one_and_update.return_value = None
+        db["match_requests"].find_one.return_value = _request_doc(status="accepted")
+
+        resp = _patch(client)
+
+        assert resp.status_code == 400
+        assert resp.json()["detail"] == "This request has already been processed."
+        assert mongo_commands(db) == {
+            "match_requests.find_one_and_update": 1,
+            "match_requests.find_one": 1,
+        }
+
+    def test_invalid_id_returns_400_without_a_query(self, client, db):
+        resp = _patch(client, request_id="not-an-objectid")
+
+        assert resp.status_code == 400
+        assert resp.json()["detail"] == "Invalid request id format."
+        assert mongo_commands(db) == {}
+
+
+def _user_doc(oid, username):
+    return {
+        "_id": oid,
+        "username": username,
+        "full_name": username.title(),
+        "major": "Computer Science",
+        "bio": None,
+        "skills": ["Python"],
+        "external_links": {},
+        "created_at": datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc),
+    }
+
+
+# ---------------------------------------------------------------------------
+# GET /api/match/requests/incoming, /outgoing and /api/match/connections
+# ---------------------------------------------------------------------------
+
+
+class TestReads:
+    def test_incoming_requests_embed_senders_from_one_query(self, client, db):
+        other = ObjectId()
+        db["match_requests"].find.return_value = [
+            _request_doc(),
+            _request_doc(_id=ObjectId(), sender_id=other),
+        ]
+        # the second sender's account is gone
+        db["users"].find.return_value = [_user_doc(SENDER_ID, "sender")]
+
+        resp = client.get("/api/match/requests/incoming")
+
+        assert resp.status_code == 200
+        first, second = resp.json()
+        assert first["_id"] == str(REQUEST_ID)
+        assert first["sender_id"] == str(SENDER_ID)
+        assert first["status"] == "pending"
+        assert first["sender"]["_id"] == str(SENDER_ID)
+        assert first["sender"]["username"] == "sender"
+        assert first["receiver"] is None
+        assert second["sender"] is None
+        (user_filter, _), _ = db["users"].find.call_args
+        assert set(user_filter["_id"]["$in"]) == {SENDER_ID, other}
+        assert mongo_commands(db) == {"match_requests.find": 1, "users.find": 1}
+
+    def test_outgoing_requests_embed_receivers(self, client, db):
+        receiver = ObjectId()
+        db["match_requests"].find.return_value = [
+            _request_doc(sender_id=ObjectId(TEST_USER_ID), receiver_id=receiver)
+        ]
+        db["users"].find.return_value = [_user_doc(receiver, "receiver")]
+
+        (request,) = client.get("/api/match/requests/outgoing").json()
+
+        assert request["receiver"]["username"] == "receiver"
+        assert request["sender"] is None
+
+    def test_no_requests_skips_the_user_query(self, client, db):
+        db["match_requests"].find.return_value = []
+
+        assert client.get("/api/match/requests/incoming").json() == []
+        assert mongo_commands(db) == {"match_requests.find": 1}
+
+    def test_connections_are_fetched_in_one_query(self, client, db):
+        db["match_requests"].find.return_value = [
+            {"sender_id": SENDER_ID, "receiver_id": ObjectId(TEST_USER_ID)}
+        ]
+        db["users"].find.return_value = [_user_doc(SENDER_ID, "sender")]
+
+        resp = client.get("/api/match/connections")
+
+        assert resp.status_code == 200
+        assert [user["username"] for user in resp.json()] == ["sender"]
+        assert resp.json()[0]["_id"] == str(SENDER_ID)
+        assert mongo_commands(db) == {"match_requests.find": 1, "users.find": 1}
@@ -0,0 +1,781 @@
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from pymongo import ReturnDocument
+
+from app.app import app
+from app.core import account_cleanup
+from app.core.lsh import lsh_index
+from app.core.matching import SCORING_PROJECTION
+from app.core.people_search import people_index
+from app.core.skill_index import skill_index
+from app.core.suggestion_cache import suggestion_cache
+from app.core.suggestion_snapshots import encode_cursor, suggestion_snapshots
+from app.core.suggestions import USER_READ_PROJECTION
+from app.db.connect import get_db
+from app.routers import users as users_router
+from app.routers.auth import get_current_user
+from tests.mongo_commands import mock_database, mongo_commands
+
+TEST_USER_ID = str(ObjectId())
+
+
+def _user_doc(oid=None, skills=None, major="Computer Science", username="someone"):
+    return {
+        "_id": oid or ObjectId(),
+        "username": username,
+        "full_name": username.title(),
+        "major": major,
+        "bio": None,
+        "skills": skills or [],
+        "external_links": {},
+        "email": f"{username}@my.unt.edu",
+        "password": "hashed",
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def _before(doc):
+    """The stored document a users write returns as its before image."""
+    return {**doc, "_id": ObjectId(doc["_id"])}
+
+
+@pytest.fixture()
+def current_user_doc():
+    doc = _user_doc(ObjectId(TEST_USER_ID), ["Python", "Java"], username="me")
+    doc["_id"] = TEST_USER_ID
+    return doc
+
+
+@pytest.fixture()
+def mock_db():
+    collections = {
+        "users": MagicMock(),
+        "match_requests": MagicMock(),
+        "suggestions": MagicMock(),
+        "skill_stats": MagicMock(),
+        "groups": MagicMock(),
+    }
+    collections["match_requests"].find.return_value = []
+    collections["suggestions"].find_one.return_value = None
+
+    def getitem(k):
+        return collections.get(k) or MagicMock()
+
+    db = MagicMock()
+    db.__getitem__.side_effect = getitem
+    return db
+
+
+@pytest.fixture(autouse=True)
+def _fresh_matching_state():
+    skill_index.clear()
+    lsh_index.clear()
+    suggestion_cache.clear()
+    suggestion_snapshots.clear()
+    people_index.clear()
+    yield
+    skill_index.clear()
+    lsh_index.clear()
+    suggestion_cache.clear()
+    suggestion_snapshots.clear()
+    people_index.clear()
+
+
+@pytest.fixture(autouse=True)
+def _no_background_cleanup(monkeypatch):
+    """delete_me queues a cleanup job; keep it off the real worker thread."""
+    monkeypatch.setattr(account_cleanup.cleanup_worker, "submit", MagicMock())
+
+
+@pytest.fixture()
+def client(mock_db, current_user_doc):
+    app.dependency_overrides[get_db] = lambda: mock_db
+    app.dependency_overrides[get_current_user] = lambda: current_user_doc.copy()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+# ---------------------------------------------------------------------------
+# GET /api/users/ (directory)
+# ---------------------------------------------------------------------------
+
+
+class TestListUsers:
+    def _serve(self, mock_db, docs):
+        cursor = mock_db["users"].find.return_value.sort.return_value
+        cursor.__iter__.return_value = iter(docs)
+        cursor.limit.return_value = cursor
+        return cursor
+
+    def test_unpaged_lists_everyone_with_projection(self, client, mock_db):
+        self._serve(mock_db, [_user_doc(), _user_doc()])
+
+        resp = client.get("/api/users/")
+
+        assert resp.status_code == 200
+        assert len(resp.json()) == 2
+        assert "X-Next-Cursor" not in resp.headers
+        query, projection = mock_db["users"].find.call_args[0]
+        assert query == {}
+        assert projection == USER_READ_PROJECTION
+        assert "password" not in projection
+        mock_db["users"].find.return_value.sort.assert_called_once_with("_id", 1)
+
+    def test_full_page_returns_cursor_to_last_id(self, client, mock_db):
+        docs = [_user_doc() for _ in range(3)]
+        cursor = self._serve(mock_db, docs)
+
+        resp = client.get("/api/users/", params={"limit": 2})
+
+        cursor.limit.assert_called_once_with(3)
+        assert [u["_id"] for u in resp.json()] == [str(d["_id"]) for d in docs[:2]]
+        assert resp.headers["X-Next-Cursor"] == str(docs[1]["_id"])
+
+    def test_last_page_has_no_cursor(self, client, mock_db):
+        self._serve(mock_db, [_user_doc()])
+
+        resp = client.get("/api/users/", params={"limit": 2})
+
+        assert len(resp.json()) == 1
+        assert "X-Next-Cursor" not in resp.headers
+
+    def test_after_and_filters_reach_the_query(self, client, mock_db):
+        self._serve(mock_db, [])
+        after = ObjectId()
+
+        client.get(
+            "/api/users/",
+            params={
+                "after": str(after),
+                "limit": 10,
+                "major": "Data Science",
+                "skill": "JS",
+                "name": "Ada",
+            },
+        )
+
+        query = mock_db["users"].find.call_args[0][0]
+        assert query["_id"] == {"$gt": after}
+        assert query["major"] == "Data Science"
+        assert query["skills_norm"] == "javascript"
+        assert query["$or"] == [
+            {"username_lower": {"$regex": "^ada"}},
+            {"full_name_keys": {"$regex": "^ada"}},
+        ]
+
+    def test_ndjson_streams_straight_from_the_cursor(self, client, mock_db):
+        docs = [_user_doc(), _user_doc()]
+        cursor = self._serve(mock_db, docs)
+
+        resp = client.get("/api/users/", headers={"Accept": "application/x-ndjson"})
+
+        assert resp.headers["content-type"] == "application/x-ndjson"
+        lines = resp.text.splitlines()
+        assert [json.loads(line)["_id"] for line in lines] == [
+            str(d["_id"]) for d in docs
+        ]
+        cursor.limit.assert_not_called()
+
+    def test_streamed_page_keeps_next_cursor(self, client, mock_db):
+        docs = [_user_doc() for _ in range(3)]
+        self._serve(mock_db, docs)
+
+        resp = client.get(
+            "/api/users/",
+            params={"limit": 2},
+            headers={"Accept": "application/json; stream=array"},
+        )
+
+        assert len(resp.json()) == 2
+        assert resp.headers["X-Next-Cursor"] == str(docs[1]["_id"])
+
+    def test_invalid_after_returns_400(self, client):
+        resp = client.get("/api/users/", params={"after": "nope"})
+        assert resp.status_code == 400
+
+    def test_limit_is_capped(self, client):
+        resp = client.get("/api/users/", params={"limit": 10_000})
+        assert resp.status_code == 422
+
+
+# ---------------------------------------------------------------------------
+# GET /api/users/search
+# ---------------------------------------------------------------------------
+
+
+class TestSearchUsers:
+    def _directory(self, mock_db):
+        mock_db["users"].find.return_value = [
+            _user_doc(skills=["Rust"], username="ada"),
+            _user_doc(skills=["Python"], username="alan"),
+        ]
+
+    def test_prefix_returns_lightweight_hits(self, client, mock_db):
+        self._directory(mock_db)
+
+        resp = client.get("/api/users/search", params={"q": "ad"})
+
+        assert resp.status_code == 200
+        (hit,) = resp.json()
+        assert hit["username"] == "ada"
+        assert set(hit) == {
+            "_id",
+            "username",
+            "full_name",
+            "major",
+            "avatar_url",
+            "score",
+        }
+
+    def test_text_mode_is_scored(self, client, mock_db):
+        self._directory(mock_db)
+
+        resp = client.get("/api/users/search", params={"q": "python", "mode": "text"})
+
+        (hit,) = resp.json()
+        assert hit["username"] == "alan"
+        assert hit["score"] > 0
+
+    def test_index_follows_profile_edits(self, client, mock_db, current_user_doc):
+        self._directory(mock_db)
+        client.get("/api/users/search", params={"q": "a"})
+        mock_db["users"].find_one_and_update.return_value = _before(current_user_doc)
+
+        client.patch("/api/users/me", json={"username": "zelda"})
+        resp = client.get("/api/users/search", params={"q": "zel"})
+
+        assert [hit["_id"] for hit in resp.json()] == [TEST_USER_ID]
+
+    def test_empty_query_is_rejected(self, client):
+        assert client.get("/api/users/search", params={"q": ""}).status_code == 422
+
+
+# ---------------------------------------------------------------------------
+# POST /api/users/batch
+# ---------------------------------------------------------------------------
+
+
+class TestUsersBatch:
+    def test_one_query_in_request_order_with_missing_ids(self, client, mock_db):
+        ada, alan = _user_doc(username="ada"), _user_doc(username="alan")
+        ghost = ObjectId()
+        # Mongo returns $in matches in its own order
+        mock_db["users"].find.return_value = [ada, alan]
+        ids = [str(alan["_id"]), str(ghost), str(ada["_id"]), str(alan["_id"])]
+
+        resp = client.post("/api/users/batch", json={"ids": ids})
+
+        assert resp.status_code == 200
+        body = resp.json()
+        assert [u["username"] for u in body["users"]] == ["alan", "ada"]
+        assert body["missing"] == [str(ghost)]
+        assert "email" not in body["users"][0]
+        mock_db["users"].find.assert_called_once_with(
+            {"_id": {"$in": [alan["_id"], ghost, ada["_id"]]}}, USER_READ_PROJECTION
+        )
+
+    def test_invalid_id_is_400_without_a_query(self, client, mock_db):
+        resp = client.post("/api/users/batch", json={"ids": [str(ObjectId()), "nope"]})
+
+        assert resp.status_code == 400
+        assert "nope" in resp.json()["detail"]
+        mock_db["users"].find.assert_not_called()
+
+    @pytest.mark.parametrize("count", [0, 501])
+    def test_batch_size_is_bounded(self, client, count):
+        ids = [str(ObjectId()) for _ in range(count)]
+        assert client.post("/api/users/batch", json={"ids": ids}).status_code == 422
+
+
+# ---------------------------------------------------------------------------
+# Conditional GET /api/users/me and /api/users/{id}
+# ---------------------------------------------------------------------------
+
+
+class TestConditionalGet:
+    def test_get_me_sends_validators(self, client, current_user_doc):
+        resp = client.get("/api/users/me")
+
+        assert resp.status_code == 200
+        assert resp.json()["username"] == "me"
+        assert resp.headers["etag"].startswith('"')
+        assert resp.headers["last-modified"].endswith("GMT")
+        assert resp.headers["cache-control"] == "private, no-cache"
+
+    def test_get_me_matching_etag_is_304_without_body(self, client):
+        etag = client.get("/api/users/me").headers["etag"]
+
+        resp = client.get("/api/users/me", headers={"If-None-Match": etag})
+
+        assert resp.status_code == 304
+        assert resp.content == b""
+        assert resp.headers["etag"] == etag
+
+    def test_get_me_new_version_changes_etag(self, client, current_user_doc):
+        etag = client.get("/api/users/me").headers["etag"]
+        current_user_doc["version"] = 2  # the client fixture copies it per request
+
+        resp = client.get("/api/users/me", headers={"If-None-Match": etag})
+
+        assert resp.status_code == 200
+        assert resp.headers["etag"] != etag
+
+    def test_get_user_by_id_if_modified_since(self, client, mock_db):
+        doc = _user_doc(username="ada")
+        doc["updated_at"] = datetime(2025, 3, 1, 12, 0, 0, 500000)
+        mock_db["users"].find_one.return_value = doc
+
+        fresh = client.get(
+            f"/api/users/{doc['_id']}",
+            headers={"If-Modified-Since": "Sat, 01 Mar 2025 12:00:00 GMT"},
+        )
+        stale = client.get(
+            f"/api/users/{doc['_id']}",
+            headers={"If-Modified-Since": "Sat, 01 Mar 2025 11:59:59 GMT"},
+        )
+
+        assert fresh.status_code == 304
+        assert stale.status_code == 200
+        assert stale.headers["last-modified"] == "Sat, 01 Mar 2025 12:00:00 GMT"
+        assert stale.json()["username"] == "ada"
+
+    def test_update_me_bumps_version(self, client, mock_db, current_user_doc):
+        mock_db["users"].find_one_and_update.return_value = {
+            **_before(current_user_doc),
+            "version": 4,
+        }
+
+        resp = client.patch("/api/users/me", json={"bio": "hi"})
+
+        (_, update), kwargs = mock_db["users"].find_one_and_update.call_args
+        assert update["$inc"] == {"version": 1}
+        assert update["$set"]["bio"] == "hi"
+        assert isinstance(update["$set"]["updated_at"], datetime)
+        assert kwargs["return_document"] == ReturnDocument.BEFORE
+        assert resp.json()["bio"] == "hi"
+
+
+# ---------------------------------------------------------------------------
+# PATCH / DELETE /api/users/me
+# ---------------------------------------------------------------------------
+
+
+def _skill_stats_ops(mock_db):
+    (ops,), _ = mock_db["skill_stats"].bulk_write.call_args
+    return {op._filter["_id"]: op._doc for op in ops}
+
+
+class TestProfileWritesMaintainSkillStats:
+    def test_update_me_records_skill_diff(self, client, mock_db, current_user_doc):
+        mock_db["users"].find_one_and_update.return_value = _before(current_user_doc)
+
+        resp = client.patch("/api/users/me", json={"skills": ["Python", "Rust"]})
+
+        assert resp.status_code == 200
+        assert _skill_stats_ops(mock_db) == {
+            "skill:rust": {"$inc": {"count": 1}},
+            "skill:java": {"$inc": {"count": -1}},
+        }
+
+    def test_update_me_diffs_against_the_writes_before_image(
+        self, client, mock_db, current_user_doc
+    ):
+        # a concurrent edit already replaced Java with Go; the cached
+        # current_user still says Java
+        mock_db["users"].find_one_and_update.return_value = {
+            **_before(current_user_doc),
+            "skills": ["Python", "Go"],
+            "skills_norm": ["python", "go"],
+        }
+
+        client.patch("/api/users/me", json={"skills": ["Python", "Rust"]})
+
+        assert _skill_stats_ops(mock_db) == {
+            "skill:rust": {"$inc": {"count": 1}},
+            "skill:go": {"$inc": {"count": -1}},
+        }
+
+    def test_update_me_with_a_blank_skill_saves_and_moves_group_counts(
+        self, client, mock_db, current_user_doc
+    ):
+        mock_db["users"].find_one_and_update.return_value = _before(current_user_doc)
+
+        resp = client.patch("/api/users/me", json={"skills": ["Python", "  "]})
+
+        assert resp.status_code == 200
+        (_, update), _ = mock_db["users"].find_one_and_update.call_args
+        assert update["$set"]["skills_norm"] == ["python"]
+        (_, group_update), _ = mock_db["groups"].update_many.call_args
+        assert group_update == {"$inc": {"skill_profile.skills.java": -1}}
+
+    def test_update_me_without_skills_leaves_stats_alone(
+        self, client, mock_db, current_user_doc
+    ):
+        mock_db["users"].find_one_and_update.return_value = _before(current_user_doc)
+
+        client.patch("/api/users/me", json={"bio": "hi"})
+
+        mock_db["skill_stats"].bulk_write.assert_not_called()
+
+    def test_update_me_moves_major_in_member_groups(
+        self, client, mock_db, current_user_doc
+    ):
+        mock_db["users"].find_one_and_update.return_value = _before(current_user_doc)
+
+        client.patch("/api/users/me", json={"major": "Data Science"})
+
+        mock_db["groups"].update_many.assert_called_once_with(
+            {"member_ids": ObjectId(TEST_USER_ID)},
+            {
+                "$inc": {
+                    "skill_profile.majors.Computer Science": -1,
+                    "skill_profile.majors.Data Science": 1,
+                }
+            },
+        )
+
+    def test_update_me_without_profile_fields_leaves_groups_alone(
+        self, client, mock_db, current_user_doc
+    ):
+        mock_db["users"].find_one_and_update.return_value = _before(current_user_doc)
+
+        client.patch("/api/users/me", json={"bio": "hi"})
+
+        mock_db["groups"].update_many.assert_not_called()
+
+    def test_delete_me_queues_cleanup(self, client, mock_db, current_user_doc):
+        mock_db["users"].find_one_and_delete.return_value = _before(current_user_doc)
+
+        client.delete("/api/users/me")
+
+        account_cleanup.cleanup_worker.submit.assert_called_once()
+
+    def test_delete_me_of_missing_user_queues_nothing(self, client, mock_db):
+        mock_db["users"].find_one_and_delete.return_value = None
+
+        client.delete("/api/users/me")
+
+        account_cleanup.cleanup_worker.submit.assert_not_called()
+
+    def test_delete_me_decrements_skills_and_total(
+        self, client, mock_db, current_user_doc
+    ):
+        # the deleted document, not the cached current_user, says what to remove
+        mock_db["users"].find_one_and_delete.return_value = {
+            "_id": ObjectId(TEST_USER_ID),
+            "skills_norm": ["python", "go"],
+        }
+
+        resp = client.delete("/api/users/me")
+
+        assert resp.status_code == 200
+        assert _skill_stats_ops(mock_db) == {
+            "skill:go": {"$inc": {"count": -1}},
+            "skill:python": {"$inc": {"count": -1}},
+            "total:users": {"$inc": {"count": -1}},
+        }
+
+    def test_update_me_discards_precomputed_lists_it_made_stale(
+        self, client, mock_db, current_user_doc
+    ):
+        owner = str(ObjectId())
+        suggestion_cache.put(owner, [(TEST_USER_ID, 0.9)])
+        mock_db["users"].find_one_and_update.return_value = _before(current_user_doc)
+
+        client.patch("/api/users/me", json={"major": "Data Science"})
+
+        (query,), _ = mock_db["suggestions"].delete_many.call_args
+        assert set(query["_id"]["$in"]) == {ObjectId(TEST_USER_ID), ObjectId(owner)}
+        assert suggestion_cache.owners() == set()
+
+    def test_bio_edit_leaves_suggestion_lists_alone(
+        self, client, mock_db, current_user_doc
+    ):
+        owner = str(ObjectId())
+        suggestion_cache.put(owner, [(TEST_USER_ID, 0.9)])
+        suggestion_cache.put(TEST_USER_ID, [(owner, 0.9)])
+        mock_db["users"].find_one_and_update.return_value = _before(current_user_doc)
+
+        client.patch("/api/users/me", json={"bio": "hi"})
+
+        # no score moved, so neither cached nor precomputed lists are dropped
+        assert suggestion_cache.owners() == {owner, TEST_USER_ID}
+        mock_db["suggestions"].delete_many.assert_not_called()
+
+    def test_update_me_round_trips(self, client, current_user_doc):
+        db = mock_database()
+        app.dependency_overrides[get_db] = lambda: db
+        db["users"].find_one_and_update.return_value = _before(current_user_doc)
+
+        assert client.patch("/api/users/me", json={"bio": "hi"}).status_code == 200
+        assert mongo_commands(db) == {"users.find_one_and_update": 1}
+
+
+# ---------------------------------------------------------------------------
+# GET /api/users/suggestions
+# ---------------------------------------------------------------------------
+
+
+class TestSuggestUsers:
+    def _seed(self, mock_db, docs):
+        """First find() builds the skill index, later ones return candidate docs."""
+        by_id = {d["_id"]: d for d in docs}
+
+        def find(query=None, projection=None):
+            if query and "_id" in query and "$in" in query["_id"]:
+                return [by_id[oid].copy() for oid in query["_id"]["$in"]]
+            return [d.copy() for d in docs]
+
+        mock_db["users"].find.side_effect = find
+
+    def test_ranks_by_score(self, client, mock_db):
+        best = _user_doc(skills=["Python", "Java"], username="best")
+        mid = _user_doc(skills=["Python"], major="Data Science", username="mid")
+        self._seed(mock_db, [mid, best])
+
+        resp = client.get("/api/users/suggestions")
+
+        assert resp.status_code == 200
+        body = resp.json()
+        assert [u["username"] for u in body] == ["best", "mid"]
+        assert body[0]["match_score"] == 1.0
+        assert "password" not in body[0]
+
+    def test_only_fetches_nonzero_candidates(self, client, mock_db):
+        match = _user_doc(skills=["Java"], major="Other", username="match")
+        stranger = _user_doc(skills=["Rust"], major="Other", username="stranger")
+        self._seed(mock_db, [match, stranger])
+
+        resp = client.get("/api/users/suggestions")
+
+        assert [u["username"] for u in resp.json()] == ["match"]
+        scoring_query = mock_db["users"].find.call_args_list[1][0][0]
+        assert scoring_query == {"_id": {"$in": [match["_id"]]}}
+
+    def test_scores_narrow_docs_and_fetches_only_winners(self, client, mock_db):
+        docs = [_user_doc(skills=["Python"], username=f"u{i}") for i in range(5)]
+        self._seed(mock_db, docs)
+
+        resp = client.get("/api/users/suggestions?limit=2")
+
+        assert len(resp.json()) == 2
+        _, scoring_call, winners_call = mock_db["users"].find.call_args_list
+        assert scoring_call[0][1] == SCORING_PROJECTION
+        scored_oids = scoring_call[0][0]["_id"]["$in"]
+        assert winners_call[0][0] == {"_id": {"$in": scored_oids[:2]}}
+        assert winners_call[0][1] == USER_READ_PROJECTION
+
+    def test_no_overlap_returns_empty_without_fetch(self, client, mock_db):
+        self._seed(mock_db, [_user_doc(skills=["Rust"], major="Other")])
+
+        resp = client.get("/api/users/suggestions")
+
+        assert resp.status_code == 200
+        assert resp.json() == []
+        mock_db["users"].find.assert_called_once()
+
+    def test_second_request_served_from_cache(self, client, mock_db):
+        self._seed(
+            mock_db, [_user_doc(skills=["Python"], username=f"u{i}") for i in range(3)]
+        )
+
+        first = client.get("/api/users/suggestions?limit=3").json()
+        calls_after_first = mock_db["users"].find.call_count
+        second = client.get("/api/users/suggestions?limit=2").json()
+
+        assert second == first[:2]
+        # only the winners' profile fetch, no re-ranking
+        assert mock_db["users"].find.call_count == calls_after_first + 1
+        stats = client.get("/api/users/suggestions/stats").json()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    def test_excludes_connections_and_pending_requests(self, client, mock_db):
+        connected = _user_doc(skills=["Python", "Java"], username="connected")
+        pending = _user_doc(skills=["Python", "Java"], username="pending")
+        other = _user_doc(skills=["Python"], username="other")
+        self._seed(mock_db, [connected, pending, other])
+        me = ObjectId(TEST_USER_ID)
+        mock_db["match_requests"].find.return_value = [
+            {"sender_id": me, "receiver_id": connected["_id"]},
+            {"sender_id": pending["_id"], "receiver_id": me},
+        ]
+
+        resp = client.get("/api/users/suggestions")
+
+        assert [u["username"] for u in resp.json()] == ["other"]
+        scoring_query = mock_db["users"].find.call_args_list[1][0][0]
+        assert scoring_query == {"_id": {"$in": [other["_id"]]}}
+        exclusion_query = mock_db["match_requests"].find.call_args[0][0]
+        assert exclusion_query["status"] == {"$in": ["accepted", "pending"]}
+
+    def test_aggregation_backend_excludes_connections(
+        self, client, mock_db, monkeypatch
+    ):
+        monkeypatch.setattr(users_router, "SUGGESTIONS_BACKEND", "aggregation")
+        connected = ObjectId()
+        mock_db["match_requests"].find.return_value = [
+            {"sender_id": ObjectId(TEST_USER_ID), "receiver_id": connected}
+        ]
+        mock_db["users"].aggregate.return_value = []
+
+        client.get("/api/users/suggestions")
+
+        pipeline = mock_db["users"].aggregate.call_args[0][0]
+        assert pipeline[0]["$match"]["_id"] == {
+            "$nin": [ObjectId(TEST_USER_ID), connected]
+        }
+
+    def test_sending_match_request_drops_cached_list(self, client, mock_db):
+        target = _user_doc(skills=["Python"], username="target")
+        self._seed(mock_db, [target])
+        client.get("/api/users/suggestions")
+        assert suggestion_cache.stats()["size"] == 1
+
+        mock_db["users"].find_one.return_value = target
+        mock_db["match_requests"].find_one.return_value = None
+        mock_db["match_requests"].insert_one.return_value.inserted_id = ObjectId()
+        resp = client.post(f"/api/match/request/{target['_id']}")
+
+        assert resp.status_code == 200
+        assert suggestion_cache.stats()["size"] == 0
+
+    def test_serves_fresh_precomputed_list(self, client, mock_db):
+        winner = _user_doc(skills=["Python"], username="precomputed")
+        self._seed(mock_db, [winner])
+        mock_db["suggestions"].find_one.return_value = {
+            "computed_at": datetime.now(timezone.utc),
+            "ranked": [{"user_id": winner["_id"], "score": 0.42}],
+        }
+
+        resp = client.get("/api/users/suggestions")
+
+        assert [(u["username"], u["match_score"]) for u in resp.json()] == [
+            ("precomputed", 0.42)
+        ]
+        # only the winners' profile fetch; no index build, no scoring
+        mock_db["users"].find.assert_called_once()
+        mock_db["match_requests"].find.assert_not_called()
+
+    def test_stale_precomputed_list_is_reranked(self, client, mock_db):
+        winner = _user_doc(skills=["Python"], username="live")
+        self._seed(mock_db, [winner])
+        mock_db["suggestions"].find_one.return_value = {
+            "computed_at": datetime.now(timezone.utc) - timedelta(days=2),
+            "ranked": [{"user_id": ObjectId(), "score": 0.99}],
+        }
+
+        resp = client.get("/api/users/suggestions")
+
+        assert [u["username"] for u in resp.json()] == ["live"]
+
+    def test_approximate_mode_reranks_lsh_shortlist(self, client, mock_db):
+        twin = _user_doc(skills=["Java", "Python"], major="Other", username="twin")
+        major_only = _user_doc(skills=["Rust"], username="major_only")
+        self._seed(mock_db, [twin, major_only])
+        lsh_index.ensure_built(mock_db)
+
+        resp = client.get("/api/users/suggestions?mode=approximate")
+
+        assert resp.status_code == 200
+        assert [(u["username"], u["match_score"]) for u in resp.json()] == [
+            ("twin", 0.9)
+        ]
+        assert suggestion_cache.stats()["size"] == 0
+
+    def test_approximate_mode_is_exact_until_lsh_is_built(
+        self, client, mock_db, monkeypatch
+    ):
+        build = MagicMock(return_value=False)
+        monkeypatch.setattr(lsh_index, "build_in_background", build)
+        twin = _user_doc(skills=["Java", "Python"], major="Other", username="twin")
+        major_only = _user_doc(skills=["Rust"], username="major_only")
+        self._seed(mock_db, [twin, major_only])
+
+        resp = client.get("/api/users/suggestions?mode=approximate")
+
+        build.assert_called_once_with(mock_db)
+        assert [u["username"] for u in resp.json()] == ["twin", "major_only"]
+
+    def test_aggregation_backend_returns_pipeline_results(
+        self, client, mock_db, monkeypatch
+    ):
+        monkeypatch.setattr(users_router, "SUGGESTIONS_BACKEND", "aggregation")
+        doc = _user_doc(skills=["Python"], username="agg")
+        del doc["password"], doc["email"]
+        mock_db["users"].aggregate.return_value = [{**doc, "match_score": 0.55}]
+
+        resp = client.get("/api/users/suggestions?limit=5")
+
+        assert resp.status_code == 200
+        assert [(u["username"], u["match_score"]) for u in resp.json()] == [
+            ("agg", 0.55)
+        ]
+        pipeline = mock_db["users"].aggregate.call_args[0][0]
+        assert pipeline[-2] == {"$limit": 5}
+        mock_db["users"].find.assert_not_called()
+
+    def test_next_page_is_a_slice_of_the_first_pages_snapshot(self, client, mock_db):
+        docs = [_user_doc(skills=["Python"], username=f"u{i}") for i in range(5)]
+        self._seed(mock_db, docs)
+
+        first = client.get("/api/users/suggestions?limit=2")
+        cursor = first.headers["X-Next-Cursor"]
+        ranking_calls = mock_db["users"].find.call_count
+        second = client.get(f"/api/users/suggestions?limit=2&cursor={cursor}")
+        third = client.get(
+            f"/api/users/suggestions?limit=2&cursor={second.headers['X-Next-Cursor']}"
+        )
+
+        pages = [first.json(), second.json(), third.json()]
+        assert [len(p) for p in pages] == [2, 2, 1]
+        ids = [u["_id"] for page in pages for u in page]
+        assert len(set(ids)) == 5
+        # pages 2 and 3 only fetch their winners' profiles
+        assert mock_db["users"].find.call_count == ranking_calls + 2
+        assert "X-Next-Cursor" not in third.headers
+
+    def test_snapshot_is_extended_past_cache_depth(self, client, mock_db):
+        docs = [_user_doc(skills=["Python"], username=f"u{i}") for i in range(60)]
+        self._seed(mock_db, docs)
+
+        first = client.get("/api/users/suggestions?limit=50")
+        second = client.get(
+            f"/api/users/suggestions?limit=50&cursor={first.headers['X-Next-Cursor']}"
+        )
+
+        assert [len(first.json()), len(second.json())] == [50, 10]
+        seen = {u["_id"] for u in first.json()}
+        assert seen.isdisjoint(u["_id"] for u in second.json())
+        # the extension ranked with the first page's users excluded
+        extension_query = mock_db["users"].find.call_args_list[-2][0][0]
+        assert len(extension_query["_id"]["$in"]) == 10
+        assert "X-Next-Cursor" not in second.headers
+
+    def test_short_list_has_no_cursor(self, client, mock_db):
+        self._seed(mock_db, [_user_doc(skills=["Python"])])
+
+        resp = client.get("/api/users/suggestions")
+
+        assert len(resp.json()) == 1
+        assert "X-Next-Cursor" not in resp.headers
+
+    def test_unknown_cursor_returns_410(self, client):
+        resp = client.get(f"/api/users/suggestions?cursor={encode_cursor('gone', 10)}")
+        assert resp.status_code == 410
+
+    def test_malformed_cursor_returns_400(self, client):
+        resp = client.get("/api/users/suggestions?cursor=%%%")
+        assert resp.status_code == 400
+
+    def test_unknown_mode_returns_422(self, client):
+        resp = client.get("/api/users/suggestions?mode=fuzzy")
+        assert resp.status_code == 422
+
+    def test_limit_above_max_returns_422(self, client):
+        resp = client.get("/api/users/suggestions?limit=51")
+        assert resp.status_code == 422
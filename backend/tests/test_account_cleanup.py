@@ -0,0 +1,199 @@
+from unittest.mock import MagicMock
+
+import pytest
+from bson import ObjectId
+
+from app.core import account_cleanup
+from app.core.account_cleanup import (
+    JOBS_COLLECTION,
+    CleanupWorker,
+    resume_cleanup_jobs,
+    run_job,
+    start_cleanup,
+)
+
+USER_OID = ObjectId()
+JOB_ID = ObjectId()
+
+
+@pytest.fixture()
+def collections():
+    return {
+        name: MagicMock()
+        for name in (
+            JOBS_COLLECTION,
+            "conversations",
+            "messages",
+            "match_requests",
+            "groups",
+        )
+    }
+
+
+@pytest.fixture()
+def db(collections):
+    db = MagicMock()
+    db.__getitem__.side_effect = collections.__getitem__
+    return db
+
+
+@pytest.fixture()
+def queued(monkeypatch):
+    submit = MagicMock()
+    monkeypatch.setattr(account_cleanup.cleanup_worker, "submit", submit)
+    return submit
+
+
+def _job(**overrides):
+    job = {
+        "_id": JOB_ID,
+        "user_id": USER_OID,
+        "profile": {"skills_norm": ["python"], "major": "Computer Science"},
+        "status": "pending",
+        "steps_done": [],
+        "progress": {},
+    }
+    job.update(overrides)
+    return job
+
+
+def _job_updates(collections):
+    return [c.args[1] for c in collections[JOBS_COLLECTION].update_one.call_args_list]
+
+
+def test_start_cleanup_records_the_job_and_queues_it(db, collections, queued):
+    collections[JOBS_COLLECTION].insert_one.return_value.inserted_id = JOB_ID
+    user = {
+        "_id": str(USER_OID),
+        "skills": ["Python"],
+        "skills_norm": ["python"],
+        "major": "Data Science",
+    }
+
+    assert start_cleanup(db, user) == JOB_ID
+
+    (job,), _ = collections[JOBS_COLLECTION].insert_one.call_args
+    assert job["user_id"] == USER_OID
+    assert job["profile"] == {"skills_norm": ["python"], "major": "Data Science"}
+    assert job["status"] == "pending" and job["steps_done"] == []
+    queued.assert_called_once_with(db, JOB_ID)
+
+
+def test_run_job_purges_everything_in_batches(db, collections, monkeypatch):
+    monkeypatch.setattr(account_cleanup, "BATCH_SIZE", 2)
+    first, second, third = ObjectId(), ObjectId(), ObjectId()
+    collections[JOBS_COLLECTION].find_one.return_value = _job()
+    collections["conversations"].find.return_value.limit.side_effect = [
+        [{"_id": first}, {"_id": second}],
+        [{"_id": third}],
+        [],
+    ]
+    collections["conversations"].delete_many.return_value.deleted_count = 1
+
+    assert run_job(db, JOB_ID)
+
+    collections["conversations"].find.assert_called_with(
+        {"participant_ids": USER_OID}, {"_id": 1}
+    )
+    collections["conversations"].find.return_value.limit.assert_called_with(2)
+    assert [c.args[0] for c in collections["messages"].delete_many.call_args_list] == [
+        {"conversation_id": {"$in": [first, second]}},
+        {"conversation_id": {"$in": [third]}},
+    ]
+    collections["match_requests"].delete_many.assert_called_once_with(
+        {"$or": [{"sender_id": USER_OID}, {"receiver_id": USER_OID}]}
+    )
+    (membership_filter, membership_update), _ = collections[
+        "groups"
+    ].update_many.call_args
+    assert membership_filter == {
+        "member_ids": USER_OID,
+        "created_by": {"$ne": USER_OID},
+    }
+    assert membership_update["$pull"] == {"member_ids": USER_OID}
+    assert membership_update["$inc"] == {
+        "skill_profile.size": -1,
+        "skill_profile.skills.python": -1,
+        "skill_profile.majors.Computer Science": -1,
+        "version": 1,
+    }
+    collections["groups"].delete_many.assert_called_once_with({"created_by": USER_OID})
+
+    updates = _job_updates(collections)
+    assert updates[0]["$set"]["status"] == "running"
+    assert updates[0]["$inc"] == {"attempts": 1}
+    done = [u["$addToSet"]["steps_done"] for u in updates if "$addToSet" in u]
+    assert done == ["conversations", "match_requests", "memberships", "owned_groups"]
+    assert updates[-1]["$set"]["status"] == "done"
+
+
+def test_run_job_skips_finished_steps(db, collections):
+    collections[JOBS_COLLECTION].find_one.return_value = _job(
+        steps_done=["conversations", "match_requests"]
+    )
+
+    run_job(db, JOB_ID)
+
+    collections["conversations"].find.assert_not_called()
+    collections["match_requests"].delete_many.assert_not_called()
+    collections["groups"].update_many.assert_called_once()
+
+
+def test_finished_job_is_a_no_op(db, collections):
+    collections[JOBS_COLLECTION].find_one.return_value = _job(status="done")
+
+    assert run_job(db, JOB_ID)
+
+    collections[JOBS_COLLECTION].update_one.assert_not_called()
+
+
+def test_worker_retries_with_backoff(db, collections):
+    collections[JOBS_COLLECTION].find_one.return_value = _job()
+    collections["conversations"].find.return_value.limit.return_value = []
+    collections["groups"].update_many.side_effect = [
+        RuntimeError("timeout"),
+        MagicMock(),
+    ]
+    sleeps = []
+
+    worker = CleanupWorker(max_attempts=3, backoff_seconds=0.5, sleep=sleeps.append)
+
+    assert worker.run(db, JOB_ID)
+    assert sleeps == [0.5]
+    statuses = [u["$set"].get("status") for u in _job_updates(collections)]
+    assert "pending" in statuses and statuses[-1] == "done"
+
+
+def test_worker_gives_up_after_max_attempts(db, collections):
+    collections[JOBS_COLLECTION].find_one.return_value = _job()
+    collections["conversations"].find.side_effect = RuntimeError("down")
+    sleeps = []
+
+    worker = CleanupWorker(max_attempts=3, backoff_seconds=1.0, sleep=sleeps.append)
+
+    assert not worker.run(db, JOB_ID)
+    assert sleeps == [1.0, 2.0]
+    last = _job_updates(collections)[-1]["$set"]
+    assert last["status"] == "failed"
+    assert last["last_error"] == "RuntimeError: down"
+
+
+def test_worker_runs_jobs_off_the_calling_thread(db, collections):
+    collections[JOBS_COLLECTION].find_one.return_value = _job(status="done")
+    worker = CleanupWorker()
+    try:
+        assert worker.submit(db, JOB_ID).result(timeout=5)
+    finally:
+        worker.shutdown()
+
+
+def test_resume_queues_unfinished_jobs(db, collections, queued):
+    other = ObjectId()
+    collections[JOBS_COLLECTION].find.return_value = [{"_id": JOB_ID}, {"_id": other}]
+
+    assert resume_cleanup_jobs(db) == 2
+
+    collections[JOBS_COLLECTION].find.assert_called_once_with(
+        {"status": {"$in": ["pending", "running", "failed"]}}, {"_id": 1}
+    )
+    assert [c.args for c in queued.call_args_list] == [(db, JOB_ID), (db, other)]
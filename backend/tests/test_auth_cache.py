@@ -0,0 +1,124 @@
+from app.core.auth_cache import AuthCache
+
+
+class FakeClock:
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _user(uid="u1"):
+    return {"_id": uid, "email": f"{uid}@my.unt.edu"}
+
+
+def _cache(**kwargs):
+    clock = FakeClock()
+    return AuthCache(clock=clock, **kwargs), clock
+
+
+def test_hit_returns_claims_and_a_copy_of_the_user():
+    cache, _ = _cache()
+    cache.put("tok", {"sub": "u1@my.unt.edu"}, _user(), cache.generation())
+
+    claims, user = cache.get("tok")
+    user["username"] = "edited"
+
+    assert claims == {"sub": "u1@my.unt.edu"}
+    assert "username" not in cache.get("tok")[1]
+
+
+def test_miss_and_hit_rate():
+    cache, _ = _cache()
+    assert cache.get("tok") is None
+    cache.put("tok", {}, _user(), cache.generation())
+    cache.get("tok")
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_entries_expire_at_the_ttl():
+    cache, clock = _cache(ttl_seconds=60)
+    cache.put("tok", {"exp": clock.now + 3600}, _user(), cache.generation())
+
+    clock.now += 60
+    assert cache.get("tok") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_entries_expire_with_the_token():
+    cache, clock = _cache(ttl_seconds=60)
+    cache.put("tok", {"exp": clock.now + 10}, _user(), cache.generation())
+
+    clock.now += 10
+    assert cache.get("tok") is None
+
+
+def test_expired_tokens_are_not_stored():
+    cache, clock = _cache()
+    assert not cache.put("tok", {"exp": clock.now - 1}, _user(), cache.generation())
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache, _ = _cache(max_entries=2)
+    generation = cache.generation()
+    cache.put("a", {}, _user("a"), generation)
+    cache.put("b", {}, _user("b"), generation)
+    cache.get("a")
+    cache.put("c", {}, _user("c"), generation)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_user_drops_all_their_tokens_only():
+    cache, _ = _cache()
+    generation = cache.generation()
+    cache.put("laptop", {}, _user("u1"), generation)
+    cache.put("phone", {}, _user("u1"), generation)
+    cache.put("other", {}, _user("u2"), generation)
+
+    assert cache.invalidate_user("u1") == 2
+    assert cache.get("laptop") is None and cache.get("phone") is None
+    assert cache.get("other") is not None
+
+
+def test_lookup_racing_an_invalidation_is_not_stored():
+    """A read that began before delete_me's invalidation can't resurrect the user."""
+    cache, _ = _cache()
+    generation = cache.generation()
+    cache.invalidate_user("u1")
+
+    assert not cache.put("tok", {}, _user("u1"), generation)
+    assert cache.get("tok") is None
+
+
+def test_tokens_are_not_kept_in_memory():
+    cache, _ = _cache()
+    cache.put("secret-token", {}, _user(), cache.generation())
+    assert "secret-token" not in cache._entries
+
+
+def test_revoke_rejects_older_token_versions_until_tokens_expire():
+    cache, clock = _cache(revocation_seconds=3600)
+    cache.put("tok", {}, _user("u1"), cache.generation())
+
+    cache.revoke("u1", min_version=2)
+
+    assert cache.get("tok") is None
+    assert cache.is_revoked("u1", 1)
+    assert not cache.is_revoked("u1", 2)
+    assert not cache.is_revoked("u2", 0)
+    clock.now += 3600
+    assert not cache.is_revoked("u1", 1)
+
+
+def test_revoke_without_version_rejects_every_token():
+    cache, _ = _cache()
+    cache.revoke("u1")
+    assert cache.is_revoked("u1", 10**6)
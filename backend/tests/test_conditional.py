@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from starlette.requests import Request
+
+from app.core.conditional import (
+    initial_version,
+    not_modified,
+    validators,
+    versioned,
+)
+
+
+def _request(**headers) -> Request:
+    raw = [
+        (k.replace("_", "-").lower().encode(), v.encode()) for k, v in headers.items()
+    ]
+    return Request({"type": "http", "headers": raw})
+
+
+def _doc(version=None, **fields):
+    doc = {"_id": ObjectId(), "created_at": datetime(2025, 1, 1, tzinfo=timezone.utc)}
+    if version is not None:
+        doc["version"] = version
+    doc.update(fields)
+    return doc
+
+
+def test_versioned_merges_with_existing_operators():
+    now = datetime(2025, 1, 2, tzinfo=timezone.utc)
+    update = {"$set": {"bio": "hi"}, "$inc": {"skill_profile.size": 1}}
+
+    assert versioned(update, now) == {
+        "$set": {"bio": "hi", "updated_at": now},
+        "$inc": {"skill_profile.size": 1, "version": 1},
+    }
+    assert update == {"$set": {"bio": "hi"}, "$inc": {"skill_profile.size": 1}}
+
+
+def test_initial_version():
+    now = datetime(2025, 1, 2, tzinfo=timezone.utc)
+    assert initial_version(now) == {"version": 1, "updated_at": now}
+
+
+def test_etag_changes_with_version_and_documents():
+    doc = _doc(version=1)
+    other = _doc(version=1)
+
+    assert validators(doc).etag == validators({**doc}).etag
+    assert validators(doc).etag != validators({**doc, "version": 2}).etag
+    assert validators(doc).etag != validators(doc, other).etag
+
+
+def test_etag_ignores_document_order():
+    doc, other = _doc(version=1), _doc(version=4)
+
+    assert validators(doc, other).etag == validators(other, doc).etag
+
+
+def test_legacy_documents_are_version_zero_modified_at_creation():
+    doc = _doc()
+    assert validators(doc).etag == validators({**doc, "version": 0}).etag
+    assert validators(doc).last_modified == doc["created_at"]
+
+
+def test_last_modified_is_the_latest_document_to_the_second():
+    early = _doc(updated_at=datetime(2025, 1, 2, 8, 0, 0, 900000))
+    late = _doc(updated_at=datetime(2025, 1, 3, 9, 30, 5, 250000))
+
+    current = validators(early, late)
+
+    assert current.last_modified == datetime(2025, 1, 3, 9, 30, 5, tzinfo=timezone.utc)
+    assert current.headers()["Last-Modified"] == "Fri, 03 Jan 2025 09:30:05 GMT"
+
+
+def test_if_none_match_lists_and_wildcard():
+    current = validators(_doc(version=4))
+
+    assert not_modified(_request(if_none_match=f'"x", {current.etag}'), current)
+    assert not_modified(_request(if_none_match=f"W/{current.etag}"), current)
+    assert not_modified(_request(if_none_match="*"), current)
+    assert not not_modified(_request(if_none_match='"x"'), current)
+    assert not not_modified(_request(), current)
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    current = validators(_doc(version=4))
+    later = current.last_modified + timedelta(days=1)
+    request = _request(
+        if_none_match='"stale"',
+        if_modified_since=later.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+    )
+
+    assert not not_modified(request, current)
+
+
+def test_unparseable_if_modified_since_is_ignored():
+    current = validators(_doc(version=1))
+    assert not not_modified(_request(if_modified_since="yesterday"), current)
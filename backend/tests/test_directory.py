@@ -0,0 +1,31 @@
+from bson import ObjectId
+
+from app.core.directory import directory_query
+from app.models.enums import Major
+
+
+def test_no_filters_is_an_empty_query():
+    assert directory_query() == {}
+
+
+def test_after_is_an_exclusive_lower_bound():
+    after = ObjectId()
+    assert directory_query(after=after) == {"_id": {"$gt": after}}
+
+
+def test_major_and_skill_are_canonicalized():
+    query = directory_query(major=Major.CS, skill="  ReactJS ")
+    assert query == {"major": "Computer Science", "skills_norm": "react"}
+
+
+def test_name_prefix_is_anchored_lowercase_and_escaped():
+    query = directory_query(name="  Mc.D ")
+    pattern = {"$regex": "^mc\\.d"}
+    assert query["$or"] == [
+        {"username_lower": pattern},
+        {"full_name_keys": pattern},
+    ]
+
+
+def test_blank_filters_are_ignored():
+    assert directory_query(skill=" ", name="   ") == {}
@@ -0,0 +1,175 @@
+from unittest.mock import MagicMock
+
+import pytest
+from bson import ObjectId
+
+from app.core.group_profiles import (
+    build_group_profile,
+    ensure_group_profiles,
+    group_fit,
+    member_profile_changed,
+    membership_inc,
+    rebuild_group_profiles,
+    recommended_groups,
+)
+from app.core.matching import MAJOR_MATCH_BONUS, SKILLS_WEIGHT
+
+
+def _user(skills, major=None, **extra):
+    return {"skills_norm": skills, "major": major, **extra}
+
+
+class TestBuildGroupProfile:
+    def test_counts_skills_and_majors(self):
+        profile = build_group_profile(
+            [
+                _user(["python", "react"], "cs"),
+                _user(["python"], "cs"),
+                _user([], None),
+            ]
+        )
+
+        assert profile == {
+            "size": 3,
+            "skills": {"python": 2, "react": 1},
+            "majors": {"cs": 2},
+        }
+
+    def test_escapes_dots_and_dollars_in_keys(self):
+        profile = build_group_profile([_user(["node.js", "$tack"])])
+
+        assert set(profile["skills"]) == {"node%2Ejs", "%24tack"}
+
+    def test_membership_inc_matches_profile_paths(self):
+        inc = membership_inc(_user(["node.js"], "cs"), -1)
+
+        assert inc == {
+            "skill_profile.size": -1,
+            "skill_profile.skills.node%2Ejs": -1,
+            "skill_profile.majors.cs": -1,
+        }
+
+
+class TestGroupFit:
+    def test_match_is_jaccard_against_group_skills_plus_major_share(self):
+        profile = build_group_profile(
+            [_user(["python", "sql"], "cs"), _user(["react"], "math")]
+        )
+
+        score = group_fit(_user(["python", "go"], "cs"), profile, "match")
+
+        # |{python}| / |{python, sql, react, go}|, half the members share "cs"
+        assert score == pytest.approx(SKILLS_WEIGHT * 0.25 + MAJOR_MATCH_BONUS * 0.5)
+
+    def test_complement_rewards_skills_the_group_lacks(self):
+        profile = build_group_profile([_user(["python"], "cs")])
+
+        overlap = group_fit(_user(["python"], "cs"), profile, "complement")
+        novel = group_fit(_user(["rust"], "math"), profile, "complement")
+
+        assert overlap == 0.0
+        assert novel == pytest.approx(SKILLS_WEIGHT * 0.5 + MAJOR_MATCH_BONUS)
+
+    def test_ignores_skills_whose_count_dropped_to_zero(self):
+        profile = {"size": 1, "skills": {"python": 0, "sql": 1}, "majors": {}}
+
+        assert group_fit(_user(["python"]), profile) == 0.0
+
+    def test_missing_profile_scores_zero(self):
+        assert group_fit(_user(["python"], "cs"), None) == 0.0
+
+
+class TestMemberProfileChanged:
+    def test_incs_only_the_difference_across_member_groups(self):
+        db = MagicMock()
+        oid = ObjectId()
+
+        member_profile_changed(
+            db,
+            oid,
+            _user(["python", "java"], "cs"),
+            _user(["python", "rust"], "cs"),
+        )
+
+        db["groups"].update_many.assert_called_once_with(
+            {"member_ids": oid},
+            {
+                "$inc": {
+                    "skill_profile.skills.java": -1,
+                    "skill_profile.skills.rust": 1,
+                }
+            },
+        )
+
+    def test_no_write_when_nothing_scored_changed(self):
+        db = MagicMock()
+
+        member_profile_changed(db, ObjectId(), _user(["python"]), _user(["python"]))
+
+        db["groups"].update_many.assert_not_called()
+
+
+class TestEnsureGroupProfiles:
+    def test_backfills_groups_without_a_profile(self):
+        collections = {"groups": MagicMock(), "users": MagicMock()}
+        db = MagicMock()
+        db.__getitem__.side_effect = collections.__getitem__
+        member = ObjectId()
+        db["groups"].find.return_value = [{"_id": "g1", "member_ids": [member]}]
+        db["users"].find.return_value = [_user(["python"], "cs")]
+
+        ensure_group_profiles(db)
+
+        (ops,), _ = db["groups"].bulk_write.call_args
+        assert ops[0]._filter == {"_id": "g1", "member_ids": [member]}
+        assert ops[0]._doc["$set"]["skill_profile"]["skills"] == {"python": 1}
+        (group_filter, _), _ = db["groups"].find.call_args
+        assert group_filter == {"skill_profile": {"$exists": False}}
+
+    def test_no_write_when_every_group_has_a_profile(self):
+        db = MagicMock()
+        db["groups"].find.return_value = []
+
+        assert ensure_group_profiles(db) == 0
+        db["groups"].bulk_write.assert_not_called()
+
+
+class TestRebuildGroupProfiles:
+    def test_recounts_every_group_and_reports_the_drifted(self):
+        collections = {"groups": MagicMock(), "users": MagicMock()}
+        db = MagicMock()
+        db.__getitem__.side_effect = collections.__getitem__
+        members = [ObjectId(), ObjectId()]
+        db["groups"].find.return_value = [{"_id": "g1", "member_ids": members}]
+        db["users"].find.return_value = [_user(["python"], "cs"), _user([], "cs")]
+        db["groups"].bulk_write.return_value.modified_count = 1
+
+        assert rebuild_group_profiles(db) == 1
+
+        (group_filter, _), _ = db["groups"].find.call_args
+        assert group_filter == {}
+        (ops,), _ = db["groups"].bulk_write.call_args
+        # a membership change since the read makes the update miss
+        assert ops[0]._filter == {"_id": "g1", "member_ids": members}
+        assert ops[0]._doc["$set"]["skill_profile"] == {
+            "size": 2,
+            "skills": {"python": 1},
+            "majors": {"cs": 2},
+        }
+
+
+class TestRecommendedGroups:
+    def test_queries_open_groups_without_the_user_and_ranks_by_fit(self):
+        db = MagicMock()
+        me = ObjectId()
+        strong = {"_id": "a", "skill_profile": build_group_profile([_user(["go"])])}
+        weak = {"_id": "b", "skill_profile": build_group_profile([_user(["sql"])])}
+        db["groups"].find.return_value = [weak, strong]
+
+        ranked = recommended_groups(db, _user(["go"], _id=str(me)), limit=1)
+
+        assert [group["_id"] for group, _ in ranked] == ["a"]
+        query, projection = db["groups"].find.call_args[0]
+        assert query["member_ids"] == {"$ne": me}
+        assert "$expr" in query
+        assert "member_ids" not in projection
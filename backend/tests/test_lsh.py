@@ -0,0 +1,123 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core import lsh
+from app.core.lsh import MinHashLSH
+
+
+def _user(uid, skills):
+    return {"_id": uid, "skills_norm": skills, "major": "Other"}
+
+
+def _index(users):
+    index = MinHashLSH(num_perm=32, bands=8)
+    index.load(users)
+    return index
+
+
+def test_num_perm_must_split_into_bands():
+    with pytest.raises(ValueError):
+        MinHashLSH(num_perm=10, bands=4)
+
+
+def test_signature_is_deterministic_and_order_free():
+    a, b = MinHashLSH(), MinHashLSH()
+    assert (a.signature(["go", "rust"]) == b.signature(["rust", "go"])).all()
+
+
+def test_empty_skills_have_no_signature():
+    assert MinHashLSH().signature([]) is None
+
+
+def test_identical_sets_always_collide():
+    index = _index([_user("a", ["python", "sql"]), _user("b", ["rust"])])
+    assert index.candidate_ids(_user("me", ["sql", "python"])) == {"a"}
+
+
+def test_disjoint_sets_do_not_collide():
+    index = _index([_user("a", ["python", "sql"])])
+    assert index.candidate_ids(_user("me", ["verilog", "vhdl"])) == set()
+
+
+def test_candidate_ids_excludes_self():
+    index = _index([_user("me", ["python"])])
+    assert index.candidate_ids(_user("me", ["python"])) == set()
+
+
+def test_high_similarity_is_usually_shortlisted():
+    skills = [f"s{i}" for i in range(20)]
+    users = [_user(f"u{i}", skills[:19] + [f"x{i}"]) for i in range(50)]
+    index = _index(users)
+    # Jaccard 19/21 with every user: P(miss) is ~1e-4 each at 8 bands x 4 rows,
+    # and the fixed seed makes the outcome deterministic.
+    assert len(index.candidate_ids(_user("me", skills))) == 50
+
+
+def test_upsert_and_remove():
+    index = _index([_user("a", ["python"])])
+    index.upsert(_user("a", ["rust"]))
+    assert index.candidate_ids(_user("me", ["python"])) == set()
+    assert index.candidate_ids(_user("me", ["rust"])) == {"a"}
+    index.remove("a")
+    assert index.candidate_ids(_user("me", ["rust"])) == set()
+
+
+def test_batch_band_keys_match_one_at_a_time():
+    index = MinHashLSH(num_perm=32, bands=8)
+    skill_sets = [["python", "sql"], [], ["rust"], ["sql", "go", "python"]]
+    assert index.batch_band_keys(skill_sets) == [
+        index.band_keys(skills) for skills in skill_sets
+    ]
+
+
+def test_build_spans_batches(monkeypatch):
+    monkeypatch.setattr(lsh, "BUILD_BATCH_SIZE", 2)
+    index = _index([_user(f"u{i}", ["python"]) for i in range(5)])
+    assert index.candidate_ids(_user("me", ["python"])) == {f"u{i}" for i in range(5)}
+
+
+def test_concurrent_first_calls_build_once():
+    db = MagicMock()
+    # a slow scan, so every thread asks before the first build is done
+    db["users"].find.side_effect = lambda *_: (
+        time.sleep(0.05) or [_user("a", ["python"])]
+    )
+    index = MinHashLSH(num_perm=32, bands=8)
+    threads = [
+        threading.Thread(target=index.ensure_built, args=(db,)) for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    db["users"].find.assert_called_once()
+
+
+def test_background_build_serves_once_done():
+    db = MagicMock()
+    db["users"].find.return_value = [_user("a", ["python"])]
+    index = MinHashLSH(num_perm=32, bands=8)
+
+    assert not index.build_in_background(db)
+    index._build_thread.join(timeout=5)
+
+    assert index.build_in_background(db)
+    assert index.candidate_ids(_user("me", ["python"])) == {"a"}
+    db["users"].find.assert_called_once()
+
+
+def test_failed_background_build_is_retried():
+    db = MagicMock()
+    db["users"].find.side_effect = [RuntimeError("down"), [_user("a", ["python"])]]
+    index = MinHashLSH(num_perm=32, bands=8)
+
+    index.build_in_background(db)
+    index._build_thread.join(timeout=5)
+    assert not index.built
+
+    index.build_in_background(db)
+    index._build_thread.join(timeout=5)
+    assert index.built
@@ -1,4 +1,7 @@
+from array import array
+
 from app.core.matching import (
+    compact_profile,
     compute_match_score,
     get_suggestions,
     jaccard,
@@ -12,6 +15,10 @@ def test_normalize_set_lowercases_and_strips():
     assert normalize_set(["  Python ", "JAVA", " c++ "]) == {"python", "java", "c++"}
 
 
+def test_normalize_set_drops_blank_skills():
+    assert normalize_set(["Python", "  ", ""]) == {"python"}
+
+
 def test_normalize_set_empty():
     assert normalize_set([]) == set()
 
@@ -109,3 +116,39 @@ def test_get_suggestions_respects_limit():
 def test_get_suggestions_empty_candidates():
     me = {"skills": ["Python"], "major": "CS"}
     assert get_suggestions(me, []) == []
+
+
+def test_get_suggestions_streams_from_iterator():
+    me = {"skills": ["Python"], "major": "CS"}
+    candidates = (
+        {"skills": ["Python"] if i % 3 == 0 else ["Rust"], "major": "EE", "n": i}
+        for i in range(9)
+    )
+    results = get_suggestions(me, candidates, limit=2)
+    assert [r[0]["n"] for r in results] == [0, 3]
+
+
+def test_score_prefers_persisted_skills_norm():
+    a = {"skills": ["ignored"], "skills_norm": ["java", "python"], "major": "CS"}
+    b = {"skills": ["Python", " JAVA"], "major": "CS"}
+    assert compute_match_score(a, b) == 1.0
+    assert compute_match_score(b, a) == 1.0
+
+
+def test_aliases_match_their_canonical_skill():
+    a = {"skills": ["JS", "golang"], "major": "Other"}
+    b = {"skills": ["JavaScript", "Go"], "major": "Other"}
+    assert compute_match_score(a, b) == 1.0
+
+
+def test_compact_profiles_score_like_raw_documents():
+    a = {"_id": "a", "skills_norm": ["go", "python", "sql"], "major": "Other"}
+    b = {"_id": "b", "skills_norm": ["python", "rust"], "major": "Other"}
+    compact_a, compact_b = compact_profile(a), compact_profile(b)
+
+    assert isinstance(compact_b["skill_ids"], array)
+    assert list(compact_b["skill_ids"]) == sorted(compact_b["skill_ids"])
+    expected = compute_match_score(a, b)
+    assert compute_match_score(compact_a, compact_b) == expected
+    assert compute_match_score(compact_a, b) == expected
+    assert compute_match_score(a, compact_b) == expected
@@ -0,0 +1,107 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.people_search import PeopleSearchIndex, tokenize
+
+
+def _doc(uid, username, full_name, bio=None, skills=(), major="Other"):
+    return {
+        "_id": uid,
+        "username": username,
+        "full_name": full_name,
+        "bio": bio,
+        "skills_norm": list(skills),
+        "major": major,
+        "email": f"{username}@my.unt.edu",
+        "password": "hashed",
+    }
+
+
+@pytest.fixture()
+def index():
+    index = PeopleSearchIndex()
+    index.load(
+        [
+            _doc("1", "adal", "Ada Lovelace", skills=["python"]),
+            _doc("2", "ada", "Ada King", bio="I like rust and python"),
+            _doc("3", "grace", "Grace Hopper", skills=["cobol", "machine learning"]),
+            _doc("4", "alan", "Alan Turing", bio="Mostly Python."),
+        ]
+    )
+    return index
+
+
+def _ids(hits):
+    return [hit["_id"] for hit in hits]
+
+
+class TestPrefix:
+    def test_matches_username_and_any_name_word_case_insensitively(self, index):
+        assert set(_ids(index.prefix("HOP", 10))) == {"3"}
+        assert set(_ids(index.prefix("ada", 10))) == {"1", "2"}
+
+    def test_users_matching_several_keys_appear_once(self, index):
+        # "adal", "ada" and "ada lovelace" all start with "ada" for user 1
+        assert _ids(index.prefix("ada", 10)) == ["1", "2"]
+
+    def test_multi_word_prefix_matches_full_name(self, index):
+        assert _ids(index.prefix("ada  l", 10)) == ["1"]
+
+    def test_respects_limit(self, index):
+        assert len(index.prefix("a", 2)) == 2
+
+    def test_hits_are_summaries_only(self, index):
+        (hit,) = index.prefix("grace", 1)
+        assert hit == {
+            "_id": "3",
+            "username": "grace",
+            "full_name": "Grace Hopper",
+            "major": "Other",
+            "avatar_url": None,
+        }
+
+
+class TestText:
+    def test_skills_outrank_a_bio_mention(self, index):
+        assert _ids(hit for hit, _ in index.text("python", 10))[0] == "1"
+
+    def test_aliases_and_multi_word_skills(self, index):
+        assert _ids(hit for hit, _ in index.text("ML", 10)) == ["3"]
+        assert _ids(hit for hit, _ in index.text("machine learning", 10)) == ["3"]
+
+    def test_unknown_terms_find_nothing(self, index):
+        assert index.text("fortran", 10) == []
+
+    def test_tokenize_keeps_skill_punctuation(self):
+        assert tokenize("C++, C# and Node.js.") == ["c++", "c#", "and", "node.js"]
+
+
+class TestMaintenance:
+    def test_upsert_replaces_old_keys_and_terms(self, index):
+        index.upsert(_doc("2", "queen", "Ada Queen", skills=["go"]))
+
+        assert "2" not in _ids(index.prefix("king", 10))
+        assert _ids(index.prefix("queen", 10)) == ["2"]
+        assert "2" not in _ids(hit for hit, _ in index.text("rust", 10))
+        assert _ids(hit for hit, _ in index.text("go", 10)) == ["2"]
+
+    def test_remove_drops_user_everywhere(self, index):
+        index.remove("3")
+
+        assert index.prefix("grace", 10) == []
+        assert index.text("cobol", 10) == []
+        assert len(index) == 3
+
+    def test_writes_before_build_are_ignored_then_loaded(self):
+        index = PeopleSearchIndex()
+        index.upsert(_doc("9", "zed", "Zed"))
+        assert not index.built
+
+        db = MagicMock()
+        db["users"].find.return_value = [_doc("9", "zed", "Zed")]
+        index.ensure_built(db)
+
+        assert _ids(index.prefix("z", 5)) == ["9"]
+        projection = db["users"].find.call_args[0][1]
+        assert "password" not in projection and "email" not in projection
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from bson import ObjectId
+
+from app.core import precompute
+from app.core.matching import compute_match_score
+from app.core.skill_index import skill_index
+
+
+def _profile(skills, major="Computer Science"):
+    return {"_id": ObjectId(), "skills_norm": skills, "major": major}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_index():
+    skill_index.clear()
+    yield
+    skill_index.clear()
+
+
+@pytest.fixture()
+def population():
+    return [
+        _profile(["java", "python"]),
+        _profile(["python"]),
+        _profile(["python"], major="Other"),
+        _profile(["rust"], major="Other"),
+    ]
+
+
+def _mock_db(population, match_requests=(), done=()):
+    collections = {name: MagicMock() for name in ("users", "match_requests")}
+    collections["users"].find.return_value = population
+    collections["match_requests"].find.return_value = list(match_requests)
+    collections[precompute.SUGGESTIONS_COLLECTION] = MagicMock()
+    collections[precompute.SUGGESTIONS_COLLECTION].find.return_value = [
+        {"_id": oid} for oid in done
+    ]
+    collections[precompute.RUNS_COLLECTION] = MagicMock()
+    collections[precompute.RUNS_COLLECTION].find_one.return_value = None
+
+    db = MagicMock()
+    db.__getitem__.side_effect = collections.__getitem__
+    return db
+
+
+def _written(db):
+    written = {}
+    for call in db[precompute.SUGGESTIONS_COLLECTION].bulk_write.call_args_list:
+        for op in call[0][0]:
+            written[op._filter["_id"]] = op._doc
+    return written
+
+
+def test_rank_shard_uses_compute_match_score(population):
+    precompute._init_worker(population)
+    me, *others = population
+
+    results, cpu_seconds = precompute.rank_shard([(str(me["_id"]), [])], depth=2)
+
+    ((user_id, ranked),) = results
+    assert user_id == str(me["_id"])
+    expected = sorted(
+        ((str(o["_id"]), compute_match_score(me, o)) for o in others),
+        key=lambda pair: pair[1],
+        reverse=True,
+    )
+    assert ranked == [pair for pair in expected if pair[1] > 0][:2]
+    assert cpu_seconds >= 0
+
+
+def test_rank_shard_drops_excluded_ids(population):
+    precompute._init_worker(population)
+    me, best = population[0], population[1]
+
+    ((_, ranked),), _ = precompute.rank_shard([(str(me["_id"]), [str(best["_id"])])])
+
+    assert str(best["_id"]) not in [uid for uid, _ in ranked]
+
+
+def test_load_exclusions_is_symmetric():
+    a, b = ObjectId(), ObjectId()
+    db = _mock_db([], match_requests=[{"sender_id": a, "receiver_id": b}])
+
+    assert precompute.load_exclusions(db) == {str(a): {str(b)}, str(b): {str(a)}}
+
+
+def test_run_precompute_writes_every_user(population):
+    db = _mock_db(population)
+
+    stats = precompute.run_precompute(db, workers=2, shard_size=1)
+
+    written = _written(db)
+    assert set(written) == {p["_id"] for p in population}
+    me = population[0]
+    assert written[me["_id"]]["ranked"][0] == {
+        "user_id": population[1]["_id"],
+        "score": compute_match_score(me, population[1]),
+    }
+    assert stats["computed"] == len(population)
+    assert stats["workers"] == 2
+    assert stats["users_per_second"] > 0
+    run_update = db[precompute.RUNS_COLLECTION].update_one.call_args[0][1]
+    assert run_update["$set"]["status"] == "complete"
+
+
+def test_resume_skips_users_done_in_the_unfinished_run(population):
+    run = {"_id": ObjectId(), "status": "running"}
+    db = _mock_db(population, done=[population[0]["_id"]])
+    db[precompute.RUNS_COLLECTION].find_one.return_value = run
+
+    stats = precompute.run_precompute(db, workers=1, resume=True)
+
+    db[precompute.RUNS_COLLECTION].insert_one.assert_not_called()
+    assert set(_written(db)) == {p["_id"] for p in population[1:]}
+    assert (stats["resumed_from"], stats["computed"]) == (1, len(population) - 1)
+    assert all(doc["run_id"] == run["_id"] for doc in _written(db).values())
+
+
+def test_load_precomputed_respects_max_age():
+    db = MagicMock()
+    user_id, other = ObjectId(), ObjectId()
+    doc = {
+        "computed_at": datetime.now(timezone.utc) - timedelta(minutes=30),
+        "ranked": [{"user_id": other, "score": 0.5}],
+    }
+    db[precompute.SUGGESTIONS_COLLECTION].find_one.return_value = doc
+
+    assert precompute.load_precomputed(db, str(user_id), max_age_seconds=3600) == [
+        (str(other), 0.5)
+    ]
+    assert precompute.load_precomputed(db, str(user_id), max_age_seconds=60) is None
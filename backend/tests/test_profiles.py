@@ -0,0 +1,174 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core import profiles
+from app.core.profiles import (
+    backfill_profile_fields,
+    canonical_skills,
+    derived_profile_fields,
+    profile_deleted,
+    profile_saved,
+)
+from app.core.skill_index import skill_index
+from app.core.skill_vocab import SKILL_ALIASES
+from app.core.suggestion_cache import SUGGESTION_CACHE_DEPTH, suggestion_cache
+
+# --- canonical fields ---
+
+
+def test_canonical_skills_dedupes_and_sorts():
+    assert canonical_skills([" Rust", "python", "PYTHON ", "c++"]) == [
+        "c++",
+        "python",
+        "rust",
+    ]
+
+
+def test_canonical_skills_resolves_aliases():
+    assert canonical_skills(["JS", "javascript", "ts"]) == ["javascript", "typescript"]
+
+
+def test_canonical_skills_none():
+    assert canonical_skills(None) == []
+
+
+def test_derived_fields_only_for_present_sources():
+    assert derived_profile_fields({"bio": "hi"}) == {}
+    assert derived_profile_fields({"skills": ["Go"]}) == {"skills_norm": ["go"]}
+    assert derived_profile_fields({"major": "Data Science"}) == {}
+    assert derived_profile_fields({"username": "AdaL"}) == {"username_lower": "adal"}
+    assert derived_profile_fields({"full_name": " Ada  King Lovelace"}) == {
+        "full_name_keys": ["ada", "ada king lovelace", "king", "lovelace"]
+    }
+
+
+# --- backfill ---
+
+
+def test_backfill_batches_updates(monkeypatch):
+    monkeypatch.setattr(profiles, "BACKFILL_BATCH_SIZE", 2)
+    db = MagicMock()
+    db["users"].find.return_value = [
+        {"_id": i, "skills": ["Python"], "major": "Other"} for i in range(5)
+    ]
+    db["users"].bulk_write.return_value = MagicMock(modified_count=2)
+
+    backfill_profile_fields(db)
+
+    batches = [c[0][0] for c in db["users"].bulk_write.call_args_list]
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert batches[0][0]._doc == {"$set": {"skills_norm": ["python"]}}
+
+
+def test_backfill_drops_the_unused_major_code():
+    db = MagicMock()
+    db["users"].find.return_value = []
+    db["users"].update_many.return_value = MagicMock(modified_count=3)
+
+    assert backfill_profile_fields(db) == 3
+
+    db["users"].update_many.assert_called_once_with(
+        {"major_code": {"$exists": True}}, {"$unset": {"major_code": ""}}
+    )
+
+
+def test_backfill_rederives_skills_stored_under_an_alias_or_blank():
+    db = MagicMock()
+    db["users"].find.return_value = []
+
+    backfill_profile_fields(db)
+
+    query = db["users"].find.call_args[0][0]
+    assert {"skills_norm": {"$in": ["", *sorted(SKILL_ALIASES)]}} in query["$or"]
+
+
+def test_backfill_noop_when_up_to_date():
+    db = MagicMock()
+    db["users"].find.return_value = []
+    db["users"].update_many.return_value = MagicMock(modified_count=0)
+    assert backfill_profile_fields(db) == 0
+    db["users"].bulk_write.assert_not_called()
+
+
+# --- invalidation hooks ---
+
+
+@pytest.fixture()
+def matching_state():
+    db = MagicMock()
+    db["users"].find.return_value = [
+        {"_id": "owner1", "skills_norm": ["python"], "major": "Other"},
+        {"_id": "owner2", "skills_norm": ["rust"], "major": "Other"},
+        {"_id": "owner3", "skills_norm": ["go"], "major": "Other"},
+        {"_id": "mover", "skills_norm": ["go"], "major": "Data Science"},
+    ]
+    skill_index.clear()
+    suggestion_cache.clear()
+    skill_index.ensure_built(db)
+    yield
+    skill_index.clear()
+    suggestion_cache.clear()
+
+
+def _full_list(score):
+    return [(f"filler{i}", score) for i in range(SUGGESTION_CACHE_DEPTH)]
+
+
+def test_profile_saved_drops_own_and_appearing_lists(matching_state):
+    suggestion_cache.put("mover", [("owner3", 0.9)])
+    suggestion_cache.put("owner3", [("mover", 0.9)])
+    suggestion_cache.put("owner2", _full_list(0.9))
+
+    stale = profile_saved(
+        {"_id": "mover", "skills_norm": ["go"], "major": "Data Science"}
+    )
+
+    assert suggestion_cache.owners() == {"owner2"}
+    # their precomputed lists are stale too; the caller discards them
+    assert stale == {"mover", "owner3"}
+
+
+def test_profile_saved_drops_lists_user_can_now_enter(matching_state):
+    # owner1's list is full at 0.9; owner2's list is full at 0.1
+    suggestion_cache.put("owner1", _full_list(0.9))
+    suggestion_cache.put("owner2", _full_list(0.1))
+
+    stale = profile_saved(
+        {"_id": "mover", "skills_norm": ["python", "rust"], "major": "DS"}
+    )
+
+    # 0.45 beats owner2's cutoff but not owner1's
+    assert suggestion_cache.owners() == {"owner1"}
+    assert stale == {"mover", "owner2"}
+
+
+def test_profile_saved_drops_short_lists_on_any_overlap(matching_state):
+    suggestion_cache.put("owner2", [("filler", 0.9)])
+    suggestion_cache.put("owner3", [("filler", 0.9)])
+
+    profile_saved({"_id": "mover", "skills_norm": ["rust"], "major": "DS"})
+
+    assert suggestion_cache.owners() == {"owner3"}
+
+
+def test_profile_deleted_drops_appearing_lists(matching_state):
+    suggestion_cache.put("owner1", [("mover", 0.9)])
+    suggestion_cache.put("owner2", [("owner3", 0.9)])
+
+    assert profile_deleted("mover") == {"mover", "owner1"}
+
+    assert suggestion_cache.owners() == {"owner2"}
+    assert skill_index.profile("mover") is None
+
+
+def test_profile_saved_without_score_change_only_reindexes(matching_state):
+    suggestion_cache.put("owner3", [("mover", 0.9)])
+
+    stale = profile_saved(
+        {"_id": "mover", "skills_norm": ["go"], "major": "DS"}, scores_changed=False
+    )
+
+    assert stale == set()
+    assert suggestion_cache.owners() == {"owner3"}
+    assert skill_index.profile("mover") is not None
@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+
+from app.core.serialization import FastJSONResponse, dumps, model_payload
+from app.models.enums import Major
+from app.models.schemas import GroupRead, SuggestionRead, UserRead
+
+
+def _user_doc(**overrides):
+    doc = {
+        "_id": ObjectId(),
+        "email": "ada@my.unt.edu",
+        "hashed_password": "secret",
+        "username": "ada",
+        "full_name": "Ada Lovelace",
+        "major": "Computer Science",
+        "bio": "Engines.",
+        "skills": ["Python", "C++"],
+        "skills_norm": ["c++", "python"],
+        "external_links": {"github": "https://github.com/ada"},
+        "avatar_url": None,
+        "created_at": datetime(2025, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    }
+    doc.update(overrides)
+    return doc
+
+
+def _model_json(model, doc, **values) -> bytes:
+    doc = {**doc, "_id": str(doc["_id"]), **values}
+    return model(**doc).model_dump_json(by_alias=True).encode()
+
+
+def test_user_payload_matches_model_json():
+    doc = _user_doc()
+    assert dumps(model_payload(UserRead, doc)) == _model_json(UserRead, doc)
+
+
+def test_naive_datetime_matches_model_json():
+    doc = _user_doc(created_at=datetime(2025, 3, 1, 12, 30))
+    assert dumps(model_payload(UserRead, doc)) == _model_json(UserRead, doc)
+
+
+def test_payload_drops_fields_outside_the_model():
+    payload = model_payload(UserRead, _user_doc())
+    assert "email" not in payload
+    assert "hashed_password" not in payload
+    assert "skills_norm" not in payload
+
+
+def test_missing_optional_fields_get_fresh_defaults():
+    doc = _user_doc()
+    del doc["skills"], doc["external_links"], doc["bio"]
+    first = model_payload(UserRead, doc)
+    second = model_payload(UserRead, doc)
+    assert first["skills"] == [] and first["external_links"] == {}
+    assert first["bio"] is None
+    first["skills"].append("Go")
+    assert second["skills"] == []
+    assert dumps(first | {"skills": []}) == _model_json(UserRead, doc)
+
+
+def test_missing_required_field_raises_key_error():
+    doc = _user_doc()
+    del doc["created_at"]
+    with pytest.raises(KeyError):
+        model_payload(UserRead, doc)
+
+
+def test_values_override_the_document():
+    doc = _user_doc(match_score=0.1)
+    payload = model_payload(SuggestionRead, doc, match_score=0.75)
+    assert payload["match_score"] == 0.75
+    assert dumps(payload) == _model_json(SuggestionRead, doc, match_score=0.75)
+
+
+def test_group_with_nested_members_matches_model_json():
+    members = [_user_doc(), _user_doc(username="grace", major=Major.DS)]
+    group = {
+        "_id": ObjectId(),
+        "name": "Team",
+        "description": "Capstone",
+        "created_by": members[0]["_id"],
+        "created_at": datetime(2025, 3, 2, tzinfo=timezone.utc),
+        "member_ids": [m["_id"] for m in members],
+        "skill_profile": {"size": 2},
+    }
+    payload = model_payload(
+        GroupRead, group, members=[model_payload(UserRead, m) for m in members]
+    )
+
+    expected = GroupRead(
+        **{**group, "_id": str(group["_id"]), "created_by": str(group["created_by"])},
+        members=[UserRead(**{**m, "_id": str(m["_id"])}) for m in members],
+    ).model_dump_json(by_alias=True)
+    assert dumps(payload) == expected.encode()
+
+
+def test_unknown_types_are_rejected():
+    with pytest.raises(TypeError):
+        dumps({"value": object()})
+
+
+def test_fast_json_response_renders_with_orjson():
+    oid = ObjectId()
+    response = FastJSONResponse({"_id": oid, "major": Major.CS}, status_code=201)
+    assert response.status_code == 201
+    assert response.media_type == "application/json"
+    assert response.body == f'{{"_id":"{oid}","major":"Computer Science"}}'.encode()
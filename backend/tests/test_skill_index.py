@@ -0,0 +1,129 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+from app.core.matching import compute_match_score
+from app.core.skill_index import SkillIndex
+from app.models.enums import Major
+
+
+def _user(uid, skills, major="Computer Science"):
+    return {"_id": uid, "skills": skills, "major": major}
+
+
+def _built_index(users):
+    db = MagicMock()
+    db["users"].find.return_value = [u.copy() for u in users]
+    index = SkillIndex()
+    index.ensure_built(db)
+    return index
+
+
+# --- candidate_ids ---
+
+
+def test_candidate_ids_shared_skill_or_major():
+    index = _built_index(
+        [
+            _user("a", ["Python"], "Data Science"),
+            _user("b", ["Rust"], "Computer Science"),
+            _user("c", ["Go"], "Cybersecurity"),
+        ]
+    )
+    me = _user("me", [" python "], "Computer Science")
+    assert index.candidate_ids(me) == {"a", "b"}
+
+
+def test_candidate_ids_excludes_self():
+    index = _built_index([_user("me", ["Python"]), _user("a", ["Python"])])
+    assert index.candidate_ids(_user("me", ["Python"])) == {"a"}
+
+
+def test_pruned_candidates_are_exactly_the_nonzero_scores():
+    users = [
+        _user("a", ["Python", "Java"], "Data Science"),
+        _user("b", [], "Computer Science"),
+        _user("c", ["Rust"], "Cybersecurity"),
+        _user("d", ["JAVA"], "Other"),
+    ]
+    index = _built_index(users)
+    me = _user("me", ["java"], "Computer Science")
+    nonzero = {u["_id"] for u in users if compute_match_score(me, u) > 0}
+    assert index.candidate_ids(me) == nonzero
+
+
+def test_build_reads_db_only_once():
+    db = MagicMock()
+    db["users"].find.return_value = []
+    index = SkillIndex()
+    index.ensure_built(db)
+    index.ensure_built(db)
+    db["users"].find.assert_called_once()
+
+
+def test_concurrent_first_calls_build_once():
+    db = MagicMock()
+    # a slow scan, so every thread asks before the first build is done
+    db["users"].find.side_effect = lambda *_: (
+        time.sleep(0.05) or [_user("a", ["Python"])]
+    )
+    index = SkillIndex()
+    threads = [
+        threading.Thread(target=index.ensure_built, args=(db,)) for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    db["users"].find.assert_called_once()
+
+
+# --- maintenance ---
+
+
+def test_upsert_before_build_is_noop():
+    index = SkillIndex()
+    index.upsert(_user("a", ["Python"]))
+    assert index.candidate_ids(_user("me", ["Python"])) == set()
+
+
+def test_upsert_during_build_is_applied_after_it():
+    index = SkillIndex()
+    reading = threading.Event()
+
+    def users():
+        yield _user("a", ["Python"])
+        reading.set()
+        time.sleep(0.05)  # the writer below is now waiting on the build
+        yield _user("b", ["Python"])
+
+    def write():
+        reading.wait()
+        index.upsert(_user("c", ["Python"]))
+        index.remove("a")
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    index.load(users())
+    writer.join()
+
+    assert index.candidate_ids(_user("me", ["Python"])) == {"b", "c"}
+
+
+def test_upsert_replaces_previous_entry():
+    index = _built_index([_user("a", ["Python"], "Other")])
+    index.upsert(_user("a", ["Rust"], "Other"))
+    assert index.candidate_ids(_user("me", ["Python"], "Data Science")) == set()
+    assert index.candidate_ids(_user("me", ["Rust"], "Data Science")) == {"a"}
+
+
+def test_upsert_accepts_major_enum():
+    index = _built_index([])
+    index.upsert(_user("a", [], Major.CS))
+    assert index.candidate_ids(_user("me", [], "Computer Science")) == {"a"}
+
+
+def test_remove_drops_user():
+    index = _built_index([_user("a", ["Python"])])
+    index.remove("a")
+    assert index.candidate_ids(_user("me", ["Python"])) == set()
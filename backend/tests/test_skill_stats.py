@@ -0,0 +1,188 @@
+import math
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core import skill_stats as skill_stats_module
+from app.core.matching import compute_match_score, get_suggestions, match_scorer
+from app.core.skill_stats import (
+    TOTAL_USERS_ID,
+    SkillStats,
+    ensure_skill_stats,
+    record_profile_change,
+    skill_stats,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def _fresh_mirror():
+    skill_stats.clear()
+    yield
+    skill_stats.clear()
+
+
+def _stats_docs(counts, total):
+    docs = [{"_id": f"skill:{skill}", "count": n} for skill, n in counts.items()]
+    return docs + [{"_id": TOTAL_USERS_ID, "count": total}]
+
+
+def _ops(db):
+    (ops,), _ = db["skill_stats"].bulk_write.call_args
+    return {op._filter["_id"]: op._doc for op in ops}
+
+
+# --- mirror ---
+
+
+def test_load_and_idf():
+    stats = SkillStats()
+    stats.load(_stats_docs({"python": 90, "verilog": 1, "gone": 0}, total=100))
+
+    assert stats.total_users == 100
+    assert stats.count("gone") == 0
+    assert stats.idf("python") == math.log(101 / 91) + 1.0
+    assert stats.idf("verilog") > stats.idf("python")
+    # unknown skills are treated as the rarest
+    assert stats.idf("cobol") > stats.idf("verilog")
+
+
+def test_apply_is_noop_until_loaded():
+    stats = SkillStats()
+    stats.apply({"python": 1}, users_delta=1)
+    assert (stats.count("python"), stats.total_users) == (0, 0)
+
+
+def test_apply_adjusts_counts_and_drops_zeros():
+    stats = SkillStats()
+    stats.load(_stats_docs({"python": 2, "rust": 1}, total=2))
+
+    stats.apply({"python": 1, "rust": -1}, users_delta=1)
+
+    assert stats.snapshot() == ({"python": 3}, 3)
+
+
+def test_mirror_reloads_once_stale():
+    clock = FakeClock()
+    stats = SkillStats(refresh_seconds=60, clock=clock)
+    db = MagicMock()
+    db["skill_stats"].find.return_value = _stats_docs({"go": 1}, total=1)
+
+    stats.ensure_loaded(db)
+    stats.ensure_loaded(db)
+    clock.now = 60
+    stats.ensure_loaded(db)
+
+    assert db["skill_stats"].find.call_count == 2
+
+
+# --- incremental maintenance ---
+
+
+def test_sign_up_increments_skills_and_total():
+    db = MagicMock()
+    skill_stats.load(_stats_docs({}, total=0))
+
+    record_profile_change(db, None, {"skills_norm": ["go", "sql"]})
+
+    assert _ops(db) == {
+        "skill:go": {"$inc": {"count": 1}},
+        "skill:sql": {"$inc": {"count": 1}},
+        TOTAL_USERS_ID: {"$inc": {"count": 1}},
+    }
+    assert skill_stats.snapshot() == ({"go": 1, "sql": 1}, 1)
+
+
+def test_edit_writes_only_changed_skills():
+    db = MagicMock()
+
+    record_profile_change(
+        db, {"skills_norm": ["go", "sql"]}, {"skills_norm": ["go", "rust"]}
+    )
+
+    assert _ops(db) == {
+        "skill:rust": {"$inc": {"count": 1}},
+        "skill:sql": {"$inc": {"count": -1}},
+    }
+
+
+def test_edit_without_skill_changes_writes_nothing():
+    db = MagicMock()
+    record_profile_change(db, {"skills": ["Go"]}, {"skills_norm": ["go"]})
+    db["skill_stats"].bulk_write.assert_not_called()
+
+
+def test_delete_decrements_skills_and_total():
+    db = MagicMock()
+
+    record_profile_change(db, {"skills_norm": ["go"]}, None)
+
+    assert _ops(db) == {
+        "skill:go": {"$inc": {"count": -1}},
+        TOTAL_USERS_ID: {"$inc": {"count": -1}},
+    }
+
+
+def test_ensure_builds_from_users_only_once():
+    db = MagicMock()
+    db["skill_stats"].find_one.return_value = None
+    db["users"].aggregate.return_value = [{"_id": "go", "count": 3}]
+    db["users"].count_documents.return_value = 5
+    db["skill_stats"].find.return_value = _stats_docs({"go": 3}, total=5)
+
+    ensure_skill_stats(db)
+
+    assert _ops(db)["skill:go"] == {"$set": {"count": 3}}
+    assert _ops(db)[TOTAL_USERS_ID] == {"$set": {"count": 5}}
+    assert skill_stats.snapshot() == ({"go": 3}, 5)
+
+    db.reset_mock()
+    db["skill_stats"].find_one.return_value = {"_id": TOTAL_USERS_ID, "count": 5}
+    ensure_skill_stats(db)
+    db["users"].aggregate.assert_not_called()
+
+
+# --- IDF-weighted scoring ---
+
+
+def test_shared_rare_skill_outscores_shared_common_skill():
+    skill_stats.load(_stats_docs({"python": 95, "verilog": 2, "rust": 2}, total=100))
+    me = {"skills_norm": ["python", "verilog"], "major": "Other"}
+    shares_common = {"skills_norm": ["python", "rust"], "major": "Other"}
+    shares_rare = {"skills_norm": ["verilog", "rust"], "major": "Other"}
+
+    # plain Jaccard can't tell them apart
+    assert compute_match_score(me, shares_common) == compute_match_score(
+        me, shares_rare
+    )
+    score = match_scorer(me, skill_stats.idf)
+    assert score(shares_rare) > score(shares_common)
+
+
+def test_uniform_weights_reduce_to_jaccard():
+    me = {"skills_norm": ["go", "python", "sql"], "major": "Other"}
+    other = {"skills_norm": ["python", "rust"], "major": "Data Science"}
+    assert match_scorer(me, lambda _: 1.0)(other) == pytest.approx(
+        compute_match_score(me, other)
+    )
+
+
+def test_weighted_suggestions_use_the_heap_path(monkeypatch):
+    monkeypatch.setattr(skill_stats_module, "SUGGESTIONS_SCORING", "idf")
+    me = {"skills_norm": ["go"], "major": "Other"}
+    candidates = [
+        {"_id": i, "skills_norm": ["go"], "major": "Other"} for i in range(1200)
+    ]
+
+    ranked = get_suggestions(
+        me, candidates, limit=3, weight=skill_stats_module.skill_weight()
+    )
+
+    assert [doc["_id"] for doc, _ in ranked] == [0, 1, 2]
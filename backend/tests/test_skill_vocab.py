@@ -0,0 +1,27 @@
+from array import array
+
+from app.core.skill_vocab import SkillVocabulary, canonical_skill
+
+
+def test_canonical_skill_resolves_aliases():
+    assert canonical_skill(" JS ") == "javascript"
+    assert canonical_skill("javascript") == "javascript"
+    assert canonical_skill("Golang") == "go"
+    assert canonical_skill("Rust") == "rust"
+
+
+def test_intern_assigns_dense_stable_ids():
+    vocab = SkillVocabulary()
+    assert [vocab.intern(s) for s in ("go", "rust", "go")] == [0, 1, 0]
+    assert vocab.lookup("rust") == 1
+    assert vocab.lookup("zig") is None
+    assert len(vocab) == 2
+
+
+def test_ids_are_a_sorted_deduplicated_short_array():
+    vocab = SkillVocabulary()
+    vocab.intern("rust")
+    ids = vocab.ids(["sql", "rust", "go", "sql"])
+
+    assert ids == array("H", [0, 1, 2])
+    assert vocab.names(ids) == ["rust", "sql", "go"]
@@ -0,0 +1,81 @@
+import random
+
+from app.core.matching import compute_match_score, get_suggestions
+from app.core.sparse_scoring import SparseScoringEngine
+from app.models.enums import Major
+
+SKILLS = ["Python", "python ", "JAVA", "C++", "Rust", "Go", "SQL", "React", "Verilog"]
+MAJORS = ["Computer Science", "Data Science", "Other", Major.CS, None]
+
+
+def _population(n, seed=3444):
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"user{i}",
+            "skills": rng.sample(SKILLS, rng.randint(0, 5)),
+            "major": rng.choice(MAJORS),
+        }
+        for i in range(n)
+    ]
+
+
+def _scalar_ranking(me, candidates, limit):
+    scored = [(c, compute_match_score(me, c)) for c in candidates]
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored[:limit]
+
+
+# --- parity with compute_match_score ---
+
+
+def test_scores_identical_to_scalar_path():
+    users = _population(500)
+    engine = SparseScoringEngine(users)
+    for me in users[:25]:
+        scores = engine.score(me)
+        assert [float(s) for s in scores] == [compute_match_score(me, u) for u in users]
+
+
+def test_pairwise_identical_to_scalar_path():
+    users = _population(120)
+    pairwise = SparseScoringEngine(users).pairwise()
+    for i, me in enumerate(users[:20]):
+        assert pairwise[i].tolist() == [compute_match_score(me, u) for u in users]
+
+
+def test_query_with_unknown_skills_and_major():
+    engine = SparseScoringEngine(_population(50))
+    me = {"skills": ["COBOL"], "major": "Cybersecurity"}
+    assert set(engine.score(me).tolist()) == {0.0}
+
+
+def test_empty_population():
+    engine = SparseScoringEngine([])
+    assert len(engine.score({"skills": ["Python"], "major": "Other"})) == 0
+    assert engine.top_k({"skills": ["Python"]}, 10) == []
+    assert engine.pairwise().shape == (0, 0)
+
+
+# --- top_k ---
+
+
+def test_top_k_matches_stable_sort():
+    users = _population(400)
+    engine = SparseScoringEngine(users)
+    for me in users[:10]:
+        for limit in (1, 10, 50, 400, 1000):
+            expected = _scalar_ranking(me, users, limit)
+            got = [(users[i], score) for i, score in engine.top_k(me, limit)]
+            assert got == expected
+
+
+# --- get_suggestions ---
+
+
+def test_engine_top_k_agrees_with_get_suggestions():
+    users = _population(1010)
+    me = {"skills": ["Python", "SQL"], "major": "Computer Science"}
+    engine = SparseScoringEngine(users)
+    got = [(users[i], score) for i, score in engine.top_k(me, 50)]
+    assert got == get_suggestions(me, users, limit=50)
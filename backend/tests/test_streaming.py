@@ -0,0 +1,68 @@
+import json
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, Field
+
+from app.core.streaming import stream_mode, streaming_response
+
+
+class Item(BaseModel):
+    id: str = Field(alias="_id")
+    name: str
+
+
+def _items(n):
+    return (Item(_id=str(i), name=f"ünï {i}") for i in range(n))
+
+
+app = FastAPI()
+
+
+@app.get("/items", response_model=list[Item])
+def list_items(request: Request, n: int = 3):
+    mode = stream_mode(request)
+    if mode is not None:
+        return streaming_response(_items(n), mode)
+    return list(_items(n))
+
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        ("application/x-ndjson", "ndjson"),
+        ("text/html, application/x-ndjson;q=0.9", "ndjson"),
+        ("application/json; stream=array", "array"),
+        ("application/json", None),
+        ("*/*", None),
+        ("", None),
+    ],
+)
+def test_stream_mode_from_accept(accept, expected):
+    request = type("R", (), {"headers": {"accept": accept}})()
+    assert stream_mode(request) == expected
+
+
+def test_ndjson_is_one_aliased_object_per_line():
+    resp = client.get("/items", headers={"Accept": "application/x-ndjson"})
+
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    lines = resp.text.splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"_id": str(i), "name": f"ünï {i}"} for i in range(3)
+    ]
+
+
+@pytest.mark.parametrize("n", [0, 1, 3])
+def test_streamed_array_is_byte_identical_to_regular_response(n):
+    regular = client.get("/items", params={"n": n})
+    streamed = client.get(
+        "/items", params={"n": n}, headers={"Accept": "application/json; stream=array"}
+    )
+
+    assert streamed.headers["content-type"] == "application/json"
+    assert streamed.content == regular.content
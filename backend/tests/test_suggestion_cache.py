@@ -0,0 +1,67 @@
+from app.core.suggestion_cache import SuggestionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(max_entries=3, ttl=10.0):
+    clock = FakeClock()
+    return SuggestionCache(max_entries=max_entries, ttl_seconds=ttl, clock=clock), clock
+
+
+def test_miss_then_hit():
+    cache, _ = _cache()
+    assert cache.get("me") is None
+    cache.put("me", [("a", 0.5)])
+    assert cache.get("me") == [("a", 0.5)]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_entries_expire_after_ttl():
+    cache, clock = _cache(ttl=10.0)
+    cache.put("me", [("a", 0.5)])
+    clock.now = 10.0
+    assert cache.get("me") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache, _ = _cache(max_entries=2)
+    cache.put("a", [])
+    cache.put("b", [])
+    cache.get("a")
+    cache.put("c", [])
+    assert cache.owners() == {"a", "c"}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_appearing_drops_only_lists_containing_user():
+    cache, _ = _cache()
+    cache.put("a", [("x", 0.9), ("y", 0.5)])
+    cache.put("b", [("y", 0.4)])
+    cache.put("c", [("z", 0.4)])
+    assert cache.invalidate_appearing("y") == 2
+    assert cache.owners() == {"c"}
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_replacing_entry_updates_reverse_index():
+    cache, _ = _cache()
+    cache.put("a", [("x", 0.9)])
+    cache.put("a", [("y", 0.9)])
+    assert cache.invalidate_appearing("x") == 0
+    assert cache.invalidate_appearing("y") == 1
+
+
+def test_peek_does_not_count():
+    cache, _ = _cache()
+    cache.put("a", [("x", 0.9)])
+    assert cache.peek("a") == [("x", 0.9)]
+    assert cache.stats()["hits"] == 0
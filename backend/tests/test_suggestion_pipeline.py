@@ -0,0 +1,124 @@
+"""
+Parity of the aggregation backend's score with compute_match_score.
+
+MongoDB isn't available to the test suite, so the pipeline's score expression is
+evaluated by a tiny interpreter covering exactly the operators it uses, with
+MongoDB's semantics for them (set operators dedupe, $divide yields a double).
+"""
+
+import random
+
+from bson import ObjectId
+
+from app.core.matching import compute_match_score
+from app.core.suggestions import (
+    USER_READ_PROJECTION,
+    ensure_suggestion_indexes,
+    match_score_expression,
+    suggestion_pipeline,
+)
+from app.models.enums import Major
+from tests.mongo_commands import mock_database
+
+
+def _eval(expr, doc, variables=None):
+    variables = variables or {}
+    if isinstance(expr, str) and expr.startswith("$$"):
+        return variables[expr[2:]]
+    if isinstance(expr, str) and expr.startswith("$"):
+        return doc.get(expr[1:])
+    if isinstance(expr, list):
+        return [_eval(e, doc, variables) for e in expr]
+    if not isinstance(expr, dict):
+        return expr
+
+    ((op, args),) = expr.items()
+    if op == "$let":
+        bound = {k: _eval(v, doc, variables) for k, v in args["vars"].items()}
+        return _eval(args["in"], doc, {**variables, **bound})
+    if op == "$cond":
+        test, then, otherwise = args
+        return _eval(then if _eval(test, doc, variables) else otherwise, doc, variables)
+
+    values = _eval(args, doc, variables)
+    if op == "$ifNull":
+        return values[0] if values[0] is not None else values[1]
+    if op == "$eq":
+        return values[0] == values[1]
+    if op == "$size":
+        return len(values)
+    if op == "$setIntersection":
+        return list(set(values[0]) & set(values[1]))
+    if op == "$setUnion":
+        return list(set(values[0]) | set(values[1]))
+    if op == "$divide":
+        return float(values[0]) / values[1]
+    if op == "$multiply":
+        return values[0] * values[1]
+    if op == "$add":
+        return values[0] + values[1]
+    raise AssertionError(f"unsupported operator {op}")
+
+
+SKILLS = ["c++", "go", "java", "python", "rust", "sql", "verilog"]
+MAJORS = [m.value for m in Major]
+
+
+def _population(n, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            "_id": ObjectId(),
+            "skills_norm": sorted(rng.sample(SKILLS, rng.randint(0, 4))),
+            "major": rng.choice(MAJORS),
+        }
+        for _ in range(n)
+    ]
+
+
+def test_score_expression_matches_compute_match_score():
+    users = _population(300)
+    for me in users[:30]:
+        expr = match_score_expression(me)
+        for other in users:
+            assert _eval(expr, other) == compute_match_score(me, other)
+
+
+def test_score_expression_handles_missing_skills_norm():
+    me = {"_id": ObjectId(), "skills_norm": [], "major": "Other"}
+    assert _eval(match_score_expression(me), {"major": "Other"}) == 0.1
+
+
+def test_pipeline_shape():
+    me = {"_id": ObjectId(), "skills_norm": ["sql", "go"], "major": "Other"}
+    match, add_fields, sort, limit, project = suggestion_pipeline(me, 25)
+
+    assert match["$match"]["_id"] == {"$nin": [me["_id"]]}
+    assert {"skills_norm": {"$in": ["go", "sql"]}} in match["$match"]["$or"]
+    assert "match_score" in add_fields["$addFields"]
+    assert sort == {"$sort": {"match_score": -1, "_id": 1}}
+    assert limit == {"$limit": 25}
+    assert project["$project"] == {**USER_READ_PROJECTION, "match_score": 1}
+    assert "password" not in project["$project"]
+
+
+def test_pipeline_excludes_given_ids():
+    me = {"_id": ObjectId(), "skills_norm": ["go"], "major": "Other"}
+    connected = ObjectId()
+    (match, *_) = suggestion_pipeline(me, 10, exclude={str(connected)})
+
+    assert match["$match"]["_id"] == {"$nin": [me["_id"], connected]}
+
+
+def test_indexes_drop_single_field_prefixes_of_the_directory_ones():
+    db = mock_database()
+    db["users"].index_information.return_value = {
+        "_id_": {},
+        "users_major": {},
+        "users_major_id": {},
+    }
+
+    ensure_suggestion_indexes(db)
+
+    db["users"].drop_index.assert_called_once_with("users_major")
+    db["users"].create_index.assert_not_called()
@@ -0,0 +1,82 @@
+from app.core.suggestion_snapshots import (
+    SuggestionSnapshots,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _store(max_total_entries=10, ttl=60.0):
+    clock = FakeClock()
+    store = SuggestionSnapshots(
+        max_total_entries=max_total_entries, ttl_seconds=ttl, clock=clock
+    )
+    return store, clock
+
+
+def _ranked(n, prefix="u"):
+    return [(f"{prefix}{i}", 1.0 - i / 100) for i in range(n)]
+
+
+def test_snapshot_is_only_visible_to_its_owner():
+    store, _ = _store()
+    snapshot_id = store.create("me", "exact", _ranked(3), exhausted=True)
+
+    assert store.get(snapshot_id, "me").ranked == _ranked(3)
+    assert store.get(snapshot_id, "someone else") is None
+
+
+def test_snapshot_expires_after_ttl():
+    store, clock = _store(ttl=60.0)
+    snapshot_id = store.create("me", "exact", _ranked(3), exhausted=True)
+    clock.now = 60.0
+
+    assert store.get(snapshot_id, "me") is None
+    assert store.stats()["expirations"] == 1
+    assert store.stats()["total_entries"] == 0
+
+
+def test_entry_cap_evicts_least_recently_used():
+    store, _ = _store(max_total_entries=10)
+    a = store.create("a", "exact", _ranked(4), exhausted=True)
+    b = store.create("b", "exact", _ranked(4), exhausted=True)
+    store.get(a, "a")
+    c = store.create("c", "exact", _ranked(4), exhausted=True)
+
+    assert store.get(b, "b") is None
+    assert store.get(a, "a") is not None
+    assert store.get(c, "c") is not None
+    stats = store.stats()
+    assert (stats["evictions"], stats["total_entries"]) == (1, 8)
+
+
+def test_extend_appends_and_counts_toward_cap():
+    store, _ = _store(max_total_entries=10)
+    other = store.create("other", "exact", _ranked(4), exhausted=True)
+    mine = store.create("me", "exact", _ranked(4), exhausted=False)
+
+    store.extend(mine, _ranked(4, prefix="v"), exhausted=True)
+
+    snapshot = store.get(mine, "me")
+    assert snapshot.ranked == _ranked(4) + _ranked(4, prefix="v")
+    assert snapshot.exhausted
+    # the snapshot being extended is never the one evicted
+    assert store.get(other, "other") is None
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("abc_-123", 40)) == ("abc_-123", 40)
+
+
+def test_malformed_cursors_decode_to_none():
+    assert decode_cursor("not base64!") is None
+    assert decode_cursor(encode_cursor("abc", 0)[:-2] + "@@") is None
+    assert decode_cursor(encode_cursor("abc", -1)) is None
+    assert decode_cursor(encode_cursor("", 3)) is None
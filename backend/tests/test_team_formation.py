@@ -0,0 +1,221 @@
+from datetime import datetime, timezone
+from itertools import combinations
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from app.core.matching import compute_match_score
+from app.core.team_formation import (
+    form_teams,
+    greedy_seed,
+    load_roster,
+    local_search,
+    objective,
+    promote_proposals,
+    solve,
+    team_sizes,
+)
+
+
+def _clustered_users(clusters, per_cluster):
+    """`clusters` groups of users that share skills within, nothing across."""
+    users = []
+    for c in range(clusters):
+        for i in range(per_cluster):
+            users.append(
+                {
+                    "_id": ObjectId(),
+                    "email": f"c{c}u{i}@my.unt.edu",
+                    "skills_norm": [f"skill{c}a", f"skill{c}b"],
+                    "major": "Other",
+                }
+            )
+    return users
+
+
+def _scores(users):
+    scores = np.array([[compute_match_score(a, b) for b in users] for a in users])
+    np.fill_diagonal(scores, 0.0)
+    return scores
+
+
+class TestTeamSizes:
+    @pytest.mark.parametrize(
+        ("n", "team_size", "expected"),
+        [(600, 4, [4] * 150), (10, 4, [4, 3, 3]), (5, 5, [5]), (0, 4, [])],
+    )
+    def test_even_sizes_never_above_team_size(self, n, team_size, expected):
+        assert team_sizes(n, team_size) == expected
+
+    def test_rejects_non_positive_team_size(self):
+        with pytest.raises(ValueError):
+            team_sizes(10, 0)
+
+
+class TestSolver:
+    def test_objective_sums_within_team_pairs(self):
+        users = _clustered_users(2, 2) + [{"skills_norm": ["x"], "major": "Other"}]
+        scores = _scores(users)
+        assignment = np.array([0, 0, 1, 1, 1])
+
+        expected = sum(
+            compute_match_score(users[i], users[j])
+            for i, j in combinations(range(5), 2)
+            if assignment[i] == assignment[j]
+        )
+        assert objective(scores, assignment) == pytest.approx(expected)
+
+    def test_recovers_planted_clusters(self):
+        users = _clustered_users(5, 4)
+        order = np.random.default_rng(1).permutation(len(users))
+        shuffled = [users[i] for i in order]
+
+        solution = solve(_scores(shuffled), 4, budget_seconds=0.5, max_restarts=5)
+
+        for team in solution.teams:
+            assert len({shuffled[i]["skills_norm"][0] for i in team}) == 1
+        assert solution.objective == pytest.approx(5 * 6 * 1.0)
+
+    def test_local_search_never_loses_to_its_seed(self):
+        rng = np.random.default_rng(7)
+        scores = rng.random((60, 60))
+        scores = (scores + scores.T) / 2
+        np.fill_diagonal(scores, 0.0)
+        sizes = team_sizes(60, 4)
+
+        seed = greedy_seed(scores, sizes, rng)
+        before = objective(scores, seed)
+        improved = local_search(scores, seed.copy(), len(sizes), float("inf"), rng)
+
+        assert objective(scores, improved) >= before
+        assert np.bincount(improved).tolist() == sizes
+
+    def test_every_student_lands_on_exactly_one_team(self):
+        users = _clustered_users(3, 5)
+
+        solution = solve(_scores(users), 4, budget_seconds=0.1, max_restarts=2)
+
+        placed = sorted(i for team in solution.teams for i in team)
+        assert placed == list(range(len(users)))
+        assert sorted(len(team) for team in solution.teams) == [3, 4, 4, 4]
+
+
+class TestFormTeams:
+    def _db(self, users):
+        collections = {
+            "users": MagicMock(),
+            "groups": MagicMock(),
+            "group_proposals": MagicMock(),
+        }
+        collections["users"].find.return_value = users
+        db = MagicMock()
+        db.__getitem__.side_effect = collections.__getitem__
+        return db
+
+    def test_stages_one_proposal_per_team_replacing_the_courses_last(self):
+        users = _clustered_users(2, 3)
+        db = self._db(users)
+        db["group_proposals"].insert_many.return_value.inserted_ids = [1, 2]
+        roster = [str(u["_id"]) for u in users[:3]] + [u["email"] for u in users[3:]]
+
+        report = form_teams(db, "CSCE 3444", roster, 3, budget_seconds=0.1, write=True)
+
+        db["group_proposals"].delete_many.assert_called_once_with(
+            {"course_code": "CSCE 3444"}
+        )
+        (groups,), _ = db["group_proposals"].insert_many.call_args
+        assert [g["name"] for g in groups] == ["CSCE 3444 Team 1", "CSCE 3444 Team 2"]
+        for group in groups:
+            assert group["course_code"] == "CSCE 3444"
+            assert group["created_by"] == group["member_ids"][0]
+            assert len(group["member_ids"]) == 3
+        db["groups"].insert_many.assert_not_called()  # nothing live yet
+        assert report["written"] == 2
+        assert report["missing"] == []
+
+    def test_dry_run_reports_missing_roster_entries_without_writing(self):
+        users = _clustered_users(1, 2)
+        db = self._db(users)
+        roster = [u["email"].upper() for u in users] + ["ghost@my.unt.edu"]
+
+        report = form_teams(db, "CSCE 3444", roster, 4, budget_seconds=0.1)
+
+        db["group_proposals"].insert_many.assert_not_called()
+        assert report["missing"] == ["ghost@my.unt.edu"]
+        assert len(report["teams"]) == 1
+
+
+class TestLoadRoster:
+    def test_emails_match_whatever_their_stored_case(self):
+        user = {"_id": ObjectId(), "email": "Jane.Doe@my.unt.edu"}
+        db = MagicMock()
+        db["users"].find.return_value = [user]
+
+        found, missing = load_roster(db, ["jane.doe@MY.UNT.EDU"])
+
+        assert found == [user] and missing == []
+        _, kwargs = db["users"].find.call_args
+        assert kwargs["collation"].document == {"locale": "en", "strength": 2}
+
+
+class TestPromoteProposals:
+    def _db(self, drafts, users):
+        collections = {
+            "users": MagicMock(),
+            "groups": MagicMock(),
+            "group_proposals": MagicMock(),
+        }
+        collections["group_proposals"].find.return_value = drafts
+        collections["users"].find.return_value = users
+        db = MagicMock()
+        db.__getitem__.side_effect = collections.__getitem__
+        return db
+
+    def _draft(self, number, member_ids):
+        return {
+            "_id": ObjectId(),
+            "name": f"CSCE 3444 Team {number}",
+            "course_code": "CSCE 3444",
+            "created_by": member_ids[0],
+            "member_ids": member_ids,
+            "proposed_at": datetime(2025, 1, 1, tzinfo=timezone.utc),
+        }
+
+    def test_counts_profiles_now_and_drops_deleted_members(self):
+        users = _clustered_users(1, 3)
+        gone = ObjectId()
+        draft = self._draft(1, [gone, *(u["_id"] for u in users)])
+        db = self._db([draft], users)
+
+        assert promote_proposals(db, "CSCE 3444") == 1
+
+        (groups,), _ = db["groups"].insert_many.call_args
+        (group,) = groups
+        assert group["member_ids"] == [u["_id"] for u in users]
+        assert group["created_by"] == users[0]["_id"]
+        assert group["skill_profile"]["size"] == 3
+        assert group["version"] == 1
+        assert "proposed_at" not in group
+        db["group_proposals"].delete_many.assert_called_once_with(
+            {"_id": {"$in": [draft["_id"]]}}
+        )
+
+    def test_proposal_whose_name_is_taken_stays_staged(self):
+        users = _clustered_users(2, 2)
+        drafts = [
+            self._draft(1, [u["_id"] for u in users[:2]]),
+            self._draft(2, [u["_id"] for u in users[2:]]),
+        ]
+        db = self._db(drafts, users)
+        db["groups"].insert_many.side_effect = BulkWriteError(
+            {"writeErrors": [{"index": 0, "errmsg": "duplicate key"}], "nInserted": 1}
+        )
+
+        assert promote_proposals(db, "CSCE 3444") == 1
+
+        db["group_proposals"].delete_many.assert_called_once_with(
+            {"_id": {"$in": [drafts[1]["_id"]]}}
+        )